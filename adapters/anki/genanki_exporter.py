@@ -1,20 +1,43 @@
 # adapters/anki/genanki_exporter.py
-import genanki
+import asyncio
+import functools
 import hashlib
+import itertools
+import json
 import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
 import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Set
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Iterable, List, Mapping, Optional, Tuple, Dict, Set
 
-from core.domain.interfaces import DeckExporter
+try:
+    # Optional: faster serialization for large export manifests and media maps
+    import orjson
+except ImportError:
+    orjson = None
+
+from core.domain.interfaces import AudioService, DeckExporter
 from core.domain.models import Deck, FlashCard, LanguagePair, LanguageCode
 
+if TYPE_CHECKING:
+    # genanki is imported lazily where it is used; importing this module for
+    # type hints or from pool workers should not pay for it
+    import genanki
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # --- Language Configuration ---
 # Map language codes to human-readable names
-LANGUAGE_NAMES: Dict[LanguageCode, str] = {
+_LANGUAGE_NAMES: Dict[LanguageCode, str] = {
     "fr": "French",
     "de": "German",
     "es": "Spanish",
@@ -24,6 +47,9 @@ LANGUAGE_NAMES: Dict[LanguageCode, str] = {
     'ca': 'Catalan',
     # Add more as needed
 }
+# Read-only public view; lookups go through the underlying dict's bound get
+LANGUAGE_NAMES: Mapping[LanguageCode, str] = MappingProxyType(_LANGUAGE_NAMES)
+_LANG_GET = _LANGUAGE_NAMES.get
 
 # --- Default/Fallback Values ---
 DEFAULT_DECK_ID_SALT = "anki-card-generator-deck-salt"
@@ -33,118 +59,41 @@ DEFAULT_TARGET_LANG_CODE = "tgt"
 DEFAULT_SOURCE_LANG_NAME = "Source Language"
 DEFAULT_TARGET_LANG_NAME = "Target Language"
 
-class GenankiExporter(DeckExporter):
-    """
-    Adapter for exporting decks to Anki's .apkg format using genanki.
-
-    Handles dynamic creation of Anki card models (Note Types) based on
-    the language pair of the deck being exported.
-    """
-    def __init__(self, storage_path: str = "./storage/audio"):
-        """
-        Initializes the exporter.
-
-        Args:
-            storage_path: Base path where generated audio files are stored locally.
-        """
-        self._model_cache: Dict[LanguagePair, genanki.Model] = {}
-        self.storage_path = Path(storage_path).resolve()
-        logger.info(f"GenankiExporter initialized. Audio storage path: {self.storage_path}")
-
-    def _generate_stable_id(self, base_string: str, salt: str) -> int:
-        """
-        Generates a stable, positive 31-bit integer ID from a string.
-        Ensures the same input string always produces the same ID.
-        """
-        hash_input = f"{base_string}-{salt}"
-        # Use sha256 for better collision resistance than md5, take first 8 hex chars
-        hash_value = hashlib.sha256(hash_input.encode()).hexdigest()[:8]
-        # Convert hex to int and ensure it fits in a signed 32-bit int, keeping it positive
-        stable_id = int(hash_value, 16) & 0x7FFFFFFF
-        # Ensure ID is not zero, as Anki might reserve 0
-        return stable_id if stable_id != 0 else 1
-
-    def _get_language_name(self, lang_code: LanguageCode, default: str) -> str:
-        """Safely get the full language name from the code."""
-        return LANGUAGE_NAMES.get(lang_code, default)
-
-    def _get_or_create_card_model(self, lang_pair: LanguagePair) -> genanki.Model:
-        """
-        Creates or retrieves a cached genanki.Model for a specific language pair.
-
-        Generates stable, unique model IDs based on the language pair.
-        Dynamically sets field names (e.g., "German", "English").
-
-        Args:
-            lang_pair: A tuple (source_lang_code, target_lang_code).
-
-        Returns:
-            A genanki.Model instance for the given language pair.
-        """
-        if lang_pair in self._model_cache:
-            return self._model_cache[lang_pair]
-
-        source_lang_code, target_lang_code = lang_pair
-        source_lang_name = self._get_language_name(source_lang_code, DEFAULT_SOURCE_LANG_NAME)
-        target_lang_name = self._get_language_name(target_lang_code, DEFAULT_TARGET_LANG_NAME)
-
-        # Generate a unique, stable model ID based on the language pair
-        model_id_str = f"{source_lang_code}-{target_lang_code}"
-        model_id = self._generate_stable_id(model_id_str, DEFAULT_MODEL_ID_SALT)
-
-        model_name = f'Language Card ({source_lang_name} -> {target_lang_name})'
-        logger.info(f"Creating new Anki model for {source_lang_name} -> {target_lang_name} (ID: {model_id})")
-
-        # Define fields dynamically
-        field_names = [
-            source_lang_name,       # Field 0: Source language text (e.g., "German")
-            target_lang_name,       # Field 1: Target language text (e.g., "English")
-            "WordBreakdown",        # Field 2: Analysis of words
-            "Audio",                # Field 3: Pronunciation
-            "GrammarNotes",         # Field 4: Grammar explanations
-            "Tags",                 # Field 5: Metadata tags
-            "SentenceId",           # Field 6: Unique ID for the source sentence (often hidden)
-            "SourceLangCode",       # Field 7: Hidden field for source language code
-            "TargetLangCode",       # Field 8: Hidden field for target language code
-        ]
-        fields = [{'name': name} for name in field_names]
-
-        # Define templates
-        templates = [
-            {
-                'name': f'{source_lang_name} -> {target_lang_name}',
-                'qfmt': self._get_front_template(source_lang_name, target_lang_name),
-                'afmt': self._get_back_template(source_lang_name, target_lang_name),
-            },
-            # Optional: Add a reverse card template if desired
-            # {
-            #     'name': f'{target_lang_name} -> {source_lang_name}',
-            #     'qfmt': self._get_front_template(target_lang_name, source_lang_name), # Swap languages
-            #     'afmt': self._get_back_template(target_lang_name, source_lang_name), # Swap languages
-            # },
-        ]
-
-        # Create the model
-        model = genanki.Model(
-            model_id=model_id,
-            name=model_name,
-            fields=fields,
-            templates=templates,
-            css=self._get_card_styles(),
-            # sortf = 0 # Sort by the first field (Source Language Text)
-        )
-
-        self._model_cache[lang_pair] = model
-        return model
-
-    def _get_front_template(self, source_lang_name: str, target_lang_name: str) -> str:
-        """HTML template for the front of the card."""
-        # --- CORRECTED ---
-        # Use {{ {{FieldName}} }} within f-string to output literal {{FieldName}}
-        return f'''
+# --- Parallel Export ---
+# Below this many cards, process start-up and pickling outweigh the formatting work
+PARALLEL_EXPORT_MIN_CARDS = 200
+
+# --- Export Manifest ---
+# Written next to each .apkg; records a content hash per note so an unchanged
+# deck can skip rewriting the package on the next export.
+EXPORT_MANIFEST_SUFFIX = ".export_manifest.json"
+# Initialised once and copied per note; copy() skips blake2b's parameter setup
+_DIGEST_SEED = hashlib.blake2b(digest_size=16)
+
+# --- Progress Reporting ---
+# Upper bound on progress callbacks per deck; more would be indistinguishable to a UI
+PROGRESS_REPORTS_PER_DECK = 100
+# Share of the progress range covered by card conversion; the rest is packaging
+CARD_PROGRESS_SHARE = 90.0
+
+# --- Audio Generation ---
+# Upper bound on concurrent audio generation requests when an audio service is configured
+AUDIO_GENERATION_CONCURRENCY = 16
+
+# --- Media Prefetch ---
+# Upper bound on concurrent media reads, keeps open file descriptors bounded
+MEDIA_PREFETCH_CONCURRENCY = 64
+# Missing audio filenames listed by name in the summary warning
+MISSING_MEDIA_LOG_LIMIT = 10
+
+# --- Card Templates & Styling ---
+# Built once at import time and shared by every exporter instance.
+# Templates are str.format() patterns: {{{{Field}}}} renders as the literal Anki
+# field reference {{Field}}, while {source}/{target} take the language names.
+_FRONT_TMPL = '''
         <div class="card-container">
             <div class="source-text">
-                {{{{{source_lang_name}}}}}
+                {{{{{source}}}}}
             </div>
 
             <div class="audio-container">
@@ -152,23 +101,19 @@ class GenankiExporter(DeckExporter):
             </div>
 
             <div class="hint">
-                💡 Tap to reveal translation ({target_lang_name})
+                💡 Tap to reveal translation ({target})
             </div>
         </div>
         '''
 
-    def _get_back_template(self, source_lang_name: str, target_lang_name: str) -> str:
-        """HTML template for the back of the card."""
-        # --- CORRECTED ---
-        # Use {{ {{FieldName}} }} within f-string to output literal {{FieldName}}
-        return f'''
+_BACK_TMPL = '''
         {{{{FrontSide}}}}
 
         <hr class="divider">
 
         <div class="card-container">
             <div class="target-text">
-                {{{{{target_lang_name}}}}}
+                {{{{{target}}}}}
             </div>
 
             {{{{#WordBreakdown}}}}
@@ -191,11 +136,7 @@ class GenankiExporter(DeckExporter):
         </div>
         '''
 
-    def _get_card_styles(self) -> str:
-        """CSS styling for the cards."""
-        # Using more generic class names like .source-text, .target-text
-        # [CSS content remains the same - not shown here for brevity]
-        return '''
+_CARD_CSS = '''
         /* Base card styling */
         .card {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto,
@@ -425,6 +366,258 @@ class GenankiExporter(DeckExporter):
         }
         '''
 
+def _minify_css(css: str) -> str:
+    """Strips comments and collapses whitespace, so the CSS stored in every model is compact."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    # Spaces next to these are never significant; ':' is left alone because of descendant pseudo-selectors
+    return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
+
+# Minified once at import; this is what the models embed
+_MINIFIED_CARD_CSS = _minify_css(_CARD_CSS)
+
+@functools.lru_cache(maxsize=32)
+def _card_templates(source_name: str, target_name: str) -> Tuple[str, str]:
+    """
+    Renders the (front, back) card templates for a pair of language names.
+
+    Cached per name pair, since the rendered templates are immutable and codes that
+    fall back to the default names share them.
+    """
+    return (
+        _FRONT_TMPL.format(source=source_name, target=target_name),
+        _BACK_TMPL.format(source=source_name, target=target_name),
+    )
+
+@functools.lru_cache(maxsize=256)
+def _stable_id(base_string: str, salt: str) -> int:
+    """
+    Generates a stable, positive 31-bit integer ID from a string.
+    Ensures the same input string always produces the same ID.
+
+    Memoized, since the same deck names and language pairs recur across exports.
+    """
+    hash_input = f"{base_string}-{salt}"
+    # Use sha256 for better collision resistance than md5. The first 4 digest bytes
+    # are the same value as the first 8 hex chars, without hex encoding and parsing.
+    digest = hashlib.sha256(hash_input.encode()).digest()
+    # Keep it within a signed 32-bit int and positive
+    stable_id = int.from_bytes(digest[:4], 'big') & 0x7FFFFFFF
+    # Ensure ID is not zero, as Anki might reserve 0
+    return stable_id if stable_id != 0 else 1
+
+@functools.lru_cache(maxsize=1024)
+def _tag_string(tags: Tuple[str, ...]) -> str:
+    """
+    Joins a card's tags into the space-separated Tags field value.
+
+    Keyed on the tag values rather than cached on the card, since FlashCard.tags is a
+    mutable list. Decks reuse a handful of tag combinations, so repeated cards and
+    re-exports share one string instead of joining again per card.
+    """
+    return " ".join(tags)
+
+# --- Field Formatting ---
+# Constant HTML fragments for the formatted fields, appended around the escaped values
+_WORD_OPEN = "<b>"
+_WORD_POS = "</b> <span class='pos'>("
+_WORD_DEFINITION = ")</span>: <span class='definition-target'>"
+_SPAN_CLOSE = "</span>"
+_NATIVE_OPEN = "<br><span class='definition-native'>(" # followed by "<lang>: "
+_NATIVE_CLOSE = ")</span>"
+_GRAMMAR_TITLE = "<li><strong>"
+_GRAMMAR_EXPLANATION = ":</strong> "
+_GRAMMAR_EXAMPLE_OPEN = "<em> - "
+_GRAMMAR_EXAMPLE_CLOSE = "</em><br>"
+# HTML escaping for values injected into the templates above, applied in C by str.translate
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+class _PrefetchedMediaPackage:
+    """
+    Wraps a genanki.Package and writes media from bytes already read into memory.
+
+    Mirrors genanki.Package.write_to_file, but media present in `media_data`
+    (keyed by path) is written from memory instead of being re-read from disk.
+    """
+    def __init__(self, deck_or_decks=None, media_files=None):
+        import genanki
+        self.package = genanki.Package(deck_or_decks, media_files)
+        self.media_data: Dict[str, bytes] = {}
+
+    @property
+    def media_files(self) -> List[str]:
+        return self.package.media_files
+
+    @media_files.setter
+    def media_files(self, media_files: List[str]) -> None:
+        self.package.media_files = media_files
+
+    def write_to_file(self, file, timestamp: Optional[float] = None):
+        dbfile, dbfilename = tempfile.mkstemp()
+        os.close(dbfile)
+
+        try:
+            conn = sqlite3.connect(dbfilename)
+            cursor = conn.cursor()
+
+            if timestamp is None:
+                timestamp = time.time()
+
+            id_gen = itertools.count(int(timestamp * 1000))
+            self.package.write_to_db(cursor, timestamp, id_gen)
+
+            conn.commit()
+            conn.close()
+
+            with zipfile.ZipFile(file, 'w') as outzip:
+                outzip.write(dbfilename, 'collection.anki2')
+
+                media_file_idx_to_path = dict(enumerate(self.media_files))
+                media_json = {idx: os.path.basename(path) for idx, path in media_file_idx_to_path.items()}
+                # One entry per audio file, so large decks give orjson real work
+                outzip.writestr('media', orjson.dumps(media_json, option=orjson.OPT_NON_STR_KEYS) if orjson else json.dumps(media_json))
+
+                for idx, path in media_file_idx_to_path.items():
+                    data = self.media_data.get(path)
+                    if data is None:
+                        outzip.write(path, str(idx))
+                    else:
+                        outzip.writestr(str(idx), data)
+        finally:
+            os.remove(dbfilename)
+
+class GenankiExporter(DeckExporter):
+    """
+    Adapter for exporting decks to Anki's .apkg format using genanki.
+
+    Handles dynamic creation of Anki card models (Note Types) based on
+    the language pair of the deck being exported.
+    """
+    # Models are immutable once built, so they are shared across all
+    # exporter instances rather than rebuilt per instance.
+    _model_cache: Dict[LanguagePair, "genanki.Model"] = {}
+
+    def __init__(
+        self,
+        storage_path: str = "./storage/audio",
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        output_dir: Optional[str] = None,
+        audio_service: Optional[AudioService] = None
+    ):
+        """
+        Initializes the exporter.
+
+        Args:
+            storage_path: Base path where generated audio files are stored locally.
+            max_workers: Number of worker processes used to format note fields for
+                         large decks. None or 1 keeps formatting on the calling thread.
+            progress_callback: Optional callable receiving (percent, message) during
+                               export, e.g. to report progress from background jobs.
+                               Called at most ~PROGRESS_REPORTS_PER_DECK times per deck.
+            output_dir: Optional directory that relative output paths are placed in.
+                        Resolved and created once here rather than on every export.
+            audio_service: Optional audio service used to generate audio, concurrently,
+                           for cards that have none before they are exported. The
+                           audio is saved under `storage_path`.
+        """
+        self.storage_path = Path(storage_path).resolve()
+        self.max_workers = max_workers
+        self.progress_callback = progress_callback
+        self.audio_service = audio_service
+        # Output directories already created by this exporter, so batch exports skip the mkdir
+        self._ready_dirs: Set[Path] = set()
+        self.output_dir = Path(output_dir).resolve() if output_dir else None
+        if self.output_dir is not None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._ready_dirs.add(self.output_dir)
+        logger.info(f"GenankiExporter initialized. Audio storage path: {self.storage_path}")
+
+    def _generate_stable_id(self, base_string: str, salt: str) -> int:
+        """
+        Generates a stable, positive 31-bit integer ID from a string.
+        Ensures the same input string always produces the same ID.
+
+        Kept for compatibility; internal callers use the memoized _stable_id directly.
+        """
+        return _stable_id(base_string, salt)
+
+    def _get_language_name(self, lang_code: LanguageCode, default: str) -> str:
+        """Safely get the full language name from the code."""
+        return _LANG_GET(lang_code, default)
+
+    def _get_or_create_card_model(self, lang_pair: LanguagePair) -> "genanki.Model":
+        """
+        Creates or retrieves a shared genanki.Model for a specific language pair.
+
+        Generates stable, unique model IDs based on the language pair.
+        Dynamically sets field names (e.g., "German", "English").
+
+        Args:
+            lang_pair: A tuple (source_lang_code, target_lang_code).
+
+        Returns:
+            A genanki.Model instance for the given language pair.
+        """
+        if lang_pair in self._model_cache:
+            return self._model_cache[lang_pair]
+
+        import genanki
+
+        source_lang_code, target_lang_code = lang_pair
+        source_lang_name = self._get_language_name(source_lang_code, DEFAULT_SOURCE_LANG_NAME)
+        target_lang_name = self._get_language_name(target_lang_code, DEFAULT_TARGET_LANG_NAME)
+
+        # Generate a unique, stable model ID based on the language pair
+        model_id_str = f"{source_lang_code}-{target_lang_code}"
+        model_id = _stable_id(model_id_str, DEFAULT_MODEL_ID_SALT)
+
+        model_name = f'Language Card ({source_lang_name} -> {target_lang_name})'
+        logger.info(f"Creating new Anki model for {source_lang_name} -> {target_lang_name} (ID: {model_id})")
+
+        # Define fields dynamically
+        field_names = [
+            source_lang_name,       # Field 0: Source language text (e.g., "German")
+            target_lang_name,       # Field 1: Target language text (e.g., "English")
+            "WordBreakdown",        # Field 2: Analysis of words
+            "Audio",                # Field 3: Pronunciation
+            "GrammarNotes",         # Field 4: Grammar explanations
+            "Tags",                 # Field 5: Metadata tags
+            "SentenceId",           # Field 6: Unique ID for the source sentence (often hidden)
+            "SourceLangCode",       # Field 7: Hidden field for source language code
+            "TargetLangCode",       # Field 8: Hidden field for target language code
+        ]
+        fields = [{'name': name} for name in field_names]
+
+        # Define templates
+        front_template, back_template = _card_templates(source_lang_name, target_lang_name)
+        templates = [
+            {
+                'name': f'{source_lang_name} -> {target_lang_name}',
+                'qfmt': front_template,
+                'afmt': back_template,
+            },
+            # Optional: Add a reverse card template if desired
+            # {
+            #     'name': f'{target_lang_name} -> {source_lang_name}',
+            #     'qfmt': _card_templates(target_lang_name, source_lang_name)[0], # Swap languages
+            #     'afmt': _card_templates(target_lang_name, source_lang_name)[1], # Swap languages
+            # },
+        ]
+
+        # Create the model
+        model = genanki.Model(
+            model_id=model_id,
+            name=model_name,
+            fields=fields,
+            templates=templates,
+            css=_MINIFIED_CARD_CSS,
+            # sortf = 0 # Sort by the first field (Source Language Text)
+        )
+
+        self._model_cache[lang_pair] = model
+        return model
+
     async def export_deck(
         self,
         deck: Deck,
@@ -461,27 +654,24 @@ class GenankiExporter(DeckExporter):
             logger.error(f"Failed to create/get card model for {lang_pair}: {e}", exc_info=True)
             return None
 
+        # Fill in missing audio first so it is packaged with the deck
+        if self.audio_service is not None:
+            await self._generate_missing_audio(deck)
+
         # Create genanki deck
+        import genanki
         anki_deck = genanki.Deck(deck_id=deck_id, name=deck.name)
 
-        # Convert each card and add to deck, collecting media files
-        media_filenames: Set[str] = set()
-        successful_cards = 0
-        failed_cards = 0
-
-        for i, card in enumerate(deck.cards):
-            try:
-                note = self._convert_card_to_note(card, card_model, lang_pair)
-                anki_deck.add_note(note)
-                successful_cards += 1
+        # Optionally format all fields up front in worker processes
+        prebuilt_fields = None
+        if self.max_workers and self.max_workers > 1 and len(deck.cards) >= PARALLEL_EXPORT_MIN_CARDS:
+            prebuilt_fields = await self._format_fields_in_pool(deck.cards, lang_pair, deck_id)
 
-                # Collect media files (audio) if present
-                if card.audio and card.audio.filename:
-                    media_filenames.add(card.audio.filename)
-            except Exception as e:
-                failed_cards += 1
-                logger.error(f"Failed to convert card {i+1}/{len(deck.cards)} (Sentence: '{card.sentence.text[:50]}...'): {e}", exc_info=True)
-                # Continue processing other cards
+        # Convert each card and add to deck, collecting media files
+        successful_cards, media_filenames, note_digests = self._build_deck(
+            deck, anki_deck, card_model, lang_pair, prebuilt_fields
+        )
+        failed_cards = len(deck.cards) - successful_cards
 
         if successful_cards == 0:
              logger.error(f"All cards failed conversion for deck '{deck.name}'. Check logs.")
@@ -493,30 +683,291 @@ class GenankiExporter(DeckExporter):
         logger.info(f"Successfully converted {successful_cards} cards for deck '{deck.name}'. {failed_cards} failed.")
 
         # Create package
-        package = genanki.Package(anki_deck)
+        package = _PrefetchedMediaPackage(anki_deck)
+        resolved_media: List[str] = []
 
         # Resolve and add media files if any exist
         if media_filenames:
-            resolved_media = self._resolve_media_paths(list(media_filenames))
+            # Existence checks are blocking stat calls; run the batch off the event loop
+            resolved_media = await asyncio.to_thread(self._resolve_media_paths, media_filenames.keys())
             if resolved_media:
                 package.media_files = resolved_media
                 logger.info(f"Adding {len(resolved_media)} media file(s) to the package.")
             else:
                  logger.warning("No valid media files found or resolved despite filenames being present.")
 
+        output_file = self._resolve_output_file(output_path)
+        output_str = str(output_file)
+        manifest_path = output_file.with_suffix(EXPORT_MANIFEST_SUFFIX)
+        manifest = {
+            "deck_id": deck_id,
+            "model": self._model_digest(card_model),
+            "media": sorted(Path(p).name for p in resolved_media),
+            "notes": note_digests,
+        }
+
+        # Skip rewriting the package if nothing changed since the last export
+        previous_manifest = self._load_export_manifest(manifest_path)
+        if previous_manifest == manifest and output_file.is_file():
+            logger.info(f"Deck '{deck.name}' is unchanged since the last export. Reusing {output_file}")
+            self._on_progress(100.0, "Complete!")
+            return output_str
+        if previous_manifest:
+            previous_notes = previous_manifest.get("notes", {})
+            changed = sum(1 for guid, digest in note_digests.items() if previous_notes.get(guid) != digest)
+            logger.info(f"{changed} of {len(note_digests)} note(s) changed since the last export.")
+
+        # Read media concurrently so disk latency overlaps instead of serializing inside the zip write
+        if resolved_media:
+            package.media_data = await self._read_media_files(resolved_media)
+
         # Ensure output directory exists and write .apkg file
+        self._on_progress(95.0, "Creating .apkg file...")
+        output_dir = output_file.parent
         try:
-            output_file = Path(output_path).resolve()
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            package.write_to_file(str(output_file))
+            if output_dir not in self._ready_dirs:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                self._ready_dirs.add(output_dir)
+            # Building the collection SQLite and zipping media is blocking work; keep
+            # the event loop free for other decks and requests meanwhile
+            await asyncio.to_thread(package.write_to_file, output_str)
             logger.info(f"✅ Anki package successfully created: {output_file}")
-            return str(output_file)
         except Exception as e:
+            # The directory may have been removed since it was created; check it again next time
+            self._ready_dirs.discard(output_dir)
             logger.error(f"Failed to write .apkg file to {output_path}: {e}", exc_info=True)
             return None
 
+        self._save_export_manifest(manifest_path, manifest)
+        self._on_progress(100.0, "Complete!")
+        return output_str
+
+    def _resolve_output_file(self, output_path: str) -> Path:
+        """
+        Resolves where the .apkg is written.
+
+        Relative paths go under `output_dir` when one is configured (already resolved
+        in __init__); anything else is resolved against the working directory.
+        """
+        path = Path(output_path)
+        if self.output_dir is not None and not path.is_absolute():
+            return self.output_dir / path
+        return path.resolve()
 
-    def _convert_card_to_note(self, card: FlashCard, model: genanki.Model, lang_pair: LanguagePair) -> genanki.Note:
+    def _build_deck(
+        self,
+        deck: Deck,
+        anki_deck: "genanki.Deck",
+        card_model: "genanki.Model",
+        lang_pair: LanguagePair,
+        prebuilt_fields: Optional[List] = None
+    ) -> Tuple[int, Dict[str, None], Dict[str, str]]:
+        """
+        Converts every card in the deck to a note and adds it to the genanki deck.
+
+        Cards that fail conversion are logged and skipped. `prebuilt_fields`, from
+        _format_fields_in_pool, holds per-card fields (or formatting errors) computed
+        ahead of time; cards are formatted here otherwise.
+
+        Returns:
+            A tuple of (number of notes added, media filenames referenced by the
+            added notes in first-seen order, content digest per added note keyed
+            by note GUID).
+        """
+        media_filenames: Dict[str, None] = {} # Ordered set: first-seen order keeps packages reproducible
+        note_digests: Dict[str, str] = {}
+
+        # Looked up once per deck; interned so every note's sort field shares one string
+        source_lang_name = sys.intern(self._get_language_name(lang_pair[0], DEFAULT_SOURCE_LANG_NAME))
+
+        total_cards = len(deck.cards)
+        progress_step = max(1, total_cards // PROGRESS_REPORTS_PER_DECK)
+        deck_id = anki_deck.deck_id
+
+        # Bound once; the generator below runs per card
+        format_fields = self._format_note_fields
+        convert = self._convert_card_to_note
+        note_digest = self._note_digest
+        add_media = media_filenames.setdefault
+
+        def converted_notes():
+            """Yields a note per successfully converted card, recording its digest and media."""
+            for i, card in enumerate(deck.cards):
+                if (i + 1) % progress_step == 0 or i == total_cards - 1:
+                    self._on_progress((i + 1) / total_cards * CARD_PROGRESS_SHARE, f"Processing card {i+1}/{total_cards}")
+                try:
+                    fields = prebuilt_fields[i] if prebuilt_fields else None
+                    if fields is None:
+                        fields = format_fields(card, lang_pair, _fallback_sentence_id(deck_id, i))
+                    elif isinstance(fields, Exception):
+                        raise fields
+                    note = convert(card, card_model, lang_pair, fields, source_lang_name)
+                    note_digests[note.guid] = note_digest(note)
+                except Exception as e:
+                    logger.error(f"Failed to convert card {i+1}/{total_cards} (Sentence: '{card.sentence.text[:50]}...'): {e}", exc_info=True)
+                    continue # Continue processing other cards
+
+                # Collect media files (audio) if present
+                audio = card.audio
+                if audio and audio.filename:
+                    add_media(audio.filename)
+                yield note
+
+        # genanki.Deck.add_note only appends to Deck.notes, so feed the list in one extend
+        notes_before = len(anki_deck.notes)
+        anki_deck.notes.extend(converted_notes())
+        successful_cards = len(anki_deck.notes) - notes_before
+
+        return successful_cards, media_filenames, note_digests
+
+    async def _generate_missing_audio(self, deck: Deck) -> None:
+        """
+        Generates audio for cards without any, with bounded concurrency so network
+        round-trips overlap. Audio is saved to `storage_path` and attached to the card;
+        cards whose audio fails are exported without it.
+        """
+        cards = [card for card in deck.cards if not card.audio]
+        if not cards:
+            return
+
+        logger.info(f"Generating audio for {len(cards)} card(s) in deck '{deck.name}'.")
+        semaphore = asyncio.Semaphore(min(len(cards), AUDIO_GENERATION_CONCURRENCY))
+
+        async def generate(card: FlashCard) -> None:
+            language = card.sentence.language or deck.language_pair[0]
+            async with semaphore:
+                audio, data = await self.audio_service.generate_audio(text=card.sentence.text, language=language)
+            if not (audio and data):
+                logger.warning(f"Audio generation skipped or failed for sentence: '{card.sentence.text[:50]}'")
+                return
+            await asyncio.to_thread(self._store_audio, audio.filename, data)
+            audio.language = language
+            card.audio = audio
+
+        results = await asyncio.gather(*(generate(card) for card in cards), return_exceptions=True)
+        for card, result in zip(cards, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to generate audio for sentence '{card.sentence.text[:50]}': {result}")
+
+    def _store_audio(self, filename: str, data: bytes) -> None:
+        """Writes generated audio under `storage_path`, where media resolution looks for it."""
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        (self.storage_path / os.path.basename(filename)).write_bytes(data)
+
+    def _on_progress(self, percent: float, message: str) -> None:
+        """
+        Progress hook called at batched points during export.
+
+        Forwards to progress_callback when one was given. Subclasses can
+        override this to report progress elsewhere.
+        """
+        if self.progress_callback:
+            self.progress_callback(percent, message)
+
+    async def _read_media_files(self, paths: List[str]) -> Dict[str, bytes]:
+        """
+        Reads media files concurrently in worker threads.
+
+        Files that cannot be read are left out; the package then falls back to
+        reading them from disk itself, surfacing the error at write time.
+        """
+        semaphore = asyncio.Semaphore(min(len(paths), MEDIA_PREFETCH_CONCURRENCY))
+
+        async def read(path: str) -> Tuple[str, Optional[bytes]]:
+            async with semaphore:
+                try:
+                    return path, await asyncio.to_thread(Path(path).read_bytes)
+                except OSError as e:
+                    logger.warning(f"Could not prefetch media file {path}: {e}")
+                    return path, None
+
+        results = await asyncio.gather(*(read(path) for path in paths))
+        return {path: data for path, data in results if data is not None}
+
+    def _note_digest(self, note: "genanki.Note") -> str:
+        """Content hash of a note's fields and tags, used to detect changes between exports."""
+        digest = _DIGEST_SEED.copy()
+        digest.update(repr((note.fields, note.tags)).encode())
+        return digest.hexdigest()
+
+    def _model_digest(self, model: "genanki.Model") -> str:
+        """Content hash of a model's fields, templates and styling."""
+        return hashlib.blake2b(repr((model.model_id, model.fields, model.templates, model.css)).encode(), digest_size=16).hexdigest()
+
+    def _load_export_manifest(self, manifest_path: Path) -> Optional[dict]:
+        """Loads the manifest from a previous export, or None if missing or unreadable."""
+        try:
+            data = manifest_path.read_bytes()
+            return orjson.loads(data) if orjson else json.loads(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable export manifest {manifest_path}: {e}")
+            return None
+
+    def _save_export_manifest(self, manifest_path: Path, manifest: dict) -> None:
+        """Writes the export manifest. Failure only costs a full rewrite next time."""
+        try:
+            data = orjson.dumps(manifest) if orjson else json.dumps(manifest).encode("utf-8")
+            manifest_path.write_bytes(data)
+        except OSError as e:
+            logger.warning(f"Could not write export manifest {manifest_path}: {e}")
+
+
+    async def _format_fields_in_pool(
+        self,
+        cards: List[FlashCard],
+        lang_pair: LanguagePair,
+        deck_id: Optional[int] = None
+    ) -> Optional[List]:
+        """
+        Formats note fields for all cards across worker processes.
+
+        The deck is split into a few slices per worker and each slice is submitted with
+        run_in_executor, so the event loop keeps running while the workers format.
+        Cards without a sentence ID get the same positional fallback ID as the serial path.
+
+        Returns:
+            A list aligned with `cards` holding either the field list or the
+            exception raised while formatting that card, or None if the pool
+            could not be used (callers then format serially).
+        """
+        chunksize = max(1, len(cards) // (self.max_workers * 4))
+        fallback_ids = [_fallback_sentence_id(deck_id, i) for i in range(len(cards))]
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, _format_fields_chunk, cards[start:start + chunksize], lang_pair, fallback_ids[start:start + chunksize]
+                )
+                for start in range(0, len(cards), chunksize)
+            ))
+        except Exception as e:
+            logger.warning(f"Parallel field formatting unavailable, falling back to serial export: {e}")
+            return None
+        finally:
+            # Workers are idle by now; don't block the loop joining them
+            pool.shutdown(wait=False, cancel_futures=True)
+        return list(itertools.chain.from_iterable(chunks))
+
+    def _format_note_fields(
+        self,
+        card: FlashCard,
+        lang_pair: LanguagePair,
+        fallback_id: Optional[str] = None
+    ) -> List[str]:
+        """Builds the note field values for a card, in the order defined by the model."""
+        return _format_note_fields(card, lang_pair, fallback_id)
+
+    def _convert_card_to_note(
+        self,
+        card: FlashCard,
+        model: "genanki.Model",
+        lang_pair: LanguagePair,
+        fields_data: Optional[List[str]] = None,
+        source_lang_name: Optional[str] = None
+    ) -> "genanki.Note":
         """
         Convert a FlashCard domain model to a genanki Note using the specified model.
 
@@ -524,37 +975,32 @@ class GenankiExporter(DeckExporter):
             card: The FlashCard to convert.
             model: The genanki.Model (Note Type) to use.
             lang_pair: Tuple of (source_lang_code, target_lang_code).
+            fields_data: Pre-formatted field values; formatted here if not provided.
+            source_lang_name: Source language name used as the sort field; looked up
+                here if not provided.
 
         Returns:
             A genanki.Note instance.
         """
-        source_lang_code, target_lang_code = lang_pair
-        source_lang_name = self._get_language_name(source_lang_code, DEFAULT_SOURCE_LANG_NAME)
-        target_lang_name = self._get_language_name(target_lang_code, DEFAULT_TARGET_LANG_NAME)
+        import genanki
 
-        # Prepare field data in the exact order defined in the model
-        fields_data = [
-            card.sentence.text,                             # Field 0: Source Language Text
-            card.translation.text,                          # Field 1: Target Language Text
-            self._format_word_breakdown(card, lang_pair),   # Field 2: WordBreakdown
-            self._format_audio_field(card),                 # Field 3: Audio
-            self._format_grammar_notes(card),               # Field 4: GrammarNotes
-            " ".join(card.tags) if card.tags else "",      # Field 5: Tags
-            card.sentence.id or str(uuid.uuid4()),          # Field 6: SentenceId (fallback to new UUID)
-            source_lang_code,                               # Field 7: SourceLangCode (hidden)
-            target_lang_code,                               # Field 8: TargetLangCode (hidden)
-        ]
+        if source_lang_name is None:
+            source_lang_name = self._get_language_name(lang_pair[0], DEFAULT_SOURCE_LANG_NAME)
+
+        if fields_data is None:
+            fields_data = self._format_note_fields(card, lang_pair)
 
         # Generate a stable GUID for the note
-        # Uses the Sentence ID and the Model ID to ensure uniqueness across note types
-        note_guid = genanki.guid_for(card.sentence.id, model.model_id)
+        # Uses the Sentence ID (or its fallback in the SentenceId field) and the Model ID
+        # to ensure uniqueness across note types
+        note_guid = genanki.guid_for(card.sentence.id or fields_data[6], model.model_id)
 
         # Create the genanki Note
         note = genanki.Note(
             model=model,
             fields=fields_data,
             sort_field=source_lang_name, # Usually sort by the source text field
-            tags=card.tags if card.tags else [],
+            tags=card.tags or (), # genanki copies tags into its own list; no empty list needed
             guid=note_guid
         )
 
@@ -562,74 +1008,184 @@ class GenankiExporter(DeckExporter):
 
     def _format_word_breakdown(self, card: FlashCard, lang_pair: LanguagePair) -> str:
         """Formats the word breakdown list into HTML for Anki."""
-        if not card.word_breakdown or not card.word_breakdown.words:
-            return ""
-
-        source_lang_code, target_lang_code = lang_pair
-        lines = []
-        for word in card.word_breakdown.words:
-            # Word (POS): Target Definition
-            line = f"<b>{word.text}</b> <span class='pos'>({word.pos})</span>: <span class='definition-target'>{word.definition}</span>"
-            lines.append(line)
-
-            # Add native definition if available
-            if word.definition_native:
-                native_line = f"<span class='definition-native'>({source_lang_code}: {word.definition_native})</span>"
-                lines.append(native_line)
-
-        return "<br>".join(lines)
+        return _format_word_breakdown(card, lang_pair)
 
     def _format_grammar_notes(self, card: FlashCard) -> str:
         """Formats grammar notes into HTML for Anki."""
-        if not card.grammar_notes:
-            return ""
-
-        lines = ["<ul>"] # Use an unordered list
-        for note in card.grammar_notes:
-            line = f"<li><strong>{note.title}:</strong> {note.explanation}"
-            # Add examples if present, formatted as a sub-list or indented text
-            if note.examples:
-                examples_html = "".join([f"<em> - {ex}</em><br>" for ex in note.examples])
-                line += f"<br>{examples_html}"
-            line += "</li>"
-            lines.append(line)
-        lines.append("</ul>")
-
-        return "".join(lines) # Join without separators as HTML takes care of it
+        return _format_grammar_notes(card)
 
     def _format_audio_field(self, card: FlashCard) -> str:
         """Formats the audio filename for Anki's [sound:] tag."""
-        if not card.audio or not card.audio.filename:
-            return ""
-        # Basic sanitization - ensure no path characters are in the filename for the tag
-        safe_filename = Path(card.audio.filename).name
-        return f"[sound:{safe_filename}]"
+        return _format_audio_field(card)
 
     def _generate_stable_deck_id(self, deck_name: str, lang_pair: LanguagePair) -> int:
         """Generates a stable deck ID based on name and language pair."""
         id_str = f"{deck_name}-{lang_pair[0]}-{lang_pair[1]}"
-        return self._generate_stable_id(id_str, DEFAULT_DECK_ID_SALT)
+        return _stable_id(id_str, DEFAULT_DECK_ID_SALT)
 
-    def _resolve_media_paths(self, filenames: List[str]) -> List[str]:
+    def _resolve_media_paths(self, filenames: Iterable[str]) -> List[str]:
         """
         Resolves relative audio filenames to absolute paths based on storage_path.
 
         Args:
-            filenames: A list of audio filenames (e.g., "hash123.mp3").
+            filenames: Audio filenames (e.g., "hash123.mp3"), in package order.
 
         Returns:
             A list of absolute paths to existing audio files.
         """
+        # One directory listing instead of a stat call per file
+        try:
+            with os.scandir(self.storage_path) as entries:
+                present = {entry.name for entry in entries if entry.is_file()}
+        except OSError as e:
+            logger.warning(f"Could not list audio storage directory {self.storage_path}: {e}")
+            present = set()
+
+        # Plain string joins; building a Path per file costs more than the lookup itself
+        storage_dir = str(self.storage_path)
+        basename = os.path.basename
+        join = os.path.join
         resolved_paths = []
-        for filename in filenames:
+        missing = []
+        for filename in dict.fromkeys(filenames): # Deduplicated, order kept
             if not filename: continue # Skip empty filenames
             # Ensure we only use the filename part, not potential relative paths
-            base_filename = Path(filename).name
-            file_path = self.storage_path / base_filename
-            if file_path.is_file(): # Check if it's actually a file
-                resolved_paths.append(str(file_path))
+            base_filename = basename(filename)
+            if base_filename in present: # Listed as a regular file
+                resolved_paths.append(join(storage_dir, base_filename))
             else:
-                logger.warning(f"Audio file not found or is not a file: {file_path}")
+                missing.append(base_filename)
+
+        # One summary line rather than a log record per missing file
+        if missing:
+            shown = ", ".join(missing[:MISSING_MEDIA_LOG_LIMIT])
+            more = len(missing) - MISSING_MEDIA_LOG_LIMIT
+            logger.warning(
+                f"{len(missing)} audio file(s) not found in {self.storage_path}: {shown}"
+                + (f" (+{more} more)" if more > 0 else "")
+            )
 
         return resolved_paths
 
+
+def _fallback_sentence_id(deck_id: Optional[int], index: int) -> str:
+    """Deterministic SentenceId for a card without one, from its position in the deck."""
+    return f"auto-{deck_id}-{index}"
+
+# --- Field Formatting ---
+# Module-level so worker processes receive only the card, language pair and fallback
+# ID; pickling the exporter would drag along callbacks and services that can't be pickled
+
+def _format_note_fields(
+    card: FlashCard,
+    lang_pair: LanguagePair,
+    fallback_id: Optional[str] = None
+) -> List[str]:
+    """
+    Builds the note field values for a card, in the order defined by the model.
+
+    `fallback_id` is used as the SentenceId when the sentence has none; exports pass
+    a deterministic per-deck position so re-exports keep the same note identity.
+
+    Pure formatting with no genanki objects involved, so it can run in a worker process.
+    The formatters are deliberately not specialised per deck shape: the optional
+    parts cost one conditional per word or note, which measures within noise.
+    """
+    source_lang_code, target_lang_code = lang_pair
+    sentence = card.sentence
+    tags = card.tags
+    return [
+        sentence.text,                                  # Field 0: Source Language Text
+        card.translation.text,                          # Field 1: Target Language Text
+        _format_word_breakdown(card, lang_pair),        # Field 2: WordBreakdown
+        _format_audio_field(card),                      # Field 3: Audio
+        _format_grammar_notes(card),                    # Field 4: GrammarNotes
+        _tag_string(tuple(tags)) if tags else "",       # Field 5: Tags
+        sentence.id or fallback_id or str(uuid.uuid4()), # Field 6: SentenceId (fallback to position, then new UUID)
+        source_lang_code,                               # Field 7: SourceLangCode (hidden)
+        target_lang_code,                               # Field 8: TargetLangCode (hidden)
+    ]
+
+def _format_word_breakdown(card: FlashCard, lang_pair: LanguagePair) -> str:
+    """Formats the word breakdown list into HTML for Anki."""
+    word_breakdown = card.word_breakdown
+    words = word_breakdown.words if word_breakdown else None
+    if not words:
+        return ""
+
+    escape = _HTML_ESCAPE
+    native_open = _NATIVE_OPEN + lang_pair[0] + ": "
+    parts: List[str] = []
+    append = parts.append
+    for word in words:
+        # Word (POS): Target Definition
+        append("<br>")
+        append(_WORD_OPEN)
+        append(word.text.translate(escape))
+        append(_WORD_POS)
+        append(word.pos.translate(escape))
+        append(_WORD_DEFINITION)
+        append(word.definition.translate(escape))
+        append(_SPAN_CLOSE)
+
+        # Add native definition if available
+        definition_native = word.definition_native
+        if definition_native:
+            append(native_open)
+            append(definition_native.translate(escape))
+            append(_NATIVE_CLOSE)
+
+    return "".join(parts[1:]) # Drop the leading separator
+
+def _format_grammar_notes(card: FlashCard) -> str:
+    """Formats grammar notes into HTML for Anki."""
+    grammar_notes = card.grammar_notes
+    if not grammar_notes:
+        return ""
+
+    escape = _HTML_ESCAPE
+    parts: List[str] = ["<ul>"] # Use an unordered list
+    append = parts.append
+    for note in grammar_notes:
+        append(_GRAMMAR_TITLE)
+        append(note.title.translate(escape))
+        append(_GRAMMAR_EXPLANATION)
+        append(note.explanation.translate(escape))
+        # Add examples if present, formatted as indented lines
+        examples = note.examples
+        if examples:
+            append("<br>")
+            for ex in examples:
+                append(_GRAMMAR_EXAMPLE_OPEN)
+                append(ex.translate(escape))
+                append(_GRAMMAR_EXAMPLE_CLOSE)
+        append("</li>")
+    append("</ul>")
+
+    return "".join(parts) # No separators needed, HTML takes care of layout
+
+def _format_audio_field(card: FlashCard) -> str:
+    """Formats the audio filename for Anki's [sound:] tag."""
+    audio = card.audio
+    filename = audio.filename if audio else None
+    if not filename:
+        return ""
+    # Basic sanitization - ensure no path characters are in the filename for the tag.
+    # Generated filenames are already bare, so only build a Path when there is a separator.
+    safe_filename = filename if "/" not in filename and "\\" not in filename else Path(filename).name
+    return f"[sound:{safe_filename}]"
+
+def _format_fields_safely(
+    card: FlashCard,
+    lang_pair: LanguagePair,
+    fallback_id: Optional[str] = None
+):
+    """Returns the card's fields, or the exception raised formatting them."""
+    try:
+        return _format_note_fields(card, lang_pair, fallback_id)
+    except Exception as e:
+        return e
+
+def _format_fields_chunk(cards: List[FlashCard], lang_pair: LanguagePair, fallback_ids: List[str]) -> List:
+    """Worker entry point: formats a slice of the deck, one result per card."""
+    return [_format_fields_safely(card, lang_pair, fallback_id) for card, fallback_id in zip(cards, fallback_ids)]
@@ -2,25 +2,71 @@
 from google.cloud import texttospeech_v1 as tts
 from core.domain.interfaces import AudioService
 from core.domain.models import AudioFile, AudioFormat
+import asyncio
+import functools
 import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
 from typing import Tuple, Dict, Optional
 
+logger = logging.getLogger(__name__)
+
+# Synthesized clips kept in memory per adapter, keyed by (language, text, format)
+AUDIO_CACHE_SIZE = 256
+# Synthesis requests in flight at once; a deck generated with asyncio.gather would
+# otherwise fire one request per sentence and run into the per-minute quota
+TTS_MAX_CONCURRENCY = 16
+# Initialised once and copied per filename; copy() skips blake2b's parameter setup
+_FILENAME_HASH_SEED = hashlib.blake2b(digest_size=16)
+
+# Request protos that depend only on the voice or the format are built once and
+# shared; they are never mutated, and the request copies them in when built.
+@functools.lru_cache(maxsize=16)
+def _voice_params(language_code: str, voice_name: str) -> tts.VoiceSelectionParams:
+    return tts.VoiceSelectionParams(language_code=language_code, name=voice_name)
+
+@functools.lru_cache(maxsize=16)
+def _audio_config(format: AudioFormat) -> tts.AudioConfig:
+    return tts.AudioConfig(
+        audio_encoding=tts.AudioEncoding.MP3 if format == AudioFormat.MP3 else tts.AudioEncoding.LINEAR16
+    )
+
 class GoogleTTSAdapter(AudioService):
     """Google Cloud Text-to-Speech adapter supporting multiple languages."""
 
-    def __init__(self, voice_map: Dict[str, str]):
+    def __init__(
+        self,
+        voice_map: Dict[str, str],
+        storage_path: Optional[str] = None,
+        max_concurrency: int = TTS_MAX_CONCURRENCY
+    ):
         """
         Initializes the adapter.
 
         Args:
             voice_map: A dictionary mapping language codes (e.g., 'fr', 'de')
                        to specific Google TTS voice names (e.g., 'fr-FR-Neural2-A').
+            storage_path: Directory where saved audio files live. When set, audio
+                          already saved there is reused instead of re-synthesized.
+            max_concurrency: Most synthesis requests in flight at once.
         """
-        self.client = tts.TextToSpeechClient()
+        # The async gRPC client binds to the running event loop, so it is created
+        # on first use inside generate_audio rather than here
+        self.client: Optional[tts.TextToSpeechAsyncClient] = None
         self.voice_map = voice_map
         # Define a fallback voice if a language is not found in the map
         self.fallback_voice = "en-US-Standard-C" # Example fallback
         self.fallback_language_code = "en-US" # Example fallback
+        # (API language code, voice name) per language, parsed once since voice_map is fixed
+        self._fallback_voice_entry = (self.fallback_language_code, self.fallback_voice)
+        self._voice_table = self._build_voice_table(voice_map)
+        # Encoded "<language>-" filename-hash prefixes, so only the text is encoded per call
+        self._hash_prefixes: Dict[str, bytes] = {language: f"{language}-".encode() for language in voice_map}
+        self.storage_path = Path(storage_path) if storage_path else None
+        self._audio_cache: "OrderedDict[Tuple[str, str, AudioFormat], bytes]" = OrderedDict()
+        # Cached and stored audio skip this; only calls that reach the API wait on it
+        self._synthesis_slots = asyncio.Semaphore(max_concurrency)
 
 
     async def generate_audio(
@@ -41,60 +87,96 @@ class GoogleTTSAdapter(AudioService):
             A tuple containing the AudioFile model and the audio data bytes,
             or (None, None) if audio generation fails or is skipped.
         """
+        # Filename is derived from content hash + language (blake2b-128: same 32-char
+        # name length as the old md5, and faster for short inputs)
+        prefix = self._hash_prefixes.get(language)
+        if prefix is None:
+            prefix = self._hash_prefixes[language] = f"{language}-".encode()
+        text_hash = _FILENAME_HASH_SEED.copy()
+        text_hash.update(prefix)
+        text_hash.update(text.encode())
+        filename = f"{text_hash.hexdigest()}.{format}"
+
+        # Reuse audio synthesized earlier in this process or saved by a previous run
+        cache_key = (language, text, format)
+        cached = self._audio_cache.get(cache_key)
+        if cached is None:
+            cached = await self._read_stored_audio(filename)
+        if cached is not None:
+            self._remember_audio(cache_key, cached)
+            return self._audio_file(filename, format), cached
+
         try:
             # --- Select Voice and Language Code ---
-            selected_voice_name = self.voice_map.get(language)
-            language_code_for_api = None
-
-            if selected_voice_name:
-                # Extract language code like 'fr-FR' from voice name 'fr-FR-Neural2-A'
-                parts = selected_voice_name.split('-')
-                if len(parts) >= 2:
-                    language_code_for_api = f"{parts[0]}-{parts[1]}"
-                else: # Fallback if voice name format is unexpected
-                     print(f"⚠️ Warning: Could not parse language code from voice '{selected_voice_name}'. Falling back.")
-                     selected_voice_name = self.fallback_voice
-                     language_code_for_api = self.fallback_language_code
-            else:
-                print(f"⚠️ Warning: No voice configured for language '{language}'. Falling back to default English voice.")
-                selected_voice_name = self.fallback_voice
-                language_code_for_api = self.fallback_language_code
+            voice_entry = self._voice_table.get(language)
+            if voice_entry is None:
+                logger.warning("No voice configured for language '%s'. Falling back to default English voice.", language)
+                voice_entry = self._fallback_voice_entry
+            language_code_for_api, selected_voice_name = voice_entry
             # --- End Voice Selection ---
 
             synthesis_input = tts.SynthesisInput(text=text)
-
-            voice = tts.VoiceSelectionParams(
-                language_code=language_code_for_api,
-                name=selected_voice_name
-            )
-
-            audio_config = tts.AudioConfig(
-                audio_encoding=tts.AudioEncoding.MP3 if format == AudioFormat.MP3 else tts.AudioEncoding.LINEAR16
-            )
-
-            response = self.client.synthesize_speech(
-                request = tts.SynthesizeSpeechRequest(
-                    input=synthesis_input,
-                    voice=voice,
-                    audio_config=audio_config
+            voice = _voice_params(language_code_for_api, selected_voice_name)
+            audio_config = _audio_config(format)
+
+            if self.client is None:
+                self.client = tts.TextToSpeechAsyncClient()
+
+            # Awaited, so concurrent generations overlap their network round-trips
+            async with self._synthesis_slots:
+                response = await self.client.synthesize_speech(
+                    request = tts.SynthesizeSpeechRequest(
+                        input=synthesis_input,
+                        voice=voice,
+                        audio_config=audio_config
+                    )
                 )
-            )
 
-            # Generate filename from content hash + language
-            text_hash = hashlib.md5(f"{language}-{text}".encode()).hexdigest()
-            filename = f"{text_hash}.{format.value}"
-
-            audio_file_model = AudioFile(
-                filename=filename,
-                format=format,
-                provider="google-tts",
-                # Store language with the audio file for reference
-                # language=language # Optional: Add language field to AudioFile model if needed
-            )
+            audio_data = response.audio_content
+            self._remember_audio(cache_key, audio_data)
 
             # Return both the model and the raw audio data
-            return audio_file_model, response.audio_content
+            return self._audio_file(filename, format), audio_data
 
         except Exception as e:
-            print(f"❌ Error generating Google TTS audio for language '{language}': {e}")
+            logger.error("Error generating Google TTS audio for language '%s': %s", language, e)
             return None, None # Indicate failure
+
+    def _build_voice_table(self, voice_map: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+        """Maps each language to its (API language code, voice name) pair."""
+        table = {}
+        for language, voice_name in voice_map.items():
+            # Extract language code like 'fr-FR' from voice name 'fr-FR-Neural2-A'
+            parts = voice_name.split('-')
+            if len(parts) >= 2:
+                table[language] = (f"{parts[0]}-{parts[1]}", voice_name)
+            else: # Fallback if voice name format is unexpected
+                logger.warning("Could not parse language code from voice '%s'. Falling back.", voice_name)
+                table[language] = self._fallback_voice_entry
+        return table
+
+    def _audio_file(self, filename: str, format: AudioFormat) -> AudioFile:
+        """Builds a fresh AudioFile model; callers mutate it, so instances are never shared."""
+        return AudioFile(
+            filename=filename,
+            format=format,
+            provider="google-tts",
+            # Store language with the audio file for reference
+            # language=language # Optional: Add language field to AudioFile model if needed
+        )
+
+    def _remember_audio(self, cache_key: Tuple[str, str, AudioFormat], data: bytes) -> None:
+        """Stores audio in the in-memory LRU, evicting the least recently used clip."""
+        self._audio_cache[cache_key] = data
+        self._audio_cache.move_to_end(cache_key)
+        if len(self._audio_cache) > AUDIO_CACHE_SIZE:
+            self._audio_cache.popitem(last=False)
+
+    async def _read_stored_audio(self, filename: str) -> Optional[bytes]:
+        """Returns previously saved audio for this filename, or None if there is none."""
+        if self.storage_path is None:
+            return None
+        try:
+            return await asyncio.to_thread((self.storage_path / filename).read_bytes) or None
+        except OSError:
+            return None
@@ -0,0 +1,37 @@
+# adapters/dictionary/openai_batch_dictionary_adapter.py
+import logging
+import openai
+from typing import Optional
+from core.domain.interfaces import DictionaryService
+from adapters.dictionary.openai_dictionary_adapter import OpenAIDictionaryAdapter
+from adapters.openai_client import BATCH_JOB_COLLECT_WINDOW, BATCH_JOB_POLL_INTERVAL, BatchJobMixin
+
+logger = logging.getLogger(__name__)
+
+class OpenAIBatchDictionaryAdapter(BatchJobMixin, OpenAIDictionaryAdapter):
+    """
+    Dictionary adapter that sends its requests through OpenAI's Batch API.
+
+    Half the cost of synchronous calls, but replies may take up to 24 hours, so this
+    suits offline deck generation. Prompts and parsing are shared with
+    OpenAIDictionaryAdapter; only the transport differs (see BatchJobMixin).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        cache_path: Optional[str] = None,
+        client: Optional[openai.AsyncOpenAI] = None,
+        collect_window: float = BATCH_JOB_COLLECT_WINDOW,
+        poll_interval: float = BATCH_JOB_POLL_INTERVAL
+    ):
+        super().__init__(api_key=api_key, model=model, cache_path=cache_path, client=client)
+        self._init_batch_jobs(collect_window, poll_interval)
+
+    # Batch jobs can't stream; yield the words once the sentence's job completes
+    analyze_sentence_stream = DictionaryService.analyze_sentence_stream
+
+    async def _complete_json(self, prompt: str, **overrides) -> str:
+        """Queues the prompt for the next batch job and returns its reply once the job completes."""
+        return await self._submit_to_batch_job(self._completion_request(prompt, **overrides))
@@ -1,26 +1,164 @@
 # adapters/dictionary/openai_dictionary_adapter.py
+import asyncio
 import openai
+import dataclasses
 import json
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from core.domain.interfaces import DictionaryService
 from core.domain.models import Word, WordBreakdown
+from adapters.openai_client import DynamicBatcher, JsonArrayStream, OPENAI_SEED, ResultCache, get_async_openai_client, loads_json, resolve_in_batches
 
+import atexit
 import logging
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from operator import itemgetter
 from pathlib import Path
 
-# Setup logging
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / "dictionary_adapter.log"
-
 logger = logging.getLogger('DictionaryAdapterLogger')
 logger.setLevel(logging.INFO)
 
-# Prevent duplicate handlers if script is reloaded
-if not logger.handlers:
-    fh = logging.FileHandler(log_file)
-    fh.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-    logger.addHandler(fh)
+_LOG_SETUP_LOCK = threading.Lock()
+
+def _setup_file_logging() -> None:
+    """Attaches the queued file handler to the adapter logger, once per process."""
+    with _LOG_SETUP_LOCK:
+        # Handlers outlive reloads of this module, so they are the "done" marker
+        if any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            return
+        log_dir = Path("logs")
+        log_dir.mkdir(exist_ok=True)
+        fh = logging.FileHandler(log_dir / "dictionary_adapter.log")
+        fh.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        # Coroutines only enqueue records; a listener thread does the file writes, so
+        # disk I/O never blocks the event loop
+        log_queue: queue.Queue = queue.Queue(-1)
+        logger.addHandler(QueueHandler(log_queue))
+        log_listener = QueueListener(log_queue, fh)
+        log_listener.start()
+        atexit.register(log_listener.stop)
+
+_setup_file_logging()
+
+# --- Prompt Templates ---
+# Built once; calls only fill in the {slots} (literal braces are doubled). The
+# per-call input comes last so every request for a language pair shares one prefix
+_WORD_PROMPT = """Analyze the {source_lang} word given at the end.
+
+Provide JSON with:
+{{
+  "lemma": "base form of the word (lemma)",
+  "pos": "part of speech (noun, verb, adj, etc.)",
+  "definition": "concise definition in {target_lang} (max 5-7 words)"
+}}
+
+Word: "{word}\""""
+
+_WORD_BATCH_PROMPT = """Analyze each of the {source_lang} words at the end, given as a JSON array.
+
+Return a JSON object containing a single key "results", which holds an array with one object per word. Each object should have:
+- "index": The position of the word in the input array (starting at 0).
+- "lemma": The base form (lemma) of the word.
+- "pos": The part of speech (noun, verb, adj, etc.).
+- "definition": A concise definition in {target_lang} (max 5-7 words).
+
+Words:
+{items}"""
+
+_SENTENCE_PROMPT = """Analyze each word in the {source_lang} sentence given at the end.
+
+Return a JSON object containing a single key "words", which holds an array. Each object in the array should have:
+- "text": The original word from the sentence.
+- "lemma": The base form (lemma) of the word.
+- "pos": The part of speech (e.g., verb, noun, adj).
+- "definition": A brief definition in {target_lang}.
+- "definition_native": A brief definition in {source_lang} (monolingual).
+
+Example format:
+{{
+  "words": [
+    {{
+      "text": "comprenez",
+      "lemma": "comprendre",
+      "pos": "verb",
+      "definition": "understand",
+      "definition_native": "saisir par l'esprit"
+    }},
+    {{ ... next word ... }}
+  ]
+}}
+
+Skip punctuation marks like commas, periods, quotes, etc.
+
+Sentence:
+"{sentence}\""""
+
+_SENTENCE_BATCH_PROMPT = """Analyze each word in each of the {source_lang} sentences at the end, given as a JSON array.
+
+Return a JSON object containing a single key "results", which holds an array with one object per sentence. Each object should have:
+- "index": The position of the sentence in the input array (starting at 0).
+- "words": An array with one object per word, each having:
+  - "text": The original word from the sentence.
+  - "lemma": The base form (lemma) of the word.
+  - "pos": The part of speech (e.g., verb, noun, adj).
+  - "definition": A brief definition in {target_lang}.
+  - "definition_native": A brief definition in {source_lang} (monolingual).
+
+Skip punctuation marks like commas, periods, quotes, etc.
+
+Sentences:
+{items}"""
+
+# Structured output for single-word lookups: replies are guaranteed to match the
+# schema, and the token cap stops the model from writing more than the three fields
+_WORD_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "word",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "lemma": {"type": "string"},
+                "pos": {"type": "string"},
+                "definition": {"type": "string"}
+            },
+            "required": ["lemma", "pos", "definition"],
+            "additionalProperties": False
+        }
+    }
+}
+_WORD_MAX_TOKENS = 80
+
+def _local_word(word: str) -> Optional[Word]:
+    """
+    Answers tokens without letters (numbers, punctuation, symbols) locally.
+
+    They mean the same in every language, so asking the model about them only
+    costs a round trip. Returns None for anything that needs a real lookup.
+    """
+    token = word.strip()
+    if not token or any(ch.isalpha() for ch in token):
+        return None
+    is_number = token.replace(",", "").replace(".", "").isdigit()
+    return Word(text=word, lemma=token, pos="num" if is_number else "punct", definition=token)
+
+# Reply fields in Word's positional order (text, lemma, pos, definition, definition_native)
+_WORD_FIELDS = itemgetter('text', 'lemma', 'pos', 'definition', 'definition_native')
+
+def _breakdown_from_json(data: dict) -> WordBreakdown:
+    """Rebuilds a cached WordBreakdown from its stored JSON."""
+    return WordBreakdown(words=[Word(**word) for word in data["words"]])
+
+def _intern_pos(pos: Optional[str]) -> Optional[str]:
+    """
+    Interns a part-of-speech tag. A handful of tags ("noun", "verb", ...) repeat
+    across every word of a deck; interned, all those Words share one string each
+    instead of holding the copy the JSON parser made.
+    """
+    return sys.intern(pos) if type(pos) is str else pos
 
 class OpenAIDictionaryAdapter(DictionaryService):
     """
@@ -29,17 +167,59 @@ class OpenAIDictionaryAdapter(DictionaryService):
     in handling different languages.
     """
 
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        cache_path: Optional[str] = None,
+        client: Optional[openai.AsyncOpenAI] = None
+    ):
         """
         Initializes the adapter with the OpenAI API key and desired model.
 
         Args:
             api_key: Your OpenAI API key.
             model: The OpenAI model identifier (e.g., "gpt-4o-mini").
+            cache_path: Optional SQLite file to keep word lookups and sentence analyses in across runs.
+            client: Optional preconfigured AsyncOpenAI client; defaults to the shared one for `api_key`.
         """
-        # Use AsyncOpenAI for compatibility with async use cases
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        # Use AsyncOpenAI for compatibility with async use cases; shared per API key
+        self.client = client or get_async_openai_client(api_key)
         self.model = model
+        # Coalesces concurrent lookup_word() calls per language pair into batched requests
+        self._batchers: Dict[Tuple[str, str], DynamicBatcher] = {}
+        # Likewise for analyze_sentence(), e.g. the cards of a deck generated together
+        self._analysis_batchers: Dict[Tuple[str, str], DynamicBatcher] = {}
+        # Common words repeat across a deck (and, with cache_path, across runs)
+        self._cache: ResultCache[Word] = ResultCache(Word, "word_lookups", path=cache_path)
+        # Repeated sentences (common in subtitles, and in decks rebuilt with cache_path)
+        # are analyzed once; concurrent analyses of one sentence share a request
+        self._analyses: ResultCache[WordBreakdown] = ResultCache(
+            WordBreakdown, "sentence_analyses", path=cache_path, decode=_breakdown_from_json
+        )
+
+    async def aclose(self) -> None:
+        """Stops the batchers' background tasks and closes the cache files; the shared HTTP client is closed separately."""
+        batchers = [*self._batchers.values(), *self._analysis_batchers.values()]
+        self._batchers.clear()
+        self._analysis_batchers.clear()
+        await asyncio.gather(*(batcher.aclose() for batcher in batchers), self._cache.aclose(), self._analyses.aclose())
+
+    def _completion_request(self, prompt: str, **overrides) -> dict:
+        """Chat completion parameters for one JSON-mode prompt; `overrides` replace or add parameters."""
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.3, # Lower temperature for more factual, consistently structured responses
+            "seed": OPENAI_SEED,
+            **overrides
+        }
+
+    async def _complete_json(self, prompt: str, **overrides) -> str:
+        """Sends one JSON-mode chat completion and returns the raw reply."""
+        response = await self.client.chat.completions.create(**self._completion_request(prompt, **overrides))
+        return response.choices[0].message.content
 
     async def lookup_word(
         self,
@@ -58,51 +238,96 @@ class OpenAIDictionaryAdapter(DictionaryService):
         Returns:
             A Word object with details, or None if the lookup fails.
         """
-        prompt = f"""Analyze this {source_lang} word: "{word}"
-
-Provide JSON with:
-{{
-  "lemma": "base form of the word (lemma)",
-  "pos": "part of speech (noun, verb, adj, etc.)",
-  "definition": "concise definition in {target_lang} (max 5-7 words)"
-}}"""
+        local = _local_word(word)
+        if local is not None:
+            return local
+
+        # Case is kept in the key: German "Essen" (meal) and "essen" (to eat) differ
+        key = (word.strip(), source_lang, target_lang, self.model)
+        result = await self._cache.get_or_fetch(key, lambda: self._submit(word, source_lang, target_lang))
+        # Copy with the caller's spelling; the cached entry may have come with other surrounding whitespace
+        return dataclasses.replace(result, text=word) if result is not None else None
+
+    async def _submit(self, word: str, source_lang: str, target_lang: str) -> Optional[Word]:
+        # Concurrent lookups (e.g. every word of a sentence) share one request
+        batcher = self._batchers.get((source_lang, target_lang))
+        if batcher is None:
+            async def run_batch(words: List[str]) -> List[Optional[Word]]:
+                if len(words) == 1:
+                    return [await self._lookup_one(words[0], source_lang, target_lang)]
+                return await resolve_in_batches(
+                    words,
+                    lambda batch: self._lookup_batch(batch, source_lang, target_lang),
+                    lambda single: self._lookup_one(single, source_lang, target_lang)
+                )
+            batcher = self._batchers[(source_lang, target_lang)] = DynamicBatcher(run_batch)
+        return await batcher.submit(word)
+
+    async def _lookup_one(
+        self,
+        word: str,
+        source_lang: str,
+        target_lang: str
+    ) -> Optional[Word]:
+        """Looks up a single word with its own request."""
+        prompt = _WORD_PROMPT.format_map({"source_lang": source_lang, "word": word, "target_lang": target_lang})
 
-        logger.info(f"--- Looking up Word ---")
-        logger.info(f"Word: '{word}', Source: {source_lang}, Target: {target_lang}")
+        logger.info("Looking up word '%s', Source: %s, Target: %s", word, source_lang, target_lang)
 
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.3 # Lower temperature for more factual responses
+            raw_json = await self._complete_json(
+                prompt, response_format=_WORD_RESPONSE_FORMAT, max_tokens=_WORD_MAX_TOKENS
             )
+            logger.debug("Raw API Response (lookup_word): %s", raw_json)
+            data = loads_json(raw_json)
 
-            raw_json = response.choices[0].message.content
-            logger.info(f"Raw API Response (lookup_word): {raw_json}")
-            data = json.loads(raw_json)
-
-            # Basic validation
-            if not all(k in data for k in ['lemma', 'pos', 'definition']):
-                logger.warning(f"Missing expected keys in response for word '{word}'. Response: {data}")
-                return None
-
+            # The schema guarantees all three keys
             return Word(
                 text=word,
-                lemma=data.get('lemma', word), # Fallback lemma to original word
-                pos=data.get('pos', 'unknown'),
+                lemma=data['lemma'] or word, # Fallback lemma to original word
+                pos=data['pos'],
                 definition=data['definition'], # Target language definition
                 definition_native=None # Not requested in this method
             )
 
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response for word '{word}'. Error: {e}\nRaw Response: {raw_json}")
+            logger.error("Failed to parse JSON response for word '%s'. Error: %s\nRaw Response: %s", word, e, raw_json)
             return None
         except Exception as e:
-            logger.error(f"API call failed for word '{word}'. Error: {e}")
+            logger.error("API call failed for word '%s'. Error: %s", word, e)
             return None
 
 
+    async def _lookup_batch(
+        self,
+        words: List[str],
+        source_lang: str,
+        target_lang: str
+    ) -> Dict[int, Word]:
+        """Sends one prompt for several words; returns Words keyed by position in `words`."""
+        prompt = _WORD_BATCH_PROMPT.format_map({"source_lang": source_lang, "items": json.dumps(words, ensure_ascii=False), "target_lang": target_lang})
+
+        logger.info("Looking up %d words (batched)", len(words))
+
+        raw_json = await self._complete_json(prompt)
+        logger.debug("Raw API Response (lookup_word batch): %s", raw_json)
+        data = loads_json(raw_json)
+
+        found: Dict[int, Word] = {}
+        for result in data.get('results', []) if isinstance(data, dict) else []:
+            if not isinstance(result, dict):
+                continue
+            index = result.get('index')
+            if isinstance(index, int) and 0 <= index < len(words) and result.get('definition'):
+                found[index] = Word(
+                    text=words[index],
+                    lemma=result.get('lemma') or words[index], # Fallback lemma to original word
+                    pos=result.get('pos', 'unknown'),
+                    definition=result['definition'], # Target language definition
+                    definition_native=None # Not requested in this method
+                )
+        return found
+
     async def analyze_sentence(
         self,
         sentence: str,
@@ -124,79 +349,183 @@ Provide JSON with:
             A WordBreakdown object containing a list of Word objects.
             Returns an empty WordBreakdown on failure.
         """
-        prompt = f"""Analyze each word in this {source_lang} sentence:
-"{sentence}"
-
-Return a JSON object containing a single key "words", which holds an array. Each object in the array should have:
-- "text": The original word from the sentence.
-- "lemma": The base form (lemma) of the word.
-- "pos": The part of speech (e.g., verb, noun, adj).
-- "definition": A brief definition in {target_lang}.
-- "definition_native": A brief definition in {source_lang} (monolingual).
-
-Example format:
-{{
-  "words": [
-    {{
-      "text": "comprenez",
-      "lemma": "comprendre",
-      "pos": "verb",
-      "definition": "understand",
-      "definition_native": "saisir par l'esprit"
-    }},
-    {{ ... next word ... }}
-  ]
-}}
-
-Skip punctuation marks like commas, periods, quotes, etc."""
+        async def analyze() -> Optional[WordBreakdown]:
+            breakdown = await self._submit_analysis(sentence, source_lang, target_lang)
+            # Failures come back empty; leave those uncached so the next call retries
+            return breakdown if breakdown.words else None
+
+        breakdown = await self._analyses.get_or_fetch((sentence, source_lang, target_lang, self.model), analyze)
+        # Callers sharing a result each get their own word list
+        return WordBreakdown(words=list(breakdown.words) if breakdown is not None else [])
+
+    async def _submit_analysis(self, sentence: str, source_lang: str, target_lang: str) -> WordBreakdown:
+        # Concurrent analyses (e.g. every card of a deck) share batched requests
+        batcher = self._analysis_batchers.get((source_lang, target_lang))
+        if batcher is None:
+            async def run_batch(sentences: List[str]) -> List[WordBreakdown]:
+                if len(sentences) == 1:
+                    return [await self._analyze_one(sentences[0], source_lang, target_lang)]
+                results = await resolve_in_batches(
+                    sentences,
+                    lambda batch: self._analyze_batch(batch, source_lang, target_lang),
+                    lambda single: self._analyze_one(single, source_lang, target_lang)
+                )
+                return [breakdown or WordBreakdown(words=[]) for breakdown in results]
+            batcher = self._analysis_batchers[(source_lang, target_lang)] = DynamicBatcher(run_batch)
+        return await batcher.submit(sentence)
+
+    async def _analyze_one(
+        self,
+        sentence: str,
+        source_lang: str,
+        target_lang: str
+    ) -> WordBreakdown:
+        """Analyzes a single sentence with its own request."""
+        prompt = _SENTENCE_PROMPT.format_map({"source_lang": source_lang, "sentence": sentence, "target_lang": target_lang})
 
-        logger.info(f"--- Analyzing Sentence ---")
-        logger.info(f"Sentence: '{sentence}', Source: {source_lang}, Target: {target_lang}")
+        logger.info("Analyzing sentence '%s', Source: %s, Target: %s", sentence, source_lang, target_lang)
 
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.3 # Lower temperature for more consistent structure
-            )
-
-            raw_json = response.choices[0].message.content
-            logger.info(f"Raw API Response (analyze_sentence): {raw_json}")
+            raw_json = await self._complete_json(prompt)
+            logger.debug("Raw API Response (analyze_sentence): %s", raw_json)
 
             # Attempt to parse the JSON
-            data = json.loads(raw_json)
+            data = loads_json(raw_json)
 
-            # Extract the list of words, expecting it under the "words" key
-            word_list_data = data.get('words', [])
+            # Extract the list of words, expecting it under the "words" key; a bare
+            # array (the model occasionally drops the wrapper) is used as is
+            word_list_data = data if isinstance(data, list) else data.get('words', []) if isinstance(data, dict) else None
 
             if not isinstance(word_list_data, list):
-                 logger.warning(f"Expected a list under 'words' key, but got {type(word_list_data)}. Response: {data}")
+                 logger.warning("Expected a list under 'words' key, but got %s. Response: %s", type(word_list_data), data)
                  word_list_data = [] # Treat as empty list if format is wrong
 
             # Create Word objects from the list
-            words = []
-            for word_data in word_list_data:
-                # Check if it's a dictionary and has the essential 'text' key
-                if isinstance(word_data, dict) and word_data.get('text'):
-                    words.append(
-                        Word(
-                            text=word_data['text'],
-                            lemma=word_data.get('lemma', word_data['text']), # Fallback lemma
-                            pos=word_data.get('pos', 'unknown'),
-                            definition=word_data.get('definition', ''), # Target lang def
-                            definition_native=word_data.get('definition_native', '') # Source lang def
-                        )
-                    )
-                else:
-                    logger.warning(f"Skipping invalid word data item: {word_data}")
+            words = self._parse_words(word_list_data)
 
-            logger.info(f"Successfully parsed {len(words)} words for sentence: '{sentence}'")
+            logger.info("Successfully parsed %d words for sentence: '%s'", len(words), sentence)
             return WordBreakdown(words=words)
 
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response for sentence: '{sentence}'. Error: {e}\nRaw Response: {raw_json}")
+            logger.error("Failed to parse JSON response for sentence: '%s'. Error: %s\nRaw Response: %s", sentence, e, raw_json)
             return WordBreakdown(words=[]) # Return empty breakdown on JSON error
         except Exception as e:
-            logger.error(f"API call or processing failed for sentence: '{sentence}'. Error: {e}")
+            logger.error("API call or processing failed for sentence: '%s'. Error: %s", sentence, e)
             return WordBreakdown(words=[]) # Return empty breakdown on other errors
+
+    async def analyze_sentence_stream(
+        self,
+        sentence: str,
+        source_lang: str,
+        target_lang: str
+    ) -> AsyncIterator[Word]:
+        """
+        Analyzes a sentence like analyze_sentence, but streams the reply and yields
+        each Word as soon as the model has finished writing it.
+
+        For callers that show words as they arrive. Card and deck generation use
+        analyze_sentence instead, whose cached and batched requests cost fewer tokens
+        than a stream per sentence; streamed results are not cached.
+
+        Args:
+            sentence: The sentence to analyze in the source language.
+            source_lang: The language code of the input sentence (e.g., 'fr').
+            target_lang: The language code for the primary definition (e.g., 'en').
+
+        Yields:
+            Word objects in sentence order. Stops early (after logging) on failure.
+        """
+        prompt = _SENTENCE_PROMPT.format_map({"source_lang": source_lang, "sentence": sentence, "target_lang": target_lang})
+
+        logger.info("Streaming analysis of sentence '%s', Source: %s, Target: %s", sentence, source_lang, target_lang)
+
+        parser = JsonArrayStream("words")
+        try:
+            stream = await self.client.chat.completions.create(**self._completion_request(prompt), stream=True)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    for word in self._parse_words(parser.feed(delta)):
+                        yield word
+        except Exception as e:
+            logger.error("Streaming analysis failed for sentence: '%s'. Error: %s", sentence, e)
+
+    async def analyze_sentences_batch(
+        self,
+        sentences: List[str],
+        source_lang: str,
+        target_lang: str
+    ) -> List[WordBreakdown]:
+        """
+        Analyzes several sentences, packing as many as fit into each OpenAI request.
+
+        Args:
+            sentences: The sentences to analyze in the source language.
+            source_lang: The language code of the input sentences (e.g., 'fr').
+            target_lang: The language code for the primary definition (e.g., 'en').
+
+        Returns:
+            One WordBreakdown per sentence, aligned with `sentences`.
+            Sentences that cannot be analyzed get an empty WordBreakdown.
+        """
+        async def fetch_batch(batch: List[str]) -> Dict[int, WordBreakdown]:
+            return await self._analyze_batch(batch, source_lang, target_lang)
+
+        async def fetch_one(sentence: str) -> WordBreakdown:
+            return await self.analyze_sentence(sentence, source_lang, target_lang)
+
+        results = await resolve_in_batches(sentences, fetch_batch, fetch_one)
+        return [breakdown or WordBreakdown(words=[]) for breakdown in results]
+
+    async def _analyze_batch(
+        self,
+        sentences: List[str],
+        source_lang: str,
+        target_lang: str
+    ) -> Dict[int, WordBreakdown]:
+        """Sends one prompt for several sentences; returns breakdowns keyed by position in `sentences`."""
+        prompt = _SENTENCE_BATCH_PROMPT.format_map({"source_lang": source_lang, "items": json.dumps(sentences, ensure_ascii=False), "target_lang": target_lang})
+
+        logger.info("Analyzing %d sentences (batched)", len(sentences))
+
+        raw_json = await self._complete_json(prompt)
+        logger.debug("Raw API Response (analyze_sentences_batch): %s", raw_json)
+        data = loads_json(raw_json)
+
+        breakdowns: Dict[int, WordBreakdown] = {}
+        for result in data.get('results', []) if isinstance(data, dict) else []:
+            if not isinstance(result, dict):
+                continue
+            index = result.get('index')
+            word_list_data = result.get('words')
+            if isinstance(index, int) and 0 <= index < len(sentences) and isinstance(word_list_data, list):
+                breakdowns[index] = WordBreakdown(words=self._parse_words(word_list_data))
+        return breakdowns
+
+    def _parse_words(self, word_list_data: list) -> List[Word]:
+        """Creates Word objects from the API's word list, skipping malformed items."""
+        words = []
+        append = words.append
+        for word_data in word_list_data:
+            # Fast path: every field present, passed positionally in Word's field order
+            try:
+                fields = _WORD_FIELDS(word_data)
+            except (KeyError, TypeError):
+                fields = None
+            if fields is not None and fields[0]:
+                text, lemma, pos, definition, definition_native = fields
+                append(Word(text, lemma, _intern_pos(pos), definition, definition_native))
+            # Check if it's a dictionary and has the essential 'text' key
+            elif isinstance(word_data, dict) and word_data.get('text'):
+                append(
+                    Word(
+                        text=word_data['text'],
+                        lemma=word_data.get('lemma', word_data['text']), # Fallback lemma
+                        pos=_intern_pos(word_data.get('pos', 'unknown')),
+                        definition=word_data.get('definition', ''), # Target lang def
+                        definition_native=word_data.get('definition_native', '') # Source lang def
+                    )
+                )
+            else:
+                logger.warning("Skipping invalid word data item: %s", word_data)
+        return words
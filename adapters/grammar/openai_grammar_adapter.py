@@ -1,33 +1,116 @@
 # adapters/grammar/openai_grammar_adapter.py
+import asyncio
+import dataclasses
 import openai
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional
 from core.domain.interfaces import GrammarService
 from core.domain.models import GrammarNote
+from adapters.openai_client import DynamicBatcher, OPENAI_SEED, ResultCache, get_async_openai_client, loads_json, resolve_in_batches
 import logging
 
 logger = logging.getLogger(__name__)
 
+# --- Prompt Templates ---
+# Built once; calls only fill in the {slots} (literal braces are doubled). The
+# per-call input comes last so every request for a language pair shares one prefix
+_GRAMMAR_PROMPT = """Analyze the {language} sentence given at the end for a language learner.
+
+Identify and explain any notable grammar points, common idioms, metaphors, or cultural nuances present.
+Focus on what would be useful for someone learning {language}.
+If the sentence is grammatically simple, briefly explain the main verb tense or structure.
+
+Return ONLY a JSON object with a single key "notes". The value should be an array of objects, where each object has:
+- "title": A short, descriptive title (e.g., "Verb Tense: Passé Composé", "Idiom: 'Avoir le cafard'").
+- "explanation": A concise explanation tailored for a language learner.
+- "examples": (Optional) An array containing one or two short example sentences demonstrating the point, preferably different from the input sentence.
+
+Example format:
+{{
+  "notes": [
+    {{
+      "title": "Idiom: 'Avoir le cafard'",
+      "explanation": "Means 'to feel down' or 'to have the blues'. Literally 'to have the cockroach'.",
+      "examples": ["Il pleut aujourd'hui, j'ai un peu le cafard."]
+    }},
+    {{
+      "title": "Verb Tense: Présent",
+      "explanation": "'Mange' is the present tense conjugation of the verb 'manger' (to eat) for 'je' (I)."
+    }}
+  ]
+}}
+
+If no particularly notable grammar points or phrases are found, return {{"notes": []}}.
+Do not include any text outside the JSON object.
+
+Sentence:
+"{sentence}"
+"""
+
+_GRAMMAR_BATCH_PROMPT = """Analyze each of the {language} sentences at the end for a language learner. The sentences are given as a JSON array.
+
+For each sentence, identify and explain any notable grammar points, common idioms, metaphors, or cultural nuances present.
+Focus on what would be useful for someone learning {language}.
+If a sentence is grammatically simple, briefly explain the main verb tense or structure.
+
+Return ONLY a JSON object with a single key "results", which holds an array with one object per sentence. Each object should have:
+- "index": The position of the sentence in the input array (starting at 0).
+- "notes": An array of objects, where each object has:
+  - "title": A short, descriptive title (e.g., "Verb Tense: Passé Composé", "Idiom: 'Avoir le cafard'").
+  - "explanation": A concise explanation tailored for a language learner.
+  - "examples": (Optional) An array containing one or two short example sentences demonstrating the point.
+
+Use an empty "notes" array for sentences with nothing notable.
+Do not include any text outside the JSON object.
+
+Sentences:
+{items}
+"""
+
 class OpenAIGrammarAdapter(GrammarService):
     """
     Uses OpenAI's GPT models to analyze a sentence for notable grammar points,
     idioms, metaphors, or cultural phrases relevant to the specified language.
     """
 
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        cache_path: Optional[str] = None,
+        client: Optional[openai.AsyncOpenAI] = None
+    ):
         """
         Initializes the adapter with the OpenAI API key and model.
 
         Args:
             api_key: Your OpenAI API key.
             model: The OpenAI model identifier (e.g., "gpt-4o-mini").
+            cache_path: Optional SQLite file to keep grammar notes in across runs.
+            client: Optional preconfigured AsyncOpenAI client; defaults to the shared one for `api_key`.
         """
         if not api_key:
             raise ValueError("OpenAI API key is required.")
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        # Shared per API key with the other OpenAI adapters
+        self.client = client or get_async_openai_client(api_key)
         self.model = model
+        # Repeated sentences (and, with cache_path, rebuilt decks) are explained once;
+        # concurrent explanations of one sentence share a request
+        self._explanations: ResultCache[List[GrammarNote]] = ResultCache(
+            GrammarNote, "grammar_notes", path=cache_path,
+            encode=lambda notes: [dataclasses.asdict(note) for note in notes],
+            decode=lambda data: [GrammarNote(**note) for note in data]
+        )
+        # Coalesces concurrent explain_grammar() calls per language into batched requests
+        self._batchers: Dict[str, DynamicBatcher] = {}
         logger.info(f"Using OpenAI grammar model: {self.model}")
 
+    async def aclose(self) -> None:
+        """Stops the batchers' background tasks and closes the cache files; the shared HTTP client is closed separately."""
+        batchers = list(self._batchers.values())
+        self._batchers.clear()
+        await asyncio.gather(*(batcher.aclose() for batcher in batchers), self._explanations.aclose())
+
     async def explain_grammar(
         self,
         sentence: str,
@@ -47,37 +130,35 @@ class OpenAIGrammarAdapter(GrammarService):
             logger.warning("Explain_grammar called with empty sentence.")
             return []
 
-        # Construct the prompt using the provided language
-        prompt = f"""Analyze the following {language} sentence for a language learner:
-"{sentence}"
+        async def explain() -> Optional[List[GrammarNote]]:
+            notes = await self._submit(sentence, language)
+            # Failures also come back empty, so only non-empty results are cached
+            return notes or None
 
-Identify and explain any notable grammar points, common idioms, metaphors, or cultural nuances present.
-Focus on what would be useful for someone learning {language}.
-If the sentence is grammatically simple, briefly explain the main verb tense or structure.
-
-Return ONLY a JSON object with a single key "notes". The value should be an array of objects, where each object has:
-- "title": A short, descriptive title (e.g., "Verb Tense: Passé Composé", "Idiom: 'Avoir le cafard'").
-- "explanation": A concise explanation tailored for a language learner.
-- "examples": (Optional) An array containing one or two short example sentences demonstrating the point, preferably different from the input sentence.
+        notes = await self._explanations.get_or_fetch((sentence, language, self.model), explain)
+        # Callers sharing a result each get their own list
+        return list(notes) if notes is not None else []
 
-Example format:
-{{
-  "notes": [
-    {{
-      "title": "Idiom: 'Avoir le cafard'",
-      "explanation": "Means 'to feel down' or 'to have the blues'. Literally 'to have the cockroach'.",
-      "examples": ["Il pleut aujourd'hui, j'ai un peu le cafard."]
-    }},
-    {{
-      "title": "Verb Tense: Présent",
-      "explanation": "'Mange' is the present tense conjugation of the verb 'manger' (to eat) for 'je' (I)."
-    }}
-  ]
-}}
+    async def _submit(self, sentence: str, language: str) -> List[GrammarNote]:
+        # Concurrent explanations (e.g. every card of a deck) share batched requests
+        batcher = self._batchers.get(language)
+        if batcher is None:
+            async def run_batch(sentences: List[str]) -> List[List[GrammarNote]]:
+                if len(sentences) == 1:
+                    return [await self._explain_one(sentences[0], language)]
+                results = await resolve_in_batches(
+                    sentences,
+                    lambda batch: self._explain_batch(batch, language),
+                    lambda single: self._explain_one(single, language)
+                )
+                return [notes or [] for notes in results]
+            batcher = self._batchers[language] = DynamicBatcher(run_batch)
+        return await batcher.submit(sentence)
 
-If no particularly notable grammar points or phrases are found, return {{"notes": []}}.
-Do not include any text outside the JSON object.
-"""
+    async def _explain_one(self, sentence: str, language: str) -> List[GrammarNote]:
+        """Explains a single sentence with its own request."""
+        # Construct the prompt using the provided language
+        prompt = _GRAMMAR_PROMPT.format_map({"language": language, "sentence": sentence})
 
         logger.info(f"Requesting OpenAI grammar analysis ({self.model}) for language '{language}': '{sentence[:50]}...'")
 
@@ -86,13 +167,14 @@ Do not include any text outside the JSON object.
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"},
-                temperature=0.4 # Slightly creative but still factual
+                temperature=0.4, # Slightly creative but still factual
+                seed=OPENAI_SEED
             )
 
             raw_json = response.choices[0].message.content
             logger.debug(f"Raw API Response (explain_grammar): {raw_json}") # Log raw response at debug level
 
-            data = json.loads(raw_json)
+            data = loads_json(raw_json)
 
             # Extract the list from the "notes" key, default to empty list if key missing
             note_list_data = data.get('notes', [])
@@ -102,28 +184,7 @@ Do not include any text outside the JSON object.
                  note_list_data = []
 
             # Process the notes, handling potential malformed entries
-            notes = []
-            for note_data in note_list_data:
-                if isinstance(note_data, dict) and note_data.get('title') and note_data.get('explanation'):
-                    notes.append(
-                        GrammarNote(
-                            title=note_data['title'],
-                            explanation=note_data['explanation'],
-                            examples=note_data.get('examples', []) # Handle optional examples
-                        )
-                    )
-                elif isinstance(note_data, str):
-                     # Handle unexpected case where AI returns list of strings instead of objects
-                    logger.warning(f"Received string instead of object in notes list: '{note_data}'")
-                    notes.append(
-                        GrammarNote(
-                            title="Grammar Note",
-                            explanation=note_data,
-                            examples=[]
-                        )
-                    )
-                else:
-                    logger.warning(f"Skipping invalid grammar note data item: {note_data}")
+            notes = self._parse_notes(note_list_data)
 
             logger.info(f"Successfully generated {len(notes)} grammar notes for sentence: '{sentence[:50]}...'")
             return notes
@@ -137,3 +198,82 @@ Do not include any text outside the JSON object.
         except Exception as e:
             logger.error(f"An unexpected error occurred during grammar analysis: {e}")
             return []
+
+    async def explain_grammar_batch(
+        self,
+        sentences: List[str],
+        language: str
+    ) -> List[List[GrammarNote]]:
+        """
+        Generates grammar explanations for several sentences, packing as many as fit
+        into each OpenAI request.
+
+        Args:
+            sentences: The sentences to analyze.
+            language: The language code of the sentences (e.g., 'fr', 'de').
+
+        Returns:
+            One list of GrammarNote objects per sentence, aligned with `sentences`.
+        """
+        async def fetch_batch(batch: List[str]) -> Dict[int, List[GrammarNote]]:
+            return await self._explain_batch(batch, language)
+
+        async def fetch_one(sentence: str) -> List[GrammarNote]:
+            return await self.explain_grammar(sentence, language)
+
+        results = await resolve_in_batches(sentences, fetch_batch, fetch_one)
+        return [notes or [] for notes in results]
+
+    async def _explain_batch(self, sentences: List[str], language: str) -> Dict[int, List[GrammarNote]]:
+        """Sends one prompt for several sentences; returns notes keyed by position in `sentences`."""
+        prompt = _GRAMMAR_BATCH_PROMPT.format_map({"language": language, "items": json.dumps(sentences, ensure_ascii=False)})
+
+        logger.info(f"Requesting OpenAI grammar analysis ({self.model}) for language '{language}': {len(sentences)} sentences (batched)")
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0.4, # Slightly creative but still factual
+            seed=OPENAI_SEED
+        )
+
+        raw_json = response.choices[0].message.content
+        logger.debug(f"Raw API Response (explain_grammar_batch): {raw_json}")
+        data = loads_json(raw_json)
+
+        notes_by_index: Dict[int, List[GrammarNote]] = {}
+        for result in data.get('results', []) if isinstance(data, dict) else []:
+            if not isinstance(result, dict):
+                continue
+            index = result.get('index')
+            note_list_data = result.get('notes')
+            if isinstance(index, int) and 0 <= index < len(sentences) and isinstance(note_list_data, list):
+                notes_by_index[index] = self._parse_notes(note_list_data)
+        return notes_by_index
+
+    def _parse_notes(self, note_list_data: list) -> List[GrammarNote]:
+        """Creates GrammarNote objects from the API's note list, handling malformed entries."""
+        notes = []
+        for note_data in note_list_data:
+            if isinstance(note_data, dict) and note_data.get('title') and note_data.get('explanation'):
+                notes.append(
+                    GrammarNote(
+                        title=note_data['title'],
+                        explanation=note_data['explanation'],
+                        examples=note_data.get('examples', []) # Handle optional examples
+                    )
+                )
+            elif isinstance(note_data, str):
+                 # Handle unexpected case where AI returns list of strings instead of objects
+                logger.warning(f"Received string instead of object in notes list: '{note_data}'")
+                notes.append(
+                    GrammarNote(
+                        title="Grammar Note",
+                        explanation=note_data,
+                        examples=[]
+                    )
+                )
+            else:
+                logger.warning(f"Skipping invalid grammar note data item: {note_data}")
+        return notes
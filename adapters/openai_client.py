@@ -0,0 +1,724 @@
+# adapters/openai_client.py
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import re
+import sqlite3
+import httpx
+import openai
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
+from core.domain.interfaces import CacheService
+
+try:
+    # Optional: faster parsing of (batched, multi-KB) JSON replies
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def loads_json(raw: str) -> Any:
+    """
+    Parses a JSON reply, with orjson when it is installed.
+
+    Parse errors are json.JSONDecodeError either way (orjson's error subclasses it).
+    """
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+class JsonArrayStream:
+    """
+    Incrementally extracts the items of a JSON array from streamed reply text.
+
+    Feed chunks as they arrive; each call returns the items completed since the last
+    one. The array is the one under `key` in the reply object, or the reply itself
+    when the model sends a bare array. Items are decoded one at a time, as soon as
+    their closing bracket has arrived, so nothing waits for the rest of the reply.
+    """
+
+    def __init__(self, key: str):
+        self._key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._in_array = False
+        self._done = False
+
+    def feed(self, text: str) -> List[Any]:
+        if self._done:
+            return []
+        buffer = self._buffer + text
+        if not self._in_array:
+            stripped = buffer.lstrip()
+            if stripped.startswith("["):
+                buffer = stripped[1:]
+            else:
+                match = self._key_pattern.search(buffer)
+                if match is None:
+                    self._buffer = buffer
+                    return []
+                buffer = buffer[match.end():]
+            self._in_array = True
+        elif "}" not in text and "]" not in text:
+            # No item (or the array) can have been completed by this chunk
+            self._buffer = buffer
+            return []
+
+        items = []
+        pos, end = 0, len(buffer)
+        while True:
+            while pos < end and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= end:
+                break
+            if buffer[pos] == "]":
+                self._done = True
+                break
+            try:
+                item, pos_after = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # The item's text is not complete yet
+            items.append(item)
+            pos = pos_after
+        self._buffer = buffer[pos:]
+        return items
+
+# --- Request Batching ---
+# Estimated input tokens per batched prompt, leaving room for the instructions and
+# a long JSON reply within the model's limits
+BATCH_TOKEN_BUDGET = 1500
+# Upper bound on inputs per batched prompt; long result arrays get less reliable
+BATCH_MAX_ITEMS = 20
+
+# --- Transport ---
+# In-flight requests per client. httpx's pool slows down sharply once hundreds of
+# requests wait on it, so excess requests wait on a semaphore instead and the pool
+# only ever sees as many requests as it has (kept-alive) connections
+OPENAI_MAX_CONCURRENCY = 64
+# Retries for rate-limited (429), 5xx and connection failures. The SDK backs off
+# exponentially with jitter and honours Retry-After, so a throttled burst slows
+# down instead of dropping cards
+OPENAI_MAX_RETRIES = 5
+# Multiplex concurrent requests over fewer connections when httpx's optional `h2`
+# dependency is installed (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+# Idle kept-alive connections are reused for this long (seconds) before being closed,
+# so gaps between a deck's requests don't cost a new TCP+TLS handshake
+OPENAI_KEEPALIVE_EXPIRY = 30.0
+# Fail fast on unreachable hosts; a minute covers even slow batched completions
+OPENAI_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# Fixed sampling seed, so repeated prompts get (best-effort) reproducible replies
+OPENAI_SEED = 42
+
+# Rate limit reset times as OpenAI reports them, e.g. "20ms", "1s", "6m0s", "1h2m3.5s"
+_RESET_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_RESET_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+def _parse_reset(value: str) -> float:
+    """Seconds until a rate limit resets, from an x-ratelimit-reset-* header; 0 if unparseable."""
+    return sum(float(amount) * _RESET_UNIT_SECONDS[unit] for amount, unit in _RESET_PART_RE.findall(value))
+
+class _BoundedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps an httpx transport, admitting at most `limit` requests to it at a time
+    and, with `requests_per_minute`, spacing request starts evenly to stay under it.
+
+    Also follows OpenAI's x-ratelimit-* response headers: once a reply reports no
+    requests or tokens remaining, new requests wait for the reported reset instead
+    of running into 429s and retrying.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        limit: int,
+        requests_per_minute: Optional[int] = None
+    ):
+        self._transport = transport
+        self._semaphore = asyncio.Semaphore(limit)
+        self._interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_start = 0.0
+        # Set from response headers when the account's quota runs out
+        self._paused_until = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        if self._interval or self._paused_until:
+            # Reserve the next free slot, then wait for it (retries count too)
+            now = loop.time()
+            start = max(now, self._next_start, self._paused_until)
+            self._next_start = start + self._interval
+            if start > now:
+                await asyncio.sleep(start - now)
+        # Held until the response headers arrive; chat completion bodies are small
+        # and read straight away, so the connection is back in the pool right after
+        async with self._semaphore:
+            response = await self._transport.handle_async_request(request)
+        self._note_rate_limit(response.headers, loop.time())
+        return response
+
+    def _note_rate_limit(self, headers: httpx.Headers, now: float) -> None:
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None or not remaining.isdigit() or int(remaining) > 0:
+                continue
+            reset = _parse_reset(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            if reset:
+                self._paused_until = max(self._paused_until, now + reset)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+def _build_http_client(
+    max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+    requests_per_minute: Optional[int] = None
+) -> httpx.AsyncClient:
+    """Creates the httpx client used under AsyncOpenAI, with a warm connection per admitted request."""
+    limits = httpx.Limits(
+        max_connections=max_concurrency,
+        max_keepalive_connections=max_concurrency,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+    )
+    transport = _BoundedTransport(
+        httpx.AsyncHTTPTransport(limits=limits, http2=HTTP2_AVAILABLE), max_concurrency, requests_per_minute
+    )
+    return httpx.AsyncClient(transport=transport, timeout=OPENAI_TIMEOUT, follow_redirects=True)
+
+@functools.lru_cache(maxsize=None)
+def get_async_openai_client(
+    api_key: str,
+    max_retries: int = OPENAI_MAX_RETRIES,
+    max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+    requests_per_minute: Optional[int] = None
+) -> openai.AsyncOpenAI:
+    """
+    Returns the shared AsyncOpenAI client for an API key and request limits.
+
+    The translation, dictionary and grammar adapters all talk to the same API, so
+    they share one client (and its connection pool and limits) per key instead of
+    each opening their own connections.
+    """
+    client = openai.AsyncOpenAI(
+        api_key=api_key,
+        max_retries=max_retries,
+        timeout=OPENAI_TIMEOUT,
+        http_client=_build_http_client(max_concurrency, requests_per_minute)
+    )
+    _open_clients.append(client)
+    return client
+
+# Clients handed out by get_async_openai_client, so shutdown can close their pools
+_open_clients: List[openai.AsyncOpenAI] = []
+
+async def aclose_openai_clients() -> None:
+    """
+    Closes every shared AsyncOpenAI client and forgets it.
+
+    Call on the event loop that used the clients (app shutdown, or the end of a CLI
+    command's asyncio.run) so pooled connections are closed rather than left to the
+    garbage collector after the loop is gone. Later calls to get_async_openai_client
+    build fresh clients.
+    """
+    clients = list(_open_clients)
+    _open_clients.clear()
+    get_async_openai_client.cache_clear()
+    for client in clients:
+        await client.close()
+
+@functools.lru_cache(maxsize=10_000)
+def estimate_tokens(text: str) -> int:
+    """
+    Rough prompt token count for a text, for packing batches without a tokenizer.
+
+    Latin-script text averages about 4 characters per token, while CJK and other
+    wide scripts run close to one token per character, so those count individually.
+    Errs high; a batch that still overflows is split by resolve_in_batches.
+    """
+    if text.isascii():
+        return len(text) // 4 + 1
+    wide = sum(1 for ch in text if ch >= "\u2e80")
+    return (len(text) - wide) // 4 + wide + 1
+
+def pack_batches(
+    texts: Sequence[str],
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_items: int = BATCH_MAX_ITEMS
+) -> List[List[int]]:
+    """Groups text indices into consecutive batches within the token and item budgets."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+# Batch failures that smaller batches can fix: an unparseable or malformed reply, or
+# a prompt the API rejected (e.g. too long for the context window)
+_SPLITTABLE_BATCH_ERRORS = (openai.BadRequestError, ValueError, TypeError, KeyError, AttributeError)
+
+async def resolve_in_batches(
+    texts: Sequence[str],
+    fetch_batch: Callable[[List[str]], Awaitable[Dict[int, T]]],
+    fetch_one: Callable[[str], Awaitable[Optional[T]]],
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_items: int = BATCH_MAX_ITEMS
+) -> List[Optional[T]]:
+    """
+    Resolves every text with as few requests as possible.
+
+    `fetch_batch` sends one prompt for several texts and returns results keyed by
+    position within that batch. Texts missing from a batched reply (or a batch whose
+    reply can't be parsed or whose prompt was rejected as too large) are retried in
+    halves, down to `fetch_one` for single texts, so one bad reply never loses the
+    whole batch. Any other error (auth, rate limit, connection, server) is raised
+    as is: splitting would only repeat the refused request many times over.
+    Batches run concurrently.
+    """
+    results: List[Optional[T]] = [None] * len(texts)
+
+    async def resolve(indices: List[int]) -> None:
+        if len(indices) == 1:
+            results[indices[0]] = await fetch_one(texts[indices[0]])
+            return
+        try:
+            found = await fetch_batch([texts[i] for i in indices])
+        except _SPLITTABLE_BATCH_ERRORS as e:
+            logger.warning(f"Batched request for {len(indices)} item(s) failed, splitting: {e}")
+            found = {}
+        missing = []
+        for position, index in enumerate(indices):
+            if position in found:
+                results[index] = found[position]
+            else:
+                missing.append(index)
+        if missing:
+            middle = (len(missing) + 1) // 2
+            halves = [half for half in (missing[:middle], missing[middle:]) if half]
+            await asyncio.gather(*(resolve(half) for half in halves))
+
+    await asyncio.gather(*(resolve(batch) for batch in pack_batches(texts, token_budget, max_items)))
+    return results
+
+# --- Dynamic Batching ---
+# Most single-item calls coalesced into one batched request
+DYNAMIC_BATCH_MAX_SIZE = 32
+# How long a forming batch waits for more concurrent calls before it is sent (seconds)
+DYNAMIC_BATCH_WAIT = 0.01
+
+class DynamicBatcher(Generic[T, R]):
+    """
+    Coalesces concurrent single-item calls into batched requests.
+
+    Callers `await submit(item)` as if making their own request. A background task
+    takes the first queued item; if nothing else is queued it is sent on its own right
+    away, otherwise the batch keeps collecting until it reaches `max_batch_size` or
+    `max_wait` passes. `run_batch` receives the items and returns results aligned
+    with them. Batches run concurrently with the collection of the next one.
+    Call `aclose` on shutdown to stop the background task; callers still waiting
+    are cancelled.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = DYNAMIC_BATCH_MAX_SIZE,
+        max_wait: float = DYNAMIC_BATCH_WAIT
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # The loop only keeps weak references to tasks, so in-flight batches are held here
+        self._running: set = set()
+
+    async def submit(self, item: T) -> R:
+        """Queues one item and waits for its result from whichever batch it lands in."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # Queues and tasks belong to one event loop; start fresh on a new one
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect())
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def aclose(self) -> None:
+        """Stops collecting and cancels running batches along with their waiting callers."""
+        loop, queue, worker = self._loop, self._queue, self._worker
+        self._loop = self._queue = self._worker = None
+        if loop is None or loop is not asyncio.get_running_loop():
+            # Tasks of a finished loop can't be cancelled from here; they died with it
+            self._running.clear()
+            return
+        tasks = [worker, *self._running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while not queue.empty():
+            _, future = queue.get_nowait()
+            future.cancel()
+
+    async def _collect(self) -> None:
+        queue, loop = self._queue, self._loop
+        batch: List[Tuple[T, "asyncio.Future[R]"]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                if not queue.empty():
+                    deadline = loop.time() + self.max_wait
+                    while len(batch) < self.max_batch_size:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(queue.get(), remaining))
+                        except asyncio.TimeoutError:
+                            break
+                task = loop.create_task(self._run(batch))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                batch = []
+        except asyncio.CancelledError:
+            _cancel_pending(batch)
+            raise
+
+    async def _run(self, batch: List[Tuple[T, "asyncio.Future[R]"]]) -> None:
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch of {len(batch)} item(s) returned {len(results)} result(s)")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except asyncio.CancelledError:
+            _cancel_pending(batch)
+            raise
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+def _cancel_pending(batch: List[Tuple[Any, asyncio.Future]]) -> None:
+    for _, future in batch:
+        if not future.done():
+            future.cancel()
+
+# --- Result Caching ---
+class SingleFlight(Generic[R]):
+    """
+    Shares one in-flight call among concurrent callers with the same key.
+
+    The first caller starts `fetch` as a task owned by the flight; every caller,
+    including the first, awaits it shielded, so cancelling one caller (a timeout,
+    a client disconnect) leaves the others waiting. The task is only cancelled once
+    all its callers are gone. Nothing is kept afterwards, so later calls fetch again.
+    """
+
+    def __init__(self):
+        # key -> [task, number of callers awaiting it]
+        self._pending: Dict[Tuple, list] = {}
+
+    async def run(self, key: Tuple, fetch: Callable[[], Awaitable[R]]) -> R:
+        flight = self._pending.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fetch())
+            flight = self._pending[key] = [task, 0]
+            task.add_done_callback(lambda _: self._finish(key, flight))
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                # Every caller was cancelled; nobody wants the result any more. Forget
+                # the flight first so a caller arriving now starts a fresh fetch
+                # instead of joining one that is being cancelled
+                self._finish(key, flight)
+                task.cancel()
+
+    def _finish(self, key: Tuple, flight: list) -> None:
+        if self._pending.get(key) is flight:
+            del self._pending[key]
+
+
+# Results kept in memory per cache; entries are small dataclasses
+RESULT_CACHE_SIZE = 50_000
+
+class ResultCache(Generic[R]):
+    """
+    Single-flight LRU cache for API results, optionally persisted to SQLite.
+
+    Concurrent misses for the same key share one fetch (see SingleFlight) instead
+    of each making a request. Only non-None results are cached, so failed calls are retried on the
+    next miss. With `path`, results are also stored (as JSON of the dataclass) in
+    `table` of that SQLite file and reused by later runs; results that aren't a
+    flat dataclass pass `encode`/`decode` to convert to and from JSON values. SQLite
+    runs on a dedicated thread so reads and writes never block the event loop; call
+    `aclose` to close the file. With `shared`, results are also kept in a CacheService
+    (e.g. Redis) under a content-addressed key, so several processes reuse each
+    other's results.
+    """
+
+    def __init__(
+        self,
+        result_type: Type[R],
+        table: str,
+        path: Optional[str] = None,
+        maxsize: int = RESULT_CACHE_SIZE,
+        shared: Optional[CacheService] = None,
+        encode: Callable[[R], Any] = dataclasses.asdict,
+        decode: Optional[Callable[[Any], R]] = None
+    ):
+        self.result_type = result_type
+        self.encode = encode
+        self.decode = decode or (lambda data: result_type(**data))
+        self.table = table
+        self.maxsize = maxsize
+        self.shared = shared
+        self._entries: "OrderedDict[Tuple, R]" = OrderedDict()
+        self._flights: SingleFlight[Optional[R]] = SingleFlight()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_thread: Optional[ThreadPoolExecutor] = None
+        if path:
+            # One thread owns the connection (sqlite3 connections stay on the thread
+            # that made them) and runs every query, in submission order
+            self._db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{table}-cache")
+            self._db_thread.submit(self._open_db, path)
+            logger.info(f"Persisting {table} cache to {path}")
+
+    async def aclose(self) -> None:
+        """Closes the SQLite file; the cache keeps working in memory afterwards."""
+        executor, self._db_thread = self._db_thread, None
+        if executor is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(executor, self._close_db)
+        executor.shutdown(wait=False)
+
+    async def get_or_fetch(self, key: Tuple, fetch: Callable[[], Awaitable[Optional[R]]]) -> Optional[R]:
+        """Returns the cached result for `key`, calling `fetch` at most once across concurrent misses."""
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            return entries[key]
+        return await self._flights.run(key, lambda: self._load_or_fetch(key, fetch))
+
+    async def _load_or_fetch(self, key: Tuple, fetch: Callable[[], Awaitable[Optional[R]]]) -> Optional[R]:
+        result = await self._in_db_thread(self._load, key)
+        if result is None and self.shared is not None:
+            result = await self._load_shared(key)
+            if result is not None:
+                await self._in_db_thread(self._store, key, result)
+        if result is None:
+            result = await fetch()
+            if result is not None:
+                await self._in_db_thread(self._store, key, result)
+                await self._store_shared(key, result)
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def _remember(self, key: Tuple, result: R) -> None:
+        entries = self._entries
+        entries[key] = result
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    async def _in_db_thread(self, call: Callable[..., Any], *args) -> Any:
+        """Runs a SQLite call on the cache's own thread; a no-op without a file."""
+        executor = self._db_thread
+        if executor is None:
+            return None
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, call, *args)
+        except RuntimeError:
+            # Closed while this call was on its way
+            return None
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, isolation_level=None)
+            # WAL without per-commit fsync keeps each write cheap
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open {self.table} cache at {path}, keeping it in memory only: {e}")
+            return
+        self._db = db
+
+    def _close_db(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _load(self, key: Tuple) -> Optional[R]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (json.dumps(key, ensure_ascii=False),)
+            ).fetchone()
+            return self.decode(json.loads(row[0])) if row else None
+        except (sqlite3.Error, ValueError, TypeError, KeyError) as e:
+            # A locked database or a row from an older format is just a miss
+            logger.warning(f"Could not read {self.table} cache entry: {e}")
+            return None
+
+    def _store(self, key: Tuple, result: R) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                (json.dumps(key, ensure_ascii=False), json.dumps(self.encode(result), ensure_ascii=False))
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist {self.table} cache entry: {e}")
+
+    def _shared_key(self, key: Tuple) -> str:
+        # Fixed-length key whatever the text length, namespaced by table
+        digest = hashlib.blake2b(json.dumps(key, ensure_ascii=False).encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self.table}:{digest}"
+
+    async def _load_shared(self, key: Tuple) -> Optional[R]:
+        try:
+            value = await self.shared.get(self._shared_key(key))
+        except Exception as e:
+            logger.warning(f"Could not read {self.table} entry from shared cache: {e}")
+            return None
+        return self.decode(loads_json(value)) if value else None
+
+    async def _store_shared(self, key: Tuple, result: R) -> None:
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(self._shared_key(key), json.dumps(self.encode(result), ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"Could not write {self.table} entry to shared cache: {e}")
+
+# --- Batch API Jobs ---
+# How long requests are collected before they are submitted together as one job (seconds)
+BATCH_JOB_COLLECT_WINDOW = 2.0
+# First wait between status checks of a running job (seconds); doubles up to the max
+BATCH_JOB_POLL_INTERVAL = 30.0
+BATCH_JOB_MAX_POLL_INTERVAL = 600.0
+BATCH_JOB_ENDPOINT = "/v1/chat/completions"
+BATCH_JOB_COMPLETION_WINDOW = "24h"
+# Job statuses after which nothing more will happen
+BATCH_JOB_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+class BatchJobMixin:
+    """
+    Sends an adapter's chat completions through OpenAI's Batch API.
+
+    Batch jobs cost half as much as synchronous calls and draw on a separate rate
+    limit pool, but may take up to 24 hours. Requests made within `collect_window`
+    seconds of the first pending one are submitted as a single job, and each caller
+    waits for that job to finish. Uses the adapter's `client`.
+    """
+
+    client: openai.AsyncOpenAI
+
+    def _init_batch_jobs(self, collect_window: float, poll_interval: float) -> None:
+        self.collect_window = collect_window
+        self.poll_interval = poll_interval
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def _submit_to_batch_job(self, body: dict) -> str:
+        """Queues a chat completion request for the next batch job and returns its reply once the job completes."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((body, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.collect_window)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Submits every pending request as one batch job and waits for it to finish."""
+        requests, self._pending = self._pending, []
+        if not requests:
+            return
+        try:
+            replies = await self._run_job([body for body, _ in requests])
+        except Exception as e:
+            logger.error(f"Batch job for {len(requests)} request(s) failed: {e}")
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for index, (_, future) in enumerate(requests):
+            if future.done():
+                continue
+            reply = replies.get(index)
+            if reply is None:
+                future.set_exception(RuntimeError(f"No result for request {index} in batch job output"))
+            else:
+                future.set_result(reply)
+
+    async def _run_job(self, bodies: List[dict]) -> Dict[int, str]:
+        """Runs one batch job; returns reply contents keyed by position in `bodies`."""
+        lines = "\n".join(
+            json.dumps({"custom_id": f"request-{index}", "method": "POST", "url": BATCH_JOB_ENDPOINT, "body": body})
+            for index, body in enumerate(bodies)
+        )
+        input_file = await self.client.files.create(
+            file=("requests.jsonl", lines.encode("utf-8")),
+            purpose="batch"
+        )
+        job = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_JOB_ENDPOINT,
+            completion_window=BATCH_JOB_COMPLETION_WINDOW
+        )
+        logger.info(f"Submitted batch job {job.id} with {len(bodies)} request(s)")
+
+        # Small jobs often finish within minutes; long ones are checked less and less often
+        delay = self.poll_interval
+        while job.status not in BATCH_JOB_FINAL_STATUSES:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, BATCH_JOB_MAX_POLL_INTERVAL)
+            job = await self.client.batches.retrieve(job.id)
+            logger.info(f"Batch job {job.id} status: {job.status}")
+
+        if job.status != "completed" or not job.output_file_id:
+            raise RuntimeError(f"Batch job {job.id} ended with status '{job.status}'")
+
+        output = await self.client.files.content(job.output_file_id)
+        replies: Dict[int, str] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = loads_json(line)
+            response = record.get("response") or {}
+            custom_id = record.get("custom_id", "")
+            if response.get("status_code") != 200 or not custom_id.startswith("request-"):
+                logger.warning(f"Batch job {job.id}: request {custom_id} failed: {record.get('error') or response}")
+                continue
+            replies[int(custom_id[len("request-"):])] = response["body"]["choices"][0]["message"]["content"]
+        return replies
@@ -3,6 +3,8 @@ import httpx
 from typing import Optional
 from core.domain.interfaces import TranslationService
 from core.domain.models import Translation
+# HTTP/2 lets concurrent translations share one multiplexed connection when `h2` is installed
+from adapters.openai_client import HTTP2_AVAILABLE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,19 @@ class DeepLTranslationAdapter(TranslationService):
         else:
             self.base_url = "https://api.deepl.com/v2"
             logger.info("Using DeepL Pro API endpoint.")
+        # One client for the adapter's lifetime, so concurrent and repeated calls reuse
+        # pooled keep-alive connections instead of a new TLS handshake per translation.
+        # The key goes in a header, keeping it out of every request body
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers={"Authorization": f"DeepL-Auth-Key {api_key}"},
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+
+    async def aclose(self) -> None:
+        """Closes the underlying HTTP client and its pooled connections."""
+        await self.client.aclose()
 
     async def translate(
         self,
@@ -55,7 +70,6 @@ class DeepLTranslationAdapter(TranslationService):
         # DeepL expects uppercase language codes (e.g., 'FR', 'EN-US')
         # We assume simple 2-letter codes for now, adjust if more specific codes needed
         params = {
-            'auth_key': self.api_key,
             'text': text,
             'source_lang': source_lang.upper(),
             'target_lang': target_lang.upper()
@@ -64,10 +78,9 @@ class DeepLTranslationAdapter(TranslationService):
         logger.info(f"Requesting DeepL translation: {source_lang.upper()} -> {target_lang.upper()} for text: '{text[:50]}...'")
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client: # Add timeout
-                response = await client.post(f"{self.base_url}/translate", data=params)
-                response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-                data = response.json()
+            response = await self.client.post(f"{self.base_url}/translate", data=params)
+            response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
+            data = response.json()
 
             if not data or 'translations' not in data or not data['translations']:
                 logger.error(f"DeepL response missing 'translations'. Response: {data}")
@@ -1,32 +1,106 @@
 # adapters/translation/openai_adapter.py
+import asyncio
+import json
 import openai
-from typing import Optional
-from core.domain.interfaces import TranslationService
+import re
+from typing import Dict, List, Optional, Tuple
+from core.domain.interfaces import CacheService, TranslationService
 from core.domain.models import Translation
+from adapters.openai_client import (
+    DynamicBatcher, OPENAI_SEED, ResultCache, estimate_tokens, get_async_openai_client, loads_json, resolve_in_batches
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# --- Prompt Templates ---
+# Built once; calls only fill in the {slots} (literal braces are doubled). The
+# per-call input comes last so every request for a language pair shares one prefix
+_TRANSLATE_PROMPT = """Translate the following text from {source_lang} to {target_lang}.
+Provide ONLY the translated text, without any introductory phrases, explanations, or quotation marks.
+
+Original ({source_lang}): "{text}"
+
+Translation ({target_lang}):"""
+
+_TRANSLATE_BATCH_PROMPT = """Translate each of the texts at the end from {source_lang} to {target_lang}. The texts are given as a JSON array.
+
+Return ONLY a JSON object with a single key "translations", which holds an array with one object per text. Each object should have:
+- "index": The position of the text in the input array (starting at 0).
+- "text": The translated text only, without introductory phrases, explanations, or quotation marks.
+
+Texts ({source_lang}):
+{items}"""
+
+# --- Reply Cleanup ---
+# Models sometimes wrap a translation in quotes despite the prompt, including
+# typographic ones (“ ” „ « » 「 」). Quotes are removed only when they wrap the whole
+# reply, so a translation that starts or ends with a quotation keeps it. Single
+# quotes are left alone: they double as apostrophes ("students’").
+_QUOTE_CHARS = '"“”„«»「」'
+_REPLY_RE = re.compile(rf'\s*[{_QUOTE_CHARS}]+\s*(.*?)\s*[{_QUOTE_CHARS}]+\s*|\s*(.*?)\s*', re.DOTALL)
+
+def _clean_reply(text: str) -> str:
+    """Strips surrounding whitespace and wrapping quotes from a translation in one regex pass."""
+    quoted, bare = _REPLY_RE.fullmatch(text).groups()
+    return quoted if quoted is not None else bare
+
+# --- Reply Length ---
+# A translation runs about as many tokens as its source, but switching between
+# Latin and wide scripts can nearly double that, so the cap allows twice the
+# estimated source tokens plus room for short texts (and, batched, each item's JSON)
+_REPLY_TOKENS_PER_SOURCE_TOKEN = 2
+_REPLY_TOKENS_PER_TEXT = 16
+_REPLY_TOKENS_PER_BATCH_ITEM = 24
+
+def _reply_token_limit(texts: List[str], per_text: int) -> int:
+    """max_tokens for translating `texts`, from their estimated token counts."""
+    return sum(estimate_tokens(text) * _REPLY_TOKENS_PER_SOURCE_TOKEN + per_text for text in texts)
+
 class OpenAITranslationAdapter(TranslationService):
     """
     TranslationService implementation using OpenAI's GPT models (e.g., GPT-4o-mini).
     Potentially more context-aware than traditional translation services.
     """
 
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        cache_path: Optional[str] = None,
+        client: Optional[openai.AsyncOpenAI] = None,
+        shared_cache: Optional[CacheService] = None
+    ):
         """
         Initializes the OpenAI adapter.
 
         Args:
             api_key: Your OpenAI API key.
             model: The OpenAI model identifier (e.g., "gpt-4o-mini").
+            cache_path: Optional SQLite file to keep translations in across runs.
+            client: Optional preconfigured AsyncOpenAI client; defaults to the shared one for `api_key`.
+            shared_cache: Optional CacheService (e.g. Redis) to share translations between processes.
         """
         if not api_key:
             raise ValueError("OpenAI API key is required.")
-        # Use AsyncOpenAI for compatibility with async use cases
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        # Use AsyncOpenAI for compatibility with async use cases; shared per API key
+        self.client = client or get_async_openai_client(api_key)
         self.model = model
-        logger.info(f"Using OpenAI translation model: {self.model}")
+        # Built once, so every Translation shares one provider string
+        self._provider = f"openai-{model}"
+        # Coalesces concurrent translate() calls per language pair into batched requests
+        self._batchers: Dict[Tuple[str, str], DynamicBatcher] = {}
+        # Repeated texts (across a deck or, with cache_path, across runs) skip the API
+        self._cache: ResultCache[Translation] = ResultCache(
+            Translation, "translations", path=cache_path, shared=shared_cache
+        )
+        logger.info("Using OpenAI translation model: %s", self.model)
+
+    async def aclose(self) -> None:
+        """Stops the batchers' background tasks and closes the cache files; the shared HTTP client is closed separately."""
+        batchers = list(self._batchers.values())
+        self._batchers.clear()
+        await asyncio.gather(*(batcher.aclose() for batcher in batchers), self._cache.aclose())
 
     async def translate(
         self,
@@ -49,29 +123,58 @@ class OpenAITranslationAdapter(TranslationService):
             logger.warning("Translate called with empty text.")
             return None
 
-        # Construct a clear prompt for the LLM
-        prompt = f"""Translate the following text from {source_lang} to {target_lang}.
-Provide ONLY the translated text, without any introductory phrases, explanations, or quotation marks.
+        # Case is kept in the key: it carries meaning in sentences (names, sentence starts)
+        key = (text.strip(), source_lang, target_lang, self.model)
+        # Translation is frozen, so the cached instance itself can be returned
+        return await self._cache.get_or_fetch(key, lambda: self._submit(text, source_lang, target_lang))
 
-Original ({source_lang}): "{text}"
+    async def _submit(self, text: str, source_lang: str, target_lang: str) -> Optional[Translation]:
+        # Concurrent calls (e.g. cards generated with asyncio.gather) share one request
+        batcher = self._batchers.get((source_lang, target_lang))
+        if batcher is None:
+            async def run_batch(texts: List[str]) -> List[Optional[Translation]]:
+                if len(texts) == 1:
+                    return [await self._translate_one(texts[0], source_lang, target_lang)]
+                return await self.translate_batch(texts, source_lang, target_lang)
+            batcher = self._batchers[(source_lang, target_lang)] = DynamicBatcher(run_batch)
+        return await batcher.submit(text)
 
-Translation ({target_lang}):"""
+    def _completion_request(self, prompt: str, **overrides) -> dict:
+        """Chat completion parameters for one prompt; `overrides` replace or add parameters."""
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.2,  # Lower temperature for more deterministic translation
+            "seed": OPENAI_SEED,
+            **overrides
+        }
 
-        logger.info(f"Requesting OpenAI translation ({self.model}): {source_lang} -> {target_lang} for text: '{text[:50]}...'")
+    async def _complete(self, prompt: str, **overrides) -> str:
+        """Sends one chat completion and returns the raw reply."""
+        response = await self.client.chat.completions.create(**self._completion_request(prompt, **overrides))
+        return response.choices[0].message.content
+
+    async def _translate_one(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str
+    ) -> Optional[Translation]:
+        """Translates a single text with its own request."""
+        # Construct a clear prompt for the LLM
+        prompt = _TRANSLATE_PROMPT.format_map({"source_lang": source_lang, "target_lang": target_lang, "text": text})
+
+        # Lazy %-style arguments: nothing is formatted when INFO is filtered out
+        logger.info("Requesting OpenAI translation (%s): %s -> %s for text: '%.50s...'", self.model, source_lang, target_lang, text)
 
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,  # Lower temperature for more deterministic translation
-                max_tokens=int(len(text) * 1.5) + 50 # Estimate max tokens needed
-            )
+            reply = await self._complete(prompt, max_tokens=_reply_token_limit([text], _REPLY_TOKENS_PER_TEXT))
 
             # Extract the translated text, stripping any extra whitespace/quotes
-            translated_text = response.choices[0].message.content.strip().strip('"')
+            translated_text = _clean_reply(reply)
 
             if not translated_text:
-                logger.warning(f"OpenAI returned an empty translation for: '{text}'")
+                logger.warning("OpenAI returned an empty translation for: '%s'", text)
                 return None
 
             logger.info("OpenAI translation successful.")
@@ -79,17 +182,75 @@ Translation ({target_lang}):"""
             return Translation(
                 text=translated_text,
                 target_language=target_lang, # Set correctly based on input
-                provider=f"openai-{self.model}",
+                provider=self._provider,
                 confidence=None # LLMs don't typically provide a confidence score
             )
 
         except openai.APIError as e:
-            logger.error(f"OpenAI API request failed: {e.status_code} - {e.message}")
+            logger.error("OpenAI API request failed: %s - %s", e.status_code, e.message)
             if e.status_code == 401:
                  logger.error("Authentication failed. Check your OpenAI API key.")
             elif e.status_code == 429:
                  logger.error("OpenAI Rate limit exceeded or quota reached.")
             return None
         except Exception as e:
-            logger.error(f"An unexpected error occurred during OpenAI translation: {e}")
+            logger.error("An unexpected error occurred during OpenAI translation: %s", e)
             return None
+
+    async def translate_batch(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str
+    ) -> List[Optional[Translation]]:
+        """
+        Translates several texts, packing as many as fit into each OpenAI request.
+
+        Args:
+            texts: The texts to translate.
+            source_lang: The source language code (e.g., 'fr').
+            target_lang: The target language code (e.g., 'en').
+
+        Returns:
+            One Translation per text, aligned with `texts`; None where translation failed.
+        """
+        async def fetch_batch(batch: List[str]) -> Dict[int, Translation]:
+            return await self._translate_batch(batch, source_lang, target_lang)
+
+        async def fetch_one(text: str) -> Optional[Translation]:
+            return await self._translate_one(text, source_lang, target_lang)
+
+        return await resolve_in_batches(texts, fetch_batch, fetch_one)
+
+    async def _translate_batch(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str
+    ) -> Dict[int, Translation]:
+        """Sends one prompt for several texts; returns translations keyed by position in `texts`."""
+        prompt = _TRANSLATE_BATCH_PROMPT.format_map({"source_lang": source_lang, "target_lang": target_lang, "items": json.dumps(texts, ensure_ascii=False)})
+
+        logger.info("Requesting OpenAI translation (%s): %s -> %s for %d texts (batched)", self.model, source_lang, target_lang, len(texts))
+
+        reply = await self._complete(
+            prompt,
+            response_format={"type": "json_object"},
+            max_tokens=_reply_token_limit(texts, _REPLY_TOKENS_PER_BATCH_ITEM)
+        )
+
+        data = loads_json(reply)
+        translations: Dict[int, Translation] = {}
+        for item in data.get('translations', []) if isinstance(data, dict) else []:
+            if not isinstance(item, dict):
+                continue
+            index = item.get('index')
+            translated_text = item.get('text')
+            if isinstance(index, int) and 0 <= index < len(texts) and isinstance(translated_text, str) and translated_text.strip():
+                translations[index] = Translation(
+                    text=_clean_reply(translated_text),
+                    target_language=target_lang, # Set correctly based on input
+                    provider=self._provider,
+                    confidence=None # LLMs don't typically provide a confidence score
+                )
+        return translations
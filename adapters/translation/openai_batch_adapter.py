@@ -0,0 +1,37 @@
+# adapters/translation/openai_batch_adapter.py
+import logging
+import openai
+from typing import Optional
+from core.domain.interfaces import CacheService
+from adapters.translation.openai_adapter import OpenAITranslationAdapter
+from adapters.openai_client import BATCH_JOB_COLLECT_WINDOW, BATCH_JOB_POLL_INTERVAL, BatchJobMixin
+
+logger = logging.getLogger(__name__)
+
+class OpenAIBatchTranslationAdapter(BatchJobMixin, OpenAITranslationAdapter):
+    """
+    Translation adapter that sends its requests through OpenAI's Batch API.
+
+    Half the cost of synchronous calls, but replies may take up to 24 hours, so this
+    suits translating whole books into decks offline. Concurrent translate() calls
+    are still packed into batched prompts first; each prompt becomes one request of
+    the job. Prompts and parsing are shared with OpenAITranslationAdapter; only the
+    transport differs (see BatchJobMixin).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        cache_path: Optional[str] = None,
+        client: Optional[openai.AsyncOpenAI] = None,
+        shared_cache: Optional[CacheService] = None,
+        collect_window: float = BATCH_JOB_COLLECT_WINDOW,
+        poll_interval: float = BATCH_JOB_POLL_INTERVAL
+    ):
+        super().__init__(api_key=api_key, model=model, cache_path=cache_path, client=client, shared_cache=shared_cache)
+        self._init_batch_jobs(collect_window, poll_interval)
+
+    async def _complete(self, prompt: str, **overrides) -> str:
+        """Queues the prompt for the next batch job and returns its reply once the job completes."""
+        return await self._submit_to_batch_job(self._completion_request(prompt, **overrides))
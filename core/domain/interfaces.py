@@ -1,6 +1,7 @@
 # core/domain/interfaces.py
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple, Any # Added Any for CacheService
+from typing import AsyncIterator, List, Optional, Tuple, Any # Added Any for CacheService
 from .models import (
     Sentence, Translation, WordBreakdown, AudioFile,
     GrammarNote, FlashCard, Deck, AudioFormat,
@@ -24,6 +25,18 @@ class TranslationService(ABC):
         """Translate text from source to target language"""
         pass
 
+    async def translate_batch(
+        self,
+        texts: List[str],
+        source_lang: LanguageCode,
+        target_lang: LanguageCode
+    ) -> List[Optional[Translation]]:
+        """
+        Translate several texts, results aligned with `texts`.
+        Providers that can translate many texts per request override this.
+        """
+        return list(await asyncio.gather(*(self.translate(text, source_lang, target_lang) for text in texts)))
+
 class DictionaryService(ABC):
     """Port for dictionary lookups"""
 
@@ -47,6 +60,32 @@ class DictionaryService(ABC):
         """Analyze all words in a sentence"""
         pass
 
+    async def analyze_sentences_batch(
+        self,
+        sentences: List[str],
+        source_lang: LanguageCode,
+        target_lang: LanguageCode
+    ) -> List[Optional[WordBreakdown]]:
+        """
+        Analyze several sentences, results aligned with `sentences`.
+        Providers that can analyze many sentences per request override this.
+        """
+        return list(await asyncio.gather(*(self.analyze_sentence(s, source_lang, target_lang) for s in sentences)))
+
+    async def analyze_sentence_stream(
+        self,
+        sentence: str,
+        source_lang: LanguageCode,
+        target_lang: LanguageCode
+    ) -> AsyncIterator[Word]:
+        """
+        Yield the words of a sentence as they become available.
+        Providers that can stream their analysis override this.
+        """
+        breakdown = await self.analyze_sentence(sentence, source_lang, target_lang)
+        for word in breakdown.words if breakdown else []:
+            yield word
+
 class AudioService(ABC):
     """Port for text-to-speech"""
 
@@ -75,6 +114,17 @@ class GrammarService(ABC):
         """Generate grammar explanations"""
         pass
 
+    async def explain_grammar_batch(
+        self,
+        sentences: List[str],
+        language: LanguageCode
+    ) -> List[List[GrammarNote]]:
+        """
+        Generate grammar explanations for several sentences, results aligned with `sentences`.
+        Providers that can explain many sentences per request override this.
+        """
+        return list(await asyncio.gather(*(self.explain_grammar(s, language) for s in sentences)))
+
 class SentenceSearchService(ABC):
     """Port for finding example sentences"""
 
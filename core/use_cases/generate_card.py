@@ -1,6 +1,8 @@
 # core/use_cases/generate_card.py
-from typing import Optional, Tuple
-from ..domain.models import Sentence, FlashCard, AudioFile, Translation, WordBreakdown, GrammarNote
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
+from ..domain.models import Sentence, FlashCard, sentence_id, AudioFile, Translation, WordBreakdown, GrammarNote
 from ..domain.interfaces import (
     TranslationService, DictionaryService, AudioService, GrammarService, StorageService
 )
@@ -48,7 +50,8 @@ class GenerateCardUseCase:
         source_lang: Optional[str] = None,
         target_lang: Optional[str] = None,
         include_audio: bool = True,
-        include_grammar: bool = True
+        include_grammar: bool = True,
+        created_at: Optional[datetime] = None
     ) -> FlashCard:
         """
         Generates a complete flashcard for a given sentence.
@@ -61,49 +64,62 @@ class GenerateCardUseCase:
             target_lang: The target language code (e.g., 'en', 'es'). Defaults if None.
             include_audio: Whether to generate and save audio.
             include_grammar: Whether to generate grammar notes.
+            created_at: Timestamp for the card and its sentence; defaults to now.
+                        A deck passes one for all of its cards.
 
         Returns:
             A populated FlashCard object.
 
         Raises:
-            ValueError: If audio generation fails and include_audio is True.
+            ValueError: If translation fails.
+            TypeError: If the translation service returns a Translation without a target language.
             Exception: Propagates exceptions from underlying services.
         """
         # Determine languages to use
         src_lang = source_lang or self.default_source_lang
         tgt_lang = target_lang or self.default_target_lang
 
-        # Create sentence object with the correct language
-        sentence = Sentence(text=sentence_text, language=src_lang)
+        # The card and its sentence share one clock read
+        if created_at is None:
+            created_at = datetime.utcnow()
 
-        # 1. Get Translation
-        translation = await self.translator.translate(
-            text=sentence_text,
-            source_lang=src_lang,
-            target_lang=tgt_lang
+        # Create sentence object with the correct language. Its ID comes from the text,
+        # so regenerating a deck yields the same note GUIDs
+        sentence = Sentence(
+            text=sentence_text, language=src_lang, id=sentence_id(src_lang, sentence_text), created_at=created_at
         )
-        # Ensure the translation object has the target language set
-        # (Some adapters might not set it, though they should)
-        if not translation.target_language:
-            translation.target_language = tgt_lang
-
 
-        # 2. Get Word Breakdown
-        word_breakdown = await self.dictionary.analyze_sentence(
-            sentence=sentence_text,
-            source_lang=src_lang,
-            target_lang=tgt_lang # Pass target lang for definitions
+        # 1-4. Translation, word breakdown, audio and grammar notes don't depend on
+        # each other, so they run concurrently: one card costs the slowest call, not the sum
+        translation, word_breakdown, generated_audio, grammar_notes = await _run_steps(
+            self.translator.translate(
+                text=sentence_text,
+                source_lang=src_lang,
+                target_lang=tgt_lang
+            ),
+            self.dictionary.analyze_sentence(
+                sentence=sentence_text,
+                source_lang=src_lang,
+                target_lang=tgt_lang # Pass target lang for definitions
+            ),
+            # Use source language for TTS; format is handled by the adapter or uses its default
+            self.audio.generate_audio(text=sentence_text, language=src_lang) if include_audio else _skipped(None),
+            # Explain grammar based on source language
+            self.grammar.explain_grammar(sentence=sentence_text, language=src_lang)
+            if include_grammar and self.grammar else _skipped([]),
         )
 
-        # 3. Generate and Save Audio (if requested)
+        # Translation is frozen and adapters set its target language; one that
+        # doesn't is a broken adapter, not something to patch up per card
+        if translation is None:
+            raise ValueError(f"Translation failed for sentence: '{sentence_text}'")
+        if not translation.target_language:
+            raise TypeError(f"{type(self.translator).__name__} returned a Translation without a target language")
+
+        # Save the generated audio (if requested); this needs the TTS result
         audio_model: Optional[AudioFile] = None
         if include_audio:
-            # Generate audio model and raw data using the source language
-            generated_audio_model, audio_data = await self.audio.generate_audio(
-                text=sentence_text,
-                language=src_lang # Use source language for TTS
-                # Format is handled by the adapter or uses its default
-            )
+            generated_audio_model, audio_data = generated_audio
 
             # Check if audio generation was successful
             if generated_audio_model and audio_data:
@@ -124,23 +140,40 @@ class GenerateCardUseCase:
                 # raise ValueError("Audio generation failed.") # Option 1: Fail hard
                 # Option 2: Continue without audio (current implementation)
 
-
-        # 4. Get Grammar Notes (if requested and service available)
-        grammar_notes: List[GrammarNote] = []
-        if include_grammar and self.grammar:
-            grammar_notes = await self.grammar.explain_grammar(
-                sentence=sentence_text,
-                language=src_lang # Explain grammar based on source language
-            )
-
         # 5. Assemble FlashCard
         card = FlashCard(
             sentence=sentence,
             translation=translation,
             word_breakdown=word_breakdown,
             audio=audio_model, # Will be None if audio failed or was skipped
-            grammar_notes=grammar_notes
+            grammar_notes=grammar_notes,
+            created_at=created_at
             # Tags could potentially be added based on language, topic, etc. later
         )
 
         return card
+
+async def _run_steps(*steps) -> list:
+    """
+    Runs the card's steps concurrently and returns their results in order.
+
+    As soon as one step fails the others are cancelled, so a failed card doesn't
+    keep paying for TTS or grammar calls it will throw away. The error raised is
+    the first in step order among the steps that failed.
+    """
+    tasks = [asyncio.ensure_future(step) for step in steps]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        # Also reached when the caller is cancelled while waiting
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for task in tasks:
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    return [task.result() for task in tasks]
+
+async def _skipped(value):
+    """Stands in for a step that is turned off, so it can run alongside the others."""
+    return value
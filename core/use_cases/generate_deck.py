@@ -1,10 +1,19 @@
 # core/use_cases/generate_deck.py
 import asyncio
-from typing import List, Optional, Tuple
+import contextlib
+import logging
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
 from core.domain.models import Deck, FlashCard
 from core.domain.interfaces import StorageService, DeckExporter
 from .generate_card import GenerateCardUseCase # Assuming GenerateCardUseCase is in the same directory or adjust path
 
+logger = logging.getLogger(__name__)
+
+# Cards generated at once. Each card makes several API calls, so an unbounded
+# gather over a large deck sends hundreds of requests at the same moment
+DECK_MAX_CONCURRENCY = 16
+
 class GenerateDeckUseCase:
     """
     Single Responsibility: Generate a complete deck of flashcards
@@ -17,7 +26,8 @@ class GenerateDeckUseCase:
         exporter: DeckExporter,
         storage: StorageService, # Keep storage if needed directly, though card_generator handles audio saving
         default_source_lang: str,
-        default_target_lang: str
+        default_target_lang: str,
+        max_concurrency: Optional[int] = DECK_MAX_CONCURRENCY
     ):
         """
         Initializes the use case.
@@ -28,12 +38,14 @@ class GenerateDeckUseCase:
             storage: Storage service (potentially for deck metadata or future use).
             default_source_lang: Default source language code.
             default_target_lang: Default target language code.
+            max_concurrency: Most cards generated at once; None for no limit.
         """
         self.card_generator = card_generator
         self.exporter = exporter
         self.storage = storage
         self.default_source_lang = default_source_lang
         self.default_target_lang = default_target_lang
+        self.max_concurrency = max_concurrency
 
     async def execute(
         self,
@@ -43,7 +55,8 @@ class GenerateDeckUseCase:
         source_lang: Optional[str] = None,
         target_lang: Optional[str] = None,
         include_audio: bool = False, # Keep default as False for CLI batch safety
-        include_grammar: bool = True
+        include_grammar: bool = True,
+        progress_cb: Optional[Callable[[int, int], None]] = None
     ) -> str:
         """
         Generates a complete deck for a specific language pair.
@@ -56,6 +69,8 @@ class GenerateDeckUseCase:
             target_lang: The target language code (e.g., 'en'). Defaults if None.
             include_audio: Whether to generate audio (can be slow).
             include_grammar: Whether to generate grammar notes.
+            progress_cb: Called with (cards finished, cards total) about every 1% of
+                the deck and once more when the last card finishes.
 
         Returns:
             The absolute path to the generated .apkg file.
@@ -65,42 +80,65 @@ class GenerateDeckUseCase:
         tgt_lang = target_lang or self.default_target_lang
         lang_pair: Tuple[str, str] = (src_lang, tgt_lang)
 
-        print(f"🔄 Generating deck '{deck_name}' for {src_lang} -> {tgt_lang}...")
-
-        cards: List[FlashCard] = []
+        logger.info("🔄 Generating deck '%s' for %s -> %s...", deck_name, src_lang, tgt_lang)
+
+        # A sentence listed more than once gets one card: identical cards are only
+        # noise in Anki, and each one would cost the full set of API calls again
+        unique_sentences = list(dict.fromkeys(sentences))
+        if len(unique_sentences) < len(sentences):
+            logger.info("Skipping %d duplicate sentence(s).", len(sentences) - len(unique_sentences))
+
+        # Cards built for one deck share its creation time instead of each reading the clock
+        created_at = datetime.utcnow()
+
+        # At most max_concurrency cards are in flight; the next starts as one finishes
+        slots = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+        # Progress is reported in steps of ~1% rather than per card, so large decks
+        # don't spend their time in the callback
+        total = len(unique_sentences)
+        report_every = max(1, total // 100)
+        finished = 0
+
+        async def generate(sentence_text: str) -> FlashCard:
+            nonlocal finished
+            try:
+                async with slots or contextlib.nullcontext():
+                    return await self.card_generator.execute(
+                        sentence_text=sentence_text,
+                        source_lang=src_lang, # Pass determined languages
+                        target_lang=tgt_lang,
+                        include_audio=include_audio,
+                        include_grammar=include_grammar,
+                        created_at=created_at
+                    )
+            finally:
+                finished += 1
+                if progress_cb and (finished % report_every == 0 or finished == total):
+                    progress_cb(finished, total)
 
         # Create tasks for generating each card in parallel
         tasks = []
-        for i, sentence_text in enumerate(sentences):
-            print(f"  [{i+1}/{len(sentences)}] Queuing card generation for: '{sentence_text[:30]}...'")
-            tasks.append(
-                self.card_generator.execute(
-                    sentence_text=sentence_text,
-                    source_lang=src_lang, # Pass determined languages
-                    target_lang=tgt_lang,
-                    include_audio=include_audio,
-                    include_grammar=include_grammar
-                )
-            )
+        for i, sentence_text in enumerate(unique_sentences):
+            logger.debug("Queuing card %d/%d", i + 1, total)
+            tasks.append(generate(sentence_text))
 
         # Wait for all card generation tasks to complete
         generated_results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Process results, handling potential errors
-        successful_cards = 0
-        for i, result in enumerate(generated_results):
-            if isinstance(result, FlashCard):
-                cards.append(result)
-                successful_cards += 1
-            elif isinstance(result, Exception):
-                print(f"⚠️ Skipping card for sentence '{sentences[i][:50]}...': Error -> {result}")
-            else:
-                print(f"⚠️ Skipping card for sentence '{sentences[i][:50]}...': Unknown result type -> {type(result)}")
+        # Keep the cards; anything else is a failed sentence to report
+        cards = [result for result in generated_results if isinstance(result, FlashCard)]
+        if len(cards) < total:
+            for sentence_text, result in zip(unique_sentences, generated_results):
+                if isinstance(result, Exception):
+                    logger.warning("⚠️ Skipping card for sentence '%s...': Error -> %s", sentence_text[:50], result)
+                elif not isinstance(result, FlashCard):
+                    logger.warning("⚠️ Skipping card for sentence '%s...': Unknown result type -> %s", sentence_text[:50], type(result))
 
-        print(f"📊 Generated {successful_cards} cards successfully out of {len(sentences)} sentences.")
+        logger.info("📊 Generated %d cards successfully out of %d sentences.", len(cards), total)
 
         if not cards:
-             print("❌ No cards were generated successfully. Aborting deck export.")
+             logger.error("❌ No cards were generated successfully. Aborting deck export.")
              # Consider raising an error or returning a specific indicator
              return f"Failed: No cards generated for deck '{deck_name}'."
 
@@ -108,20 +146,21 @@ class GenerateDeckUseCase:
         deck = Deck(
             name=deck_name,
             cards=cards,
-            language_pair=lang_pair # Set the language pair
+            language_pair=lang_pair, # Set the language pair
+            created_at=created_at
         )
 
         # Export the deck to an .apkg file
-        print(f"📦 Exporting deck '{deck_name}' with {len(cards)} cards...")
+        logger.info("📦 Exporting deck '%s' with %d cards...", deck_name, len(cards))
         try:
             file_path = await self.exporter.export_deck(
                 deck=deck,
                 output_path=output_path
             )
-            print(f"✅ Deck export complete: {file_path}")
+            logger.info("✅ Deck export complete: %s", file_path)
             return file_path
         except Exception as e:
-            print(f"❌ Deck export failed: {e}")
+            logger.error("❌ Deck export failed: %s", e)
             # Propagate or handle the export error appropriately
             raise
 
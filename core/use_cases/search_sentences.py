@@ -1,32 +1,98 @@
 # core/use_cases/search_sentences.py
-from typing import List, Optional
+import hashlib
+import json
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
 # Assuming LanguageCode is defined elsewhere (e.g., core.domain.models)
 # If not, define it here:
 from typing import NewType
 LanguageCode = NewType('LanguageCode', str)
 
 from ..domain.models import Sentence, CardDifficulty
-from ..domain.interfaces import SentenceSearchService
+from ..domain.interfaces import CacheService, SentenceSearchService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How long search results stay in the cache (seconds). Popular topics repeat
+# across users, so most searches are served from the cache within this window
+SENTENCE_SEARCH_CACHE_TTL = 3600
+# Most sentences one search returns; larger limits are clamped to this
+SENTENCE_SEARCH_MAX_LIMIT = 200
+
+def _encode_sentences(sentences: List[Sentence]) -> str:
+    return json.dumps([
+        {
+            "text": s.text,
+            "language": s.language,
+            "id": s.id,
+            "source": s.source,
+            "difficulty": s.difficulty,
+            "created_at": s.created_at.isoformat(),
+        }
+        for s in sentences
+    ], ensure_ascii=False)
+
+def _decode_sentences(raw: str) -> List[Sentence]:
+    return [
+        Sentence(
+            text=item["text"],
+            language=item["language"],
+            id=item["id"],
+            source=item["source"],
+            difficulty=CardDifficulty(item["difficulty"]) if item["difficulty"] else None,
+            created_at=datetime.fromisoformat(item["created_at"]),
+        )
+        for item in json.loads(raw)
+    ]
+
 class SearchSentencesUseCase:
     """
     Use case for searching example sentences based on topic or difficulty.
     Orchestrates calls to a SentenceSearchService implementation.
     """
 
-    def __init__(self, search_service: SentenceSearchService):
+    def __init__(
+        self,
+        search_service: SentenceSearchService,
+        cache: Optional[CacheService] = None,
+        cache_ttl: int = SENTENCE_SEARCH_CACHE_TTL
+    ):
         """
         Initializes the use case with a sentence search service.
 
         Args:
             search_service: An implementation of the SentenceSearchService interface.
+            cache: Optional CacheService (e.g. Redis) holding recent search results.
+            cache_ttl: Seconds a cached search result stays valid.
         """
         if search_service is None:
             raise ValueError("Search service cannot be None")
         self.search = search_service
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+
+    async def _cached_search(self, key: str, search: Callable[[], Awaitable[List[Sentence]]]) -> List[Sentence]:
+        """
+        Returns the cached result for key, or runs the search and caches a non-empty result.
+
+        Cache errors are logged and treated as misses so searches keep working without it.
+        """
+        if self.cache is None:
+            return await search()
+        try:
+            raw = await self.cache.get(key)
+            if raw:
+                return _decode_sentences(raw)
+        except Exception as e:
+            logger.warning(f"Could not read search results from cache: {e}")
+        sentences = await search()
+        if sentences:
+            try:
+                await self.cache.set(key, _encode_sentences(sentences), ttl=self.cache_ttl)
+            except Exception as e:
+                logger.warning(f"Could not write search results to cache: {e}")
+        return sentences
 
     async def by_topic(
         self,
@@ -40,7 +106,7 @@ class SearchSentencesUseCase:
         Args:
             topic: The topic to search for (e.g., "food", "travel").
             language: The language code for the sentences (e.g., "fr", "de").
-            limit: The maximum number of sentences to return.
+            limit: The maximum number of sentences to return, at most SENTENCE_SEARCH_MAX_LIMIT.
 
         Returns:
             A list of Sentence objects matching the criteria, or an empty list.
@@ -52,13 +118,20 @@ class SearchSentencesUseCase:
         if limit <= 0:
             logger.warning("Search limit must be positive.")
             return []
+        if limit > SENTENCE_SEARCH_MAX_LIMIT:
+            logger.warning(f"Search limit {limit} exceeds {SENTENCE_SEARCH_MAX_LIMIT}; clamping.")
+            limit = SENTENCE_SEARCH_MAX_LIMIT
 
         try:
             logger.info(f"Searching for {limit} sentences about '{topic}' in language '{language}'...")
-            sentences = await self.search.search_by_topic(
-                topic=topic,
-                language=language, # Pass the language parameter
-                limit=limit
+            topic_digest = hashlib.blake2b(topic.encode(), digest_size=8).hexdigest()
+            sentences = await self._cached_search(
+                f"sentences:topic:{language}:{limit}:{topic_digest}",
+                lambda: self.search.search_by_topic(
+                    topic=topic,
+                    language=language, # Pass the language parameter
+                    limit=limit
+                )
             )
             logger.info(f"Found {len(sentences)} sentences for topic '{topic}' ({language}).")
             return sentences if sentences else []
@@ -78,7 +151,7 @@ class SearchSentencesUseCase:
         Args:
             difficulty: The desired difficulty level (e.g., CardDifficulty.A1).
             language: The language code for the sentences (e.g., "fr", "de").
-            limit: The maximum number of sentences to return.
+            limit: The maximum number of sentences to return, at most SENTENCE_SEARCH_MAX_LIMIT.
 
         Returns:
             A list of Sentence objects matching the criteria, or an empty list.
@@ -90,13 +163,19 @@ class SearchSentencesUseCase:
         if limit <= 0:
             logger.warning("Search limit must be positive.")
             return []
+        if limit > SENTENCE_SEARCH_MAX_LIMIT:
+            logger.warning(f"Search limit {limit} exceeds {SENTENCE_SEARCH_MAX_LIMIT}; clamping.")
+            limit = SENTENCE_SEARCH_MAX_LIMIT
 
         try:
             logger.info(f"Searching for {limit} sentences at difficulty '{difficulty.name}' in language '{language}'...")
-            sentences = await self.search.search_by_difficulty(
-                difficulty=difficulty,
-                language=language, # Pass the language parameter
-                limit=limit
+            sentences = await self._cached_search(
+                f"sentences:difficulty:{language}:{limit}:{difficulty.value}",
+                lambda: self.search.search_by_difficulty(
+                    difficulty=difficulty,
+                    language=language, # Pass the language parameter
+                    limit=limit
+                )
             )
             logger.info(f"Found {len(sentences)} sentences for difficulty '{difficulty.name}' ({language}).")
             return sentences if sentences else []
@@ -1,13 +1,22 @@
 # infrastructure/api/main.py
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
 from typing import List, Optional, Dict, Any
 import asyncio
+import os
+import stat
 import uuid # For generating task IDs if not using Celery
 from pathlib import Path
 import logging
 
+try:
+    # Optional: faster encoding of card responses
+    import orjson
+except ImportError:
+    orjson = None
+
 # Assuming LanguageCode is defined elsewhere (e.g., core.domain.models or a common types file)
 # If not, define it here:
 from typing import NewType
@@ -44,10 +53,21 @@ else:
               return container_instance
 
 # --- FastAPI App Initialization ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Closes the shared API clients' connection pools when the server stops."""
+    yield
+    try:
+        await container_instance.aclose()
+    except RuntimeError as e:
+        # The container never loaded, so there is nothing to close
+        logger.warning(f"Skipping service shutdown: {e}")
+
 app = FastAPI(
     title="Language Flashcard Generator API",
     version="1.1.0",
-    description="Generate Anki flashcards from sentences in various languages."
+    description="Generate Anki flashcards from sentences in various languages.",
+    lifespan=lifespan
 )
 
 # --- Request/Response Models ---
@@ -143,11 +163,14 @@ async def run_deck_generation_background(
 
     try:
         use_case = container.create_deck_generator()
-        # Note: The deck generator use case should ideally support progress reporting
-        # For now, we simulate basic progress updates
         TASK_STATUS_DB[task_id]["progress"] = 10.0
         TASK_STATUS_DB[task_id]["message"] = f"Generating {len(sentences)} cards..."
 
+        def report_progress(done: int, total: int) -> None:
+            # Card generation spans 10-90%; the remainder covers the export
+            TASK_STATUS_DB[task_id]["progress"] = 10.0 + 80.0 * done / total
+            TASK_STATUS_DB[task_id]["message"] = f"Generated {done}/{total} cards..."
+
         final_output_path = await use_case.execute(
             sentences=sentences,
             deck_name=deck_name,
@@ -155,7 +178,8 @@ async def run_deck_generation_background(
             source_lang=source_lang, # Pass languages
             target_lang=target_lang,
             include_audio=include_audio,
-            include_grammar=include_grammar
+            include_grammar=include_grammar,
+            progress_cb=report_progress
         )
 
         if final_output_path:
@@ -206,37 +230,40 @@ async def generate_single_card(
         if not card: # Handle potential None return from use case on critical failure
             raise HTTPException(status_code=500, detail="Card generation failed unexpectedly.")
 
-        # Map domain model to response model
-        response_data = GenerateCardResponse(
-            card_id=card.id,
-            sourceText=card.sentence.text,
-            targetText=card.translation.text,
-            sourceLang=card.sentence.language,
-            targetLang=card.translation.target_language,
-            wordBreakdown=WordBreakdownResponse(
-                words=[
-                    WordDetail(
-                        text=w.text,
-                        lemma=w.lemma,
-                        pos=w.pos,
-                        definition=w.definition,
-                        definition_native=w.definition_native
-                    )
+        # Map the domain model straight to the response body (GenerateCardResponse's
+        # aliased shape). Returning a response object skips FastAPI's validate-and-
+        # serialize pass over the model; the model still documents the schema.
+        response_data = {
+            "card_id": card.id,
+            "sourceText": card.sentence.text,
+            "targetText": card.translation.text,
+            "sourceLang": card.sentence.language,
+            "targetLang": card.translation.target_language,
+            "wordBreakdown": {
+                "words": [
+                    {
+                        "text": w.text,
+                        "lemma": w.lemma,
+                        "pos": w.pos,
+                        "definition": w.definition,
+                        "definition_native": w.definition_native
+                    }
                     for w in card.word_breakdown.words
                 ]
-            ),
-            audioUrl=card.audio.url if card.audio and card.audio.url else None, # Use URL if available
-            grammarNotes=[
-                GrammarNoteResponse(
-                    title=note.title,
-                    explanation=note.explanation,
-                    examples=note.examples
-                 )
+            },
+            "audioUrl": card.audio.url if card.audio and card.audio.url else None, # Use URL if available
+            "grammarNotes": [
+                {
+                    "title": note.title,
+                    "explanation": note.explanation,
+                    "examples": note.examples
+                }
                 for note in card.grammar_notes
             ]
-        )
+        }
         logger.info(f"Successfully generated card {card.id}")
-        return response_data
+        response_class = ORJSONResponse if orjson else JSONResponse
+        return response_class(content=response_data, status_code=201)
 
     except ValueError as ve:
          logger.warning(f"Value error during card generation: {ve}")
@@ -304,11 +331,12 @@ async def get_deck_status(task_id: str):
     )
 
 @app.get("/api/v1/decks/download/{filename}")
-async def download_generated_deck(filename: str):
+async def download_generated_deck(filename: str, request: Request):
     """
     Downloads the generated Anki deck (.apkg file).
     Ensure filename includes the task_id or is otherwise unique.
     Basic security: prevent path traversal.
+    Repeat downloads of an unchanged file get a 304 via its ETag.
     """
     logger.info(f"Request received to download deck file: {filename}")
     output_dir = Path("./output/api_decks").resolve() # Use absolute path for security check
@@ -319,9 +347,17 @@ async def download_generated_deck(filename: str):
         logger.warning(f"Attempted path traversal detected for filename: {filename}")
         raise HTTPException(status_code=400, detail="Invalid filename.")
 
-    if not requested_path.is_file():
+    # One stat serves the existence check, the ETag and FileResponse's own headers.
+    # It runs in a worker thread so a slow disk doesn't stall other requests.
+    try:
+        stat_result = await asyncio.to_thread(os.stat, requested_path)
+    except OSError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
         logger.error(f"Download request for non-existent file: {requested_path}")
         raise HTTPException(status_code=404, detail="File not found or not yet generated.")
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
 
     # Check task status (optional but good practice)
     # Extract task_id from filename if needed, e.g., filename format deckname_taskid.apkg
@@ -329,11 +365,17 @@ async def download_generated_deck(filename: str):
     # if TASK_STATUS_DB.get(task_id, {}).get("status") != "completed":
     #    raise HTTPException(status_code=404, detail="Deck generation not completed.")
 
+    if request.headers.get("if-none-match") == etag:
+        logger.info(f"Deck file unchanged since the client's copy: {requested_path}")
+        return Response(status_code=304, headers=cache_headers)
+
     logger.info(f"Serving file for download: {requested_path}")
     return FileResponse(
         path=str(requested_path),
         media_type="application/octet-stream", # Standard for .apkg downloads
-        filename=filename # Suggests the original filename to the browser
+        filename=filename, # Suggests the original filename to the browser
+        stat_result=stat_result,
+        headers=cache_headers
     )
 
 # --- Root and Health Check ---
@@ -152,9 +152,15 @@ def add(sentence, deck_name, source_lang, target_lang, no_grammar, audio):
 
         return output_file
 
+    async def run_and_close():
+        try:
+            return await generate_single_card_async()
+        finally:
+            await container.aclose()
+
     try:
         # Run the async function
-        output = asyncio.run(generate_single_card_async())
+        output = asyncio.run(run_and_close())
         click.echo(f"✅ Card created in deck '{deck_name}': {output}")
         click.echo(f"📥 Import this file into Anki!")
     except Exception as e:
@@ -239,9 +245,15 @@ def batch(file_path, deck_name, column, source_lang, target_lang, no_grammar, au
         )
         return output_file
 
+    async def run_and_close():
+        try:
+            return await generate_deck_async()
+        finally:
+            await container.aclose()
+
     try:
         # Run the async function
-        output = asyncio.run(generate_deck_async())
+        output = asyncio.run(run_and_close())
         # Use final count from deck object if available, otherwise use input count
         # (This requires deck_generator to return Deck object or count, currently it returns path)
         # For now, stick with input count for the message.
@@ -326,12 +338,15 @@ def test():
          async def test_deepl():
              translator = container.translation_service # Get configured instance
              try:
-                 # Use usage endpoint which requires less quota
-                 await translator.client.get(f"{translator.base_url}/usage", params={'auth_key': translator.api_key})
+                 # Use usage endpoint which requires less quota; the client sends the auth header
+                 response = await translator.client.get(f"{translator.base_url}/usage")
+                 response.raise_for_status()
                  click.echo("    ✅ DeepL API connection successful.")
              except Exception as e:
                  click.echo(f"    ❌ DeepL Error: {e}")
                  return False # Indicate failure
+             finally:
+                 await container.aclose()
              return True # Indicate success
 
          if not asyncio.run(test_deepl()):
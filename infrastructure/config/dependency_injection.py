@@ -1,6 +1,7 @@
 # infrastructure/config/dependency_injection.py
 from functools import lru_cache
 import os
+from openai import AsyncOpenAI
 from core.domain.interfaces import (
     TranslationService, DictionaryService, AudioService,
     StorageService, CacheService, GrammarService, DeckExporter
@@ -9,8 +10,11 @@ from core.use_cases.generate_card import GenerateCardUseCase
 from core.use_cases.generate_deck import GenerateDeckUseCase
 from adapters.translation.deepl_adapter import DeepLTranslationAdapter
 from adapters.translation.openai_adapter import OpenAITranslationAdapter
+from adapters.translation.openai_batch_adapter import OpenAIBatchTranslationAdapter
 from adapters.dictionary.openai_dictionary_adapter import OpenAIDictionaryAdapter
+from adapters.dictionary.openai_batch_dictionary_adapter import OpenAIBatchDictionaryAdapter
 from adapters.grammar.openai_grammar_adapter import OpenAIGrammarAdapter
+from adapters.openai_client import aclose_openai_clients, get_async_openai_client
 from adapters.audio.google_tts_adapter import GoogleTTSAdapter
 from adapters.storage.local_file_storage import LocalFileStorage
 from adapters.storage.s3_storage import S3StorageAdapter
@@ -36,6 +40,27 @@ class ServiceContainer:
         self._storage_service: Optional[StorageService] = None
         self._deck_exporter: Optional[DeckExporter] = None
 
+    @property
+    def _openai_client(self) -> AsyncOpenAI:
+        # One client (pool, retries, rate limit) shared by every OpenAI adapter
+        return get_async_openai_client(
+            self.settings.openai_api_key,
+            max_retries=self.settings.openai_max_retries,
+            max_concurrency=self.settings.openai_max_concurrency,
+            requests_per_minute=self.settings.openai_requests_per_minute
+        )
+
+    @property
+    def _uses_batch_api(self) -> bool:
+        return "openai_batch" in (self.settings.translation_provider, self.settings.dictionary_provider)
+
+    @property
+    def _openai_cache_path(self) -> Optional[str]:
+        # Lookups and translations are kept next to the generated media when storage is local
+        if self.settings.storage_type == "local":
+            return os.path.join(self.settings.storage_path, "openai_cache.sqlite3")
+        return None
+
     @property
     def translation_service(self) -> TranslationService:
         if self._translation_service is None:
@@ -45,8 +70,15 @@ class ServiceContainer:
                     api_key=self.settings.deepl_api_key
                 )
             elif self.settings.openai_api_key:
-                 self._translation_service = OpenAITranslationAdapter(
-                    api_key=self.settings.openai_api_key
+                 # "openai_batch" trades turnaround (up to 24h) for half-price Batch API requests
+                 translation_adapter = (
+                    OpenAIBatchTranslationAdapter
+                    if self.settings.translation_provider == "openai_batch" else OpenAITranslationAdapter
+                 )
+                 self._translation_service = translation_adapter(
+                    api_key=self.settings.openai_api_key,
+                    cache_path=self._openai_cache_path,
+                    client=self._openai_client
                 )
             else:
                  raise ValueError("No valid translation provider configured (check API keys).")
@@ -57,8 +89,15 @@ class ServiceContainer:
         if self._dictionary_service is None:
             if not self.settings.openai_api_key:
                  raise ValueError("OpenAI API key is required for the dictionary service.")
-            self._dictionary_service = OpenAIDictionaryAdapter(
-                api_key=self.settings.openai_api_key
+            # "openai_batch" trades turnaround (up to 24h) for half-price Batch API requests
+            dictionary_adapter = (
+                OpenAIBatchDictionaryAdapter
+                if self.settings.dictionary_provider == "openai_batch" else OpenAIDictionaryAdapter
+            )
+            self._dictionary_service = dictionary_adapter(
+                api_key=self.settings.openai_api_key,
+                cache_path=self._openai_cache_path,
+                client=self._openai_client
             )
         return self._dictionary_service
 
@@ -68,7 +107,9 @@ class ServiceContainer:
             if not self.settings.openai_api_key:
                  raise ValueError("OpenAI API key is required for the grammar service.")
             self._grammar_service = OpenAIGrammarAdapter(
-                api_key=self.settings.openai_api_key
+                api_key=self.settings.openai_api_key,
+                cache_path=self._openai_cache_path,
+                client=self._openai_client
             )
         return self._grammar_service
 
@@ -81,9 +122,16 @@ class ServiceContainer:
                 cred_path = self.settings.google_application_credentials
                 if os.path.exists(cred_path):
                     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
-                    # Pass the voice dictionary to the adapter
+                    # Pass the voice dictionary to the adapter, plus the local audio
+                    # directory so previously saved audio is reused
+                    audio_dir = (
+                        os.path.join(self.settings.storage_path, "audio")
+                        if self.settings.storage_type == "local" else None
+                    )
                     self._audio_service = GoogleTTSAdapter(
-                        voice_map=self.settings.google_tts_voices
+                        voice_map=self.settings.google_tts_voices,
+                        storage_path=audio_dir,
+                        max_concurrency=self.settings.google_tts_max_concurrency
                     )
                 else:
                     print(f"⚠️ Warning: Google credentials file not found at '{cred_path}'. Audio disabled.")
@@ -114,7 +162,7 @@ class ServiceContainer:
         """Provides the deck exporter instance."""
         if self._deck_exporter is None:
             # Currently only GenankiExporter is implemented
-            self._deck_exporter = GenankiExporter()
+            self._deck_exporter = GenankiExporter(max_workers=self.settings.export_max_workers)
         return self._deck_exporter
 
     def create_card_generator(self) -> GenerateCardUseCase:
@@ -138,9 +186,23 @@ class ServiceContainer:
             storage=self.storage_service,
              # Pass default languages from settings
             default_source_lang=self.settings.default_source_language,
-            default_target_lang=self.settings.default_target_language
+            default_target_lang=self.settings.default_target_language,
+            # Batch API jobs take their requests from whatever is pending, so throttling
+            # cards would split the deck into many sequential jobs of up to 24h each
+            max_concurrency=None if self._uses_batch_api else self.settings.deck_max_concurrency
         )
 
+    async def aclose(self) -> None:
+        """Closes pooled HTTP connections and background tasks held by the services; call on shutdown."""
+        for service in (self._translation_service, self._dictionary_service, self._grammar_service):
+            if service is not None and hasattr(service, "aclose"):
+                await service.aclose()
+        await aclose_openai_clients()
+        # The closed clients can't be reused, so services are rebuilt on next access
+        self._translation_service = None
+        self._dictionary_service = None
+        self._grammar_service = None
+
 @lru_cache()
 def get_container() -> ServiceContainer:
     """Get singleton container"""
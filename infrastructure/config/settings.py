@@ -31,13 +31,25 @@ class Settings(BaseSettings):
         # Add more languages and voices here as needed
     }
     # --- End New Voice Dictionary ---
+    google_tts_max_concurrency: int = 16 # Synthesis requests in flight at once across a deck
 
-    # Translation
+    # OpenAI request limits (shared by the translation, dictionary and grammar adapters)
+    openai_max_retries: int = 5
+    openai_max_concurrency: int = 64
+    openai_requests_per_minute: Optional[int] = None # Set to stay under your account's RPM limit
+
+    # Translation ("openai", "openai_batch" for the slower, cheaper Batch API, or "deepl")
     translation_provider: str = "openai"
 
-    # Dictionary
+    # Dictionary ("openai", or "openai_batch" for the slower, cheaper Batch API)
     dictionary_provider: str = "openai"
 
+    # Cards generated at once while building a deck (unlimited with a Batch API provider)
+    deck_max_concurrency: int = 16
+
+    # Worker processes formatting note fields when exporting large decks (1 keeps it in-process)
+    export_max_workers: int = os.cpu_count() or 1
+
     # Language Settings
     default_source_language: str = "fr"
     default_target_language: str = "en"
@@ -0,0 +1,53 @@
+# tests/unit/test_deepl_adapter.py
+import httpx
+import pytest
+from adapters.translation.deepl_adapter import DeepLTranslationAdapter
+
+# --- Test Fixtures ---
+
+@pytest.fixture
+def requests_seen():
+    return []
+
+@pytest.fixture
+def adapter(requests_seen):
+    """DeepL adapter whose persistent client is backed by a fake transport."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(200, json={"translations": [{"text": "Hello", "detected_source_language": "FR"}]})
+
+    adapter = DeepLTranslationAdapter(api_key="test-key:fx")
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return adapter
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_translate_reuses_adapter_client(adapter, requests_seen):
+    """Translations go through the adapter's persistent client to the free endpoint."""
+    first = await adapter.translate("Bonjour", "fr", "en")
+    second = await adapter.translate("Salut", "fr", "en")
+    await adapter.aclose()
+
+    assert first.text == second.text == "Hello"
+    assert first.provider == "deepl"
+    assert [str(r.url) for r in requests_seen] == ["https://api-free.deepl.com/v2/translate"] * 2
+    assert adapter.client.is_closed
+
+@pytest.mark.asyncio
+async def test_api_key_is_sent_as_header_not_form_field():
+    """The key travels in the Authorization header; request bodies carry only the text."""
+    adapter = DeepLTranslationAdapter(api_key="test-key:fx")
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(200, json={"translations": [{"text": "Hello"}]})
+
+    adapter.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), headers=adapter.client.headers
+    )
+    await adapter.translate("Bonjour", "fr", "en")
+
+    assert sent[0].headers["Authorization"] == "DeepL-Auth-Key test-key:fx"
+    assert b"auth_key" not in sent[0].content
@@ -0,0 +1,309 @@
+# tests/unit/test_genanki_exporter.py
+import dataclasses
+import json
+import zipfile
+import threading
+import pytest
+from adapters.anki import genanki_exporter
+from adapters.anki.genanki_exporter import GenankiExporter
+from core.domain.models import (
+    Deck, FlashCard, Sentence, Translation, WordBreakdown, Word, GrammarNote,
+    AudioFile, AudioFormat, sentence_id
+)
+
+# --- Test Fixtures ---
+
+@pytest.fixture
+def sample_card():
+    """Provides a fully populated French -> English flashcard."""
+    return FlashCard(
+        sentence=Sentence(text="Je mange une pomme.", language="fr"),
+        translation=Translation(text="I eat an apple.", target_language="en"),
+        word_breakdown=WordBreakdown(words=[
+            Word(text="Je", lemma="je", pos="pronoun", definition="I", definition_native="moi"),
+            Word(text="mange", lemma="manger", pos="verb", definition="eat"),
+        ]),
+        grammar_notes=[
+            GrammarNote(
+                title="Present tense",
+                explanation="'mange' is the present tense of 'manger'.",
+                examples=["Tu manges", "Il mange"]
+            )
+        ],
+        tags=["food", "verbs"]
+    )
+
+# --- Test Cases ---
+
+def test_card_model_is_shared_between_instances():
+    """Models for the same language pair are built once and reused."""
+    first = GenankiExporter()._get_or_create_card_model(("fr", "en"))
+    second = GenankiExporter()._get_or_create_card_model(("fr", "en"))
+
+    assert first is second
+    assert "{{French}}" in first.templates[0]['qfmt']
+    assert "{{English}}" in first.templates[0]['afmt']
+
+@pytest.mark.asyncio
+async def test_export_deck_writes_apkg(tmp_path, sample_card):
+    """Exporting a deck writes an .apkg file and returns its path."""
+    exporter = GenankiExporter(storage_path=str(tmp_path / "audio"))
+    deck = Deck(name="Test Deck", language_pair=("fr", "en"), cards=[sample_card])
+
+    output = await exporter.export_deck(deck, str(tmp_path / "test.apkg"))
+
+    assert output == str((tmp_path / "test.apkg").resolve())
+    assert (tmp_path / "test.apkg").is_file()
+
+def test_format_word_breakdown_html(sample_card):
+    """Word breakdown renders one line per word plus native definitions."""
+    html = GenankiExporter()._format_word_breakdown(sample_card, ("fr", "en"))
+
+    assert html == (
+        "<b>Je</b> <span class='pos'>(pronoun)</span>: <span class='definition-target'>I</span>"
+        "<br><span class='definition-native'>(fr: moi)</span>"
+        "<br><b>mange</b> <span class='pos'>(verb)</span>: <span class='definition-target'>eat</span>"
+    )
+
+def test_format_grammar_notes_html(sample_card):
+    """Grammar notes render as an unordered list with examples."""
+    html = GenankiExporter()._format_grammar_notes(sample_card)
+
+    assert html == (
+        "<ul><li><strong>Present tense:</strong> 'mange' is the present tense of 'manger'."
+        "<br><em> - Tu manges</em><br><em> - Il mange</em><br></li></ul>"
+    )
+
+@pytest.mark.asyncio
+async def test_format_fields_in_pool_matches_serial(sample_card):
+    """Worker-process formatting produces the same fields as the serial path, even when
+    the exporter itself holds things that can't be pickled."""
+    exporter = GenankiExporter(max_workers=2, progress_callback=lambda percent, message: None)
+    cards = [sample_card] * 3
+
+    pooled = await exporter._format_fields_in_pool(cards, ("fr", "en"))
+
+    assert pooled == [exporter._format_note_fields(card, ("fr", "en")) for card in cards]
+
+@pytest.mark.asyncio
+async def test_export_deck_includes_existing_audio(tmp_path, sample_card):
+    """Audio files present in storage are resolved and packaged."""
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    (audio_dir / "abc123.mp3").write_bytes(b"fake mp3")
+    sample_card.audio = AudioFile(filename="abc123.mp3", format=AudioFormat.MP3)
+    exporter = GenankiExporter(storage_path=str(audio_dir))
+
+    assert exporter._resolve_media_paths(["abc123.mp3", "missing.mp3"]) == [str(audio_dir / "abc123.mp3")]
+
+    output = await exporter.export_deck(
+        Deck(name="Audio Deck", language_pair=("fr", "en"), cards=[sample_card]),
+        str(tmp_path / "audio.apkg")
+    )
+
+    with zipfile.ZipFile(output) as apkg:
+        assert json.loads(apkg.read("media")) == {"0": "abc123.mp3"}
+        assert apkg.read("0") == b"fake mp3"
+
+@pytest.mark.asyncio
+async def test_export_deck_skips_unchanged_rewrite(tmp_path, sample_card, monkeypatch):
+    """Re-exporting an unchanged deck reuses the existing package."""
+    writes = []
+    package_cls = genanki_exporter._PrefetchedMediaPackage
+    original_write = package_cls.write_to_file
+    monkeypatch.setattr(package_cls, "write_to_file", lambda self, path: writes.append(path) or original_write(self, path))
+    exporter = GenankiExporter(storage_path=str(tmp_path / "audio"))
+    deck = Deck(name="Test Deck", language_pair=("fr", "en"), cards=[sample_card])
+    output_path = str(tmp_path / "test.apkg")
+
+    await exporter.export_deck(deck, output_path)
+    assert (tmp_path / "test.export_manifest.json").is_file()
+    assert await exporter.export_deck(deck, output_path) == str((tmp_path / "test.apkg").resolve())
+    assert len(writes) == 1
+
+    sample_card.translation = dataclasses.replace(sample_card.translation, text="I am eating an apple.")
+    await exporter.export_deck(deck, output_path)
+    assert len(writes) == 2
+
+@pytest.mark.asyncio
+async def test_export_deck_writes_package_off_event_loop(tmp_path, sample_card, monkeypatch):
+    """The blocking .apkg write runs in a worker thread, not on the event loop."""
+    writer_threads = []
+    package_cls = genanki_exporter._PrefetchedMediaPackage
+    original_write = package_cls.write_to_file
+    monkeypatch.setattr(
+        package_cls, "write_to_file",
+        lambda self, path: writer_threads.append(threading.get_ident()) or original_write(self, path)
+    )
+    exporter = GenankiExporter(storage_path=str(tmp_path / "audio"))
+    deck = Deck(name="Test Deck", language_pair=("fr", "en"), cards=[sample_card])
+
+    assert await exporter.export_deck(deck, str(tmp_path / "test.apkg"))
+    assert writer_threads and writer_threads[0] != threading.get_ident()
+
+@pytest.mark.asyncio
+async def test_export_deck_batches_progress_callbacks(tmp_path, sample_card):
+    """Progress is reported in batches rather than once per card."""
+    reports = []
+    exporter = GenankiExporter(
+        storage_path=str(tmp_path / "audio"),
+        progress_callback=lambda progress, message: reports.append((progress, message))
+    )
+    deck = Deck(name="Big Deck", language_pair=("fr", "en"), cards=[sample_card] * 1000)
+
+    await exporter.export_deck(deck, str(tmp_path / "big.apkg"))
+
+    assert len(reports) == 102
+    assert reports[99] == (90.0, "Processing card 1000/1000")
+    assert reports[-1] == (100.0, "Complete!")
+
+def test_formatters_escape_html(sample_card):
+    """Markup characters in model output are escaped rather than injected."""
+    sample_card.word_breakdown = WordBreakdown(words=[
+        Word(text="<b>", lemma="", pos="x&y", definition='a "quote"'),
+    ])
+    sample_card.grammar_notes = [GrammarNote(title="A < B", explanation="C > D", examples=["E & F"])]
+    exporter = GenankiExporter()
+
+    assert exporter._format_word_breakdown(sample_card, ("fr", "en")) == (
+        "<b>&lt;b&gt;</b> <span class='pos'>(x&amp;y)</span>: "
+        "<span class='definition-target'>a &quot;quote&quot;</span>"
+    )
+    assert exporter._format_grammar_notes(sample_card) == (
+        "<ul><li><strong>A &lt; B:</strong> C &gt; D<br><em> - E &amp; F</em><br></li></ul>"
+    )
+
+def test_stable_ids_are_unchanged():
+    """Deck and model IDs must stay stable so re-imports update existing Anki decks."""
+    exporter = GenankiExporter()
+
+    assert exporter._generate_stable_id("fr-en", "anki-card-generator-model-salt") == 985179000
+    assert exporter._generate_stable_deck_id("French Practice", ("fr", "en")) == 1952491195
+
+def test_tags_field_follows_tag_changes(sample_card):
+    """The cached tag string never goes stale when a card's tags are edited."""
+    exporter = GenankiExporter()
+
+    assert exporter._format_note_fields(sample_card, ("fr", "en"))[5] == "food verbs"
+    sample_card.tags.append("daily")
+    assert exporter._format_note_fields(sample_card, ("fr", "en"))[5] == "food verbs daily"
+
+def test_missing_media_logged_once(tmp_path, caplog):
+    """Missing audio files are summarised in a single warning."""
+    exporter = GenankiExporter(storage_path=str(tmp_path))
+
+    with caplog.at_level("WARNING"):
+        assert exporter._resolve_media_paths([f"missing{i}.mp3" for i in range(50)]) == []
+
+    assert len(caplog.records) == 1
+    assert "50 audio file(s) not found" in caplog.records[0].getMessage()
+    assert "(+40 more)" in caplog.records[0].getMessage()
+
+def test_card_model_uses_minified_css():
+    """The model CSS is stored without comments or layout whitespace."""
+    css = GenankiExporter()._get_or_create_card_model(("fr", "en")).css
+
+    assert "/*" not in css and "\n" not in css
+    assert ".nightMode .replay-button:hover svg{fill: #8fbcbb;}" in css
+    assert "@media (max-width: 600px){" in css
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_export_manifest_round_trip(tmp_path, monkeypatch, use_orjson):
+    """Manifests round-trip with orjson when installed and with stdlib json otherwise."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(genanki_exporter, "orjson", None)
+    exporter = GenankiExporter()
+    manifest = {"deck_id": 1, "model": "abc", "media": ["a.mp3"], "notes": {"guid": "digest"}}
+    manifest_path = tmp_path / "deck.export_manifest.json"
+
+    exporter._save_export_manifest(manifest_path, manifest)
+
+    assert exporter._load_export_manifest(manifest_path) == manifest
+    manifest_path.write_text("{not json")
+    assert exporter._load_export_manifest(manifest_path) is None
+
+@pytest.mark.asyncio
+async def test_regenerated_deck_reuses_unchanged_package(tmp_path, monkeypatch):
+    """Cards rebuilt from the same content get content-derived IDs, so the re-export is skipped."""
+    writes = []
+    package_cls = genanki_exporter._PrefetchedMediaPackage
+    original_write = package_cls.write_to_file
+    monkeypatch.setattr(package_cls, "write_to_file", lambda self, path: writes.append(path) or original_write(self, path))
+    exporter = GenankiExporter(storage_path=str(tmp_path / "audio"))
+
+    def build_deck():
+        card = FlashCard(sentence=Sentence(text="Bonjour.", language="fr", id=sentence_id("fr", "Bonjour.")),
+                         translation=Translation(text="Hello.", target_language="en"),
+                         word_breakdown=WordBreakdown(words=[]))
+        return Deck(name="Rebuilt", language_pair=("fr", "en"), cards=[card])
+
+    await exporter.export_deck(build_deck(), str(tmp_path / "rebuilt.apkg"))
+    await exporter.export_deck(build_deck(), str(tmp_path / "rebuilt.apkg"))
+
+    assert len(writes) == 1
+
+@pytest.mark.asyncio
+async def test_cards_without_sentence_id_get_deterministic_guids(tmp_path, sample_card):
+    """Cards lacking a sentence ID get positional IDs, distinct per card and stable across exports."""
+    sample_card.sentence.id = None
+    second = FlashCard(sentence=Sentence(text="Bonjour.", language="fr", id=None),
+                       translation=Translation(text="Hello.", target_language="en"),
+                       word_breakdown=WordBreakdown(words=[]))
+    exporter = GenankiExporter(storage_path=str(tmp_path / "audio"))
+    deck = Deck(name="No IDs", language_pair=("fr", "en"), cards=[sample_card, second])
+    output_path = str(tmp_path / "no_ids.apkg")
+
+    await exporter.export_deck(deck, output_path)
+    first_manifest = json.loads((tmp_path / "no_ids.export_manifest.json").read_text())
+    await exporter.export_deck(deck, output_path)
+    second_manifest = json.loads((tmp_path / "no_ids.export_manifest.json").read_text())
+
+    assert len(first_manifest["notes"]) == 2
+    assert first_manifest["notes"] == second_manifest["notes"]
+
+@pytest.mark.asyncio
+async def test_export_deck_places_relative_paths_in_output_dir(tmp_path, sample_card):
+    """Relative output paths are written under the configured output directory."""
+    exporter = GenankiExporter(storage_path=str(tmp_path / "audio"), output_dir=str(tmp_path / "decks"))
+    deck = Deck(name="Test Deck", language_pair=("fr", "en"), cards=[sample_card])
+
+    output = await exporter.export_deck(deck, "test.apkg")
+
+    assert output == str((tmp_path / "decks" / "test.apkg").resolve())
+    assert (tmp_path / "decks" / "test.apkg").is_file()
+
+@pytest.mark.asyncio
+async def test_export_deck_generates_missing_audio(tmp_path, sample_card):
+    """Cards without audio get it from the audio service and it is packaged."""
+    class FakeAudioService:
+        def __init__(self):
+            self.calls = []
+
+        async def generate_audio(self, text, language, format=AudioFormat.MP3):
+            self.calls.append((text, language))
+            return AudioFile(filename="generated.mp3", format=AudioFormat.MP3), b"generated audio"
+
+    audio_service = FakeAudioService()
+    exporter = GenankiExporter(storage_path=str(tmp_path / "audio"), audio_service=audio_service)
+
+    output = await exporter.export_deck(
+        Deck(name="Audio Deck", language_pair=("fr", "en"), cards=[sample_card]),
+        str(tmp_path / "audio.apkg")
+    )
+
+    assert audio_service.calls == [("Je mange une pomme.", "fr")]
+    assert sample_card.audio.filename == "generated.mp3"
+    with zipfile.ZipFile(output) as apkg:
+        assert json.loads(apkg.read("media")) == {"0": "generated.mp3"}
+        assert apkg.read("0") == b"generated audio"
+
+def test_format_audio_field_strips_directories(sample_card):
+    """The [sound:] tag only ever contains the bare filename."""
+    exporter = GenankiExporter()
+
+    sample_card.audio = AudioFile(filename="abc123.mp3", format=AudioFormat.MP3)
+    assert exporter._format_audio_field(sample_card) == "[sound:abc123.mp3]"
+    sample_card.audio = AudioFile(filename="storage/audio/abc123.mp3", format=AudioFormat.MP3)
+    assert exporter._format_audio_field(sample_card) == "[sound:abc123.mp3]"
@@ -1,7 +1,8 @@
 # tests/unit/test_generate_card_use_case.py
+import asyncio
 import pytest
 from core.use_cases.generate_card import GenerateCardUseCase
-from core.domain.models import AudioFile, GrammarNote
+from core.domain.models import AudioFile, GrammarNote, Translation
 from tests.mocks import (
     MockTranslationService,
     MockDictionaryService,
@@ -211,6 +212,80 @@ async def test_generate_card_without_grammar(mock_services):
     assert card.grammar_notes == []
     assert card.audio is not None # Audio should still generate by default
 
+@pytest.mark.asyncio
+async def test_generate_card_runs_services_concurrently(mock_services):
+    """Translation and word analysis are in flight at the same time."""
+    analysis_started = asyncio.Event()
+
+    class WaitingTranslator(MockTranslationService):
+        async def translate(self, text, source_lang, target_lang):
+            # Would time out if the dictionary were only called after translation
+            await asyncio.wait_for(analysis_started.wait(), timeout=1)
+            return await super().translate(text, source_lang, target_lang)
+
+    class SignallingDictionary(MockDictionaryService):
+        async def analyze_sentence(self, sentence, source_lang, target_lang):
+            analysis_started.set()
+            return await super().analyze_sentence(sentence, source_lang, target_lang)
+
+    use_case = GenerateCardUseCase(
+        translation_service=WaitingTranslator(),
+        dictionary_service=SignallingDictionary(),
+        audio_service=mock_services["audio"],
+        storage_service=mock_services["storage"],
+        grammar_service=mock_services["grammar"],
+        default_source_lang="fr",
+        default_target_lang="en"
+    )
+
+    card = await use_case.execute(sentence_text="Je mange une pomme.")
+
+    assert card.translation.text == "I eat an apple."
+    assert len(card.word_breakdown.words) == 4
+    assert card.audio.filename in mock_services["storage"].storage
+
+@pytest.mark.asyncio
+async def test_generate_card_cancels_remaining_steps_when_one_fails(mock_services):
+    """A translation error cancels the audio and grammar calls still in flight."""
+    started, cancelled = [], []
+
+    async def hang(step):
+        started.append(step)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(step)
+            raise
+
+    class FailingTranslator(MockTranslationService):
+        async def translate(self, text, source_lang, target_lang):
+            while len(started) < 2:
+                await asyncio.sleep(0)
+            raise ConnectionError("translation API down")
+
+    class HangingAudio(MockAudioService):
+        async def generate_audio(self, text, language, format=None):
+            return await hang("audio")
+
+    class HangingGrammar(MockGrammarService):
+        async def explain_grammar(self, sentence, language):
+            return await hang("grammar")
+
+    use_case = GenerateCardUseCase(
+        translation_service=FailingTranslator(),
+        dictionary_service=mock_services["dictionary"],
+        audio_service=HangingAudio(),
+        storage_service=mock_services["storage"],
+        grammar_service=HangingGrammar(),
+        default_source_lang="fr",
+        default_target_lang="en"
+    )
+
+    with pytest.raises(ConnectionError, match="translation API down"):
+        await asyncio.wait_for(use_case.execute(sentence_text="Je mange une pomme."), timeout=1)
+
+    assert sorted(cancelled) == ["audio", "grammar"]
+
 @pytest.mark.asyncio
 async def test_generate_card_handles_translation_failure(mock_services):
     """Test graceful handling if translation service returns None."""
@@ -237,6 +312,26 @@ async def test_generate_card_handles_translation_failure(mock_services):
     with pytest.raises(ValueError, match="Translation failed"):
         await use_case.execute(sentence_text=sentence_text)
 
+@pytest.mark.asyncio
+async def test_generate_card_rejects_translation_without_target_language(mock_services):
+    """A translator that leaves target_language empty is reported, not patched up."""
+    class SloppyTranslator(MockTranslationService):
+        async def translate(self, text, source_lang, target_lang):
+            return Translation(text="Hello", target_language="")
+
+    use_case = GenerateCardUseCase(
+        translation_service=SloppyTranslator(),
+        dictionary_service=mock_services["dictionary"],
+        audio_service=mock_services["audio"],
+        storage_service=mock_services["storage"],
+        grammar_service=mock_services["grammar"],
+        default_source_lang="fr",
+        default_target_lang="en"
+    )
+
+    with pytest.raises(TypeError, match="SloppyTranslator"):
+        await use_case.execute(sentence_text="Bonjour")
+
 @pytest.mark.asyncio
 async def test_generate_card_handles_dictionary_failure(mock_services):
     """Test graceful handling if dictionary service returns None."""
@@ -321,3 +416,23 @@ async def test_generate_card_handles_audio_storage_failure(mock_services):
     assert card.translation.text == "Hello"
      # Audio should be None because saving failed
     assert card.audio is None
+
+@pytest.mark.asyncio
+async def test_generate_card_derives_sentence_id_from_content(mock_services):
+    """Regenerating a sentence gives it the same ID (and so the same Anki note GUID)."""
+    use_case = GenerateCardUseCase(
+        translation_service=mock_services["translator"],
+        dictionary_service=mock_services["dictionary"],
+        audio_service=mock_services["audio"],
+        storage_service=mock_services["storage"],
+        grammar_service=mock_services["grammar"],
+        default_source_lang="fr",
+        default_target_lang="en"
+    )
+
+    first = await use_case.execute("Je mange une pomme.", include_audio=False, include_grammar=False)
+    again = await use_case.execute("Je mange une pomme.", include_audio=False, include_grammar=False)
+    other = await use_case.execute("Je mange une pomme.", source_lang="de", include_audio=False, include_grammar=False)
+
+    assert first.sentence.id == again.sentence.id
+    assert first.sentence.id != other.sentence.id
@@ -0,0 +1,100 @@
+# tests/unit/test_generate_deck_use_case.py
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from core.use_cases.generate_deck import GenerateDeckUseCase
+from core.domain.models import FlashCard, Sentence, Translation, WordBreakdown
+
+# --- Test Helpers ---
+
+class CountingCardGenerator:
+    """Builds trivial cards and records how many were being generated at once."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def execute(self, sentence_text, source_lang, target_lang, include_audio, include_grammar, created_at):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return FlashCard(
+            sentence=Sentence(text=sentence_text, language=source_lang),
+            translation=Translation(text=sentence_text.upper(), target_language=target_lang),
+            word_breakdown=WordBreakdown(words=[])
+        )
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_concurrency, expected_peak", [(3, 3), (None, 10)])
+async def test_generate_deck_limits_cards_in_flight(max_concurrency, expected_peak):
+    """At most max_concurrency cards are generated at once; None leaves the fan-out unbounded."""
+    card_generator = CountingCardGenerator()
+    exporter = MagicMock()
+    exporter.export_deck = AsyncMock(return_value="deck.apkg")
+    use_case = GenerateDeckUseCase(
+        card_generator=card_generator,
+        exporter=exporter,
+        storage=MagicMock(),
+        default_source_lang="fr",
+        default_target_lang="en",
+        max_concurrency=max_concurrency
+    )
+
+    output = await use_case.execute(
+        sentences=[f"Phrase {i}" for i in range(10)], deck_name="Test", output_path="deck.apkg"
+    )
+
+    assert output == "deck.apkg"
+    assert card_generator.peak == expected_peak
+    assert len(exporter.export_deck.await_args.kwargs["deck"].cards) == 10
+
+@pytest.mark.asyncio
+async def test_generate_deck_makes_one_card_per_distinct_sentence():
+    """Repeated sentences are generated once and appear once, in first-seen order."""
+    card_generator = CountingCardGenerator()
+    card_generator.execute = AsyncMock(side_effect=card_generator.execute)
+    exporter = MagicMock()
+    exporter.export_deck = AsyncMock(return_value="deck.apkg")
+    use_case = GenerateDeckUseCase(
+        card_generator=card_generator,
+        exporter=exporter,
+        storage=MagicMock(),
+        default_source_lang="fr",
+        default_target_lang="en"
+    )
+
+    await use_case.execute(
+        sentences=["Bonjour", "Merci", "Bonjour", "Salut", "Merci"], deck_name="Test", output_path="deck.apkg"
+    )
+
+    assert card_generator.execute.await_count == 3
+    cards = exporter.export_deck.await_args.kwargs["deck"].cards
+    assert [card.sentence.text for card in cards] == ["Bonjour", "Merci", "Salut"]
+
+@pytest.mark.asyncio
+async def test_generate_deck_reports_progress_in_steps():
+    """The progress callback fires about every 1% of the deck and on the last card."""
+    exporter = MagicMock()
+    exporter.export_deck = AsyncMock(return_value="deck.apkg")
+    use_case = GenerateDeckUseCase(
+        card_generator=CountingCardGenerator(),
+        exporter=exporter,
+        storage=MagicMock(),
+        default_source_lang="fr",
+        default_target_lang="en"
+    )
+    reports = []
+
+    await use_case.execute(
+        sentences=[f"Phrase {i}" for i in range(250)],
+        deck_name="Test",
+        output_path="deck.apkg",
+        progress_cb=lambda done, total: reports.append((done, total))
+    )
+
+    assert len(reports) == 125
+    assert reports[0] == (2, 250)
+    assert reports[-1] == (250, 250)
@@ -0,0 +1,84 @@
+# tests/unit/test_google_tts_adapter.py
+import asyncio
+import hashlib
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from adapters.audio.google_tts_adapter import GoogleTTSAdapter
+from core.domain.models import AudioFormat
+
+# --- Test Fixtures ---
+
+@pytest.fixture
+def adapter(tmp_path):
+    """Adapter with a fake async client and a temporary audio directory."""
+    adapter = GoogleTTSAdapter(voice_map={"fr": "fr-FR-Neural2-A"}, storage_path=str(tmp_path))
+    adapter.client = MagicMock()
+    adapter.client.synthesize_speech = AsyncMock(return_value=MagicMock(audio_content=b"synthesized"))
+    return adapter
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_generate_audio_reuses_in_memory_result(adapter):
+    """Repeated text is synthesized once; each call still gets its own AudioFile."""
+    first_model, first_data = await adapter.generate_audio("Bonjour", "fr")
+    second_model, second_data = await adapter.generate_audio("Bonjour", "fr")
+
+    assert adapter.client.synthesize_speech.await_count == 1
+    assert first_data == second_data == b"synthesized"
+    assert first_model.filename == second_model.filename
+    assert first_model is not second_model
+
+@pytest.mark.asyncio
+async def test_generate_audio_reuses_saved_file(adapter, tmp_path):
+    """Audio saved by an earlier run is returned without calling the API."""
+    filename = (await adapter.generate_audio("Salut", "fr"))[0].filename
+    adapter._audio_cache.clear()
+    adapter.client.synthesize_speech.reset_mock()
+    (tmp_path / filename).write_bytes(b"saved earlier")
+
+    model, data = await adapter.generate_audio("Salut", "fr", AudioFormat.MP3)
+
+    assert adapter.client.synthesize_speech.await_count == 0
+    assert model.filename == filename
+    assert data == b"saved earlier"
+
+@pytest.mark.asyncio
+async def test_generate_audio_selects_voice_from_table(adapter):
+    """Configured voices map to their API language code; unknown languages fall back."""
+    await adapter.generate_audio("Bonjour", "fr")
+    await adapter.generate_audio("Hallo", "de")
+
+    voices = [call.kwargs["request"].voice for call in adapter.client.synthesize_speech.await_args_list]
+    assert (voices[0].language_code, voices[0].name) == ("fr-FR", "fr-FR-Neural2-A")
+    assert (voices[1].language_code, voices[1].name) == ("en-US", "en-US-Standard-C")
+
+@pytest.mark.asyncio
+async def test_generate_audio_filename_is_content_hash(adapter):
+    """Filenames hash "<language>-<text>", so the same sentence always maps to the same file."""
+    model, _ = await adapter.generate_audio("Guten Tag", "de")
+
+    expected = hashlib.blake2b("de-Guten Tag".encode(), digest_size=16).hexdigest()
+    assert model.filename == f"{expected}.mp3"
+
+@pytest.mark.asyncio
+async def test_generate_audio_caps_concurrent_synthesis(tmp_path):
+    """No more than max_concurrency synthesis requests are in flight at once."""
+    adapter = GoogleTTSAdapter(voice_map={"fr": "fr-FR-Neural2-A"}, storage_path=str(tmp_path), max_concurrency=2)
+    in_flight, peak = 0, 0
+
+    async def synthesize(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return MagicMock(audio_content=b"synthesized")
+
+    adapter.client = MagicMock()
+    adapter.client.synthesize_speech = AsyncMock(side_effect=synthesize)
+
+    await asyncio.gather(*(adapter.generate_audio(f"Phrase {i}", "fr") for i in range(6)))
+
+    assert adapter.client.synthesize_speech.await_count == 6
+    assert peak == 2
@@ -0,0 +1,635 @@
+# tests/unit/test_openai_batching.py
+import asyncio
+import httpx
+import json
+import openai
+import pytest
+import sqlite3
+import sys
+import threading
+from unittest.mock import AsyncMock, MagicMock
+from adapters import openai_client
+from adapters.openai_client import DynamicBatcher, estimate_tokens, loads_json, pack_batches, resolve_in_batches
+from adapters.dictionary.openai_dictionary_adapter import OpenAIDictionaryAdapter
+from adapters.dictionary.openai_batch_dictionary_adapter import OpenAIBatchDictionaryAdapter
+from adapters.grammar.openai_grammar_adapter import OpenAIGrammarAdapter
+from adapters.translation.openai_adapter import OpenAITranslationAdapter
+from adapters.translation.openai_batch_adapter import OpenAIBatchTranslationAdapter
+
+# --- Test Helpers ---
+
+def completion(reply):
+    """A chat completion whose message is reply, JSON-encoded unless it is already a string."""
+    content = reply if isinstance(reply, str) else json.dumps(reply)
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+def replying(reply):
+    """A client whose chat completions all answer with reply."""
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=completion(reply))
+    return client
+
+# --- Test Cases ---
+
+def test_pack_batches_respects_token_and_item_budgets():
+    """Consecutive texts are grouped until either budget would be exceeded."""
+    # Estimated at 5, 5, 3 and 1 tokens
+    assert pack_batches(["a" * 16, "b" * 16, "c" * 8, "d"], token_budget=10, max_items=10) == [[0, 1], [2, 3]]
+    assert pack_batches(["a"] * 5, token_budget=100, max_items=2) == [[0, 1], [2, 3], [4]]
+    assert pack_batches(["x" * 50], token_budget=2, max_items=10) == [[0]]
+
+def test_estimate_tokens_counts_wide_scripts_per_character():
+    """Latin text is estimated at ~4 characters per token, CJK at one token per character."""
+    assert estimate_tokens("a" * 40) == 11
+    assert estimate_tokens("é" * 40) == 11
+    assert estimate_tokens("猫" * 40) == 41
+
+@pytest.mark.asyncio
+async def test_resolve_in_batches_splits_around_missing_results():
+    """Items a batched reply leaves out are retried in smaller batches, then singly."""
+    batch_calls, single_calls = [], []
+
+    async def fetch_batch(batch):
+        batch_calls.append(batch)
+        # Drop "c" whenever it is part of a batch
+        return {i: text.upper() for i, text in enumerate(batch) if text != "c"}
+
+    async def fetch_one(text):
+        single_calls.append(text)
+        return text.upper()
+
+    results = await resolve_in_batches(["a", "b", "c", "d"], fetch_batch, fetch_one, max_items=4)
+
+    assert results == ["A", "B", "C", "D"]
+    assert batch_calls == [["a", "b", "c", "d"]]
+    assert single_calls == ["c"]
+
+@pytest.mark.asyncio
+async def test_resolve_in_batches_raises_api_errors_without_splitting():
+    """An error the API would repeat for every request fails the batch after one call."""
+    calls = []
+    response = httpx.Response(401, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+    async def fetch_batch(batch):
+        calls.append(batch)
+        raise openai.AuthenticationError("invalid api key", response=response, body=None)
+
+    async def fetch_one(text):
+        calls.append(text)
+
+    with pytest.raises(openai.AuthenticationError):
+        await resolve_in_batches([f"text {i}" for i in range(20)], fetch_batch, fetch_one, max_items=20)
+
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_analyze_sentences_batch_uses_one_request():
+    """Several sentences are analyzed with a single chat completion."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    reply = {"results": [
+        {"index": 1, "words": [{"text": "Salut", "lemma": "salut", "pos": "interjection", "definition": "hi"}]},
+        {"index": 0, "words": [{"text": "Bonjour", "lemma": "bonjour", "pos": "interjection", "definition": "hello"}]},
+    ]}
+    adapter.client = replying(reply)
+
+    breakdowns = await adapter.analyze_sentences_batch(["Bonjour", "Salut"], "fr", "en")
+
+    assert adapter.client.chat.completions.create.await_count == 1
+    assert [b.words[0].definition for b in breakdowns] == ["hello", "hi"]
+
+@pytest.mark.asyncio
+async def test_concurrent_analyses_and_explanations_share_batched_requests():
+    """Cards generated together have their sentences analyzed and explained in batched requests."""
+    dictionary = OpenAIDictionaryAdapter(api_key="test-key", client=replying({"results": [
+        {"index": 0, "words": [{"text": "Bonjour", "lemma": "bonjour", "pos": "interjection", "definition": "hello"}]},
+        {"index": 1, "words": [{"text": "Salut", "lemma": "salut", "pos": "interjection", "definition": "hi"}]},
+    ]}))
+    grammar_adapter = OpenAIGrammarAdapter(api_key="test-key", client=replying({"results": [
+        {"index": 0, "notes": [{"title": "Greeting", "explanation": "Formal."}]},
+        {"index": 1, "notes": [{"title": "Greeting", "explanation": "Informal."}]},
+    ]}))
+
+    breakdowns = await asyncio.gather(*(dictionary.analyze_sentence(s, "fr", "en") for s in ("Bonjour", "Salut")))
+    notes = await asyncio.gather(*(grammar_adapter.explain_grammar(s, "fr") for s in ("Bonjour", "Salut")))
+
+    assert dictionary.client.chat.completions.create.await_count == 1
+    assert grammar_adapter.client.chat.completions.create.await_count == 1
+    assert [b.words[0].definition for b in breakdowns] == ["hello", "hi"]
+    assert [n[0].explanation for n in notes] == ["Formal.", "Informal."]
+
+@pytest.mark.asyncio
+async def test_dynamic_batcher_coalesces_concurrent_calls():
+    """Concurrent submits share a batch; a lone submit is sent on its own."""
+    batches = []
+
+    async def run_batch(items):
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    batcher = DynamicBatcher(run_batch, max_batch_size=3)
+
+    assert await asyncio.gather(*(batcher.submit(i) for i in range(5))) == [0, 2, 4, 6, 8]
+    assert await batcher.submit(7) == 14
+    assert batches == [[0, 1, 2], [3, 4], [7]]
+
+@pytest.mark.asyncio
+async def test_dynamic_batcher_fails_callers_left_without_a_result():
+    """A batch returning too few results fails every caller instead of leaving some hanging."""
+    async def run_batch(items):
+        return [item * 2 for item in items[:-1]]
+
+    batcher = DynamicBatcher(run_batch)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), 1
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_dynamic_batcher_aclose_stops_worker_and_cancels_waiting_callers():
+    """Closing cancels the running batch and its callers, and stops the background task."""
+    started = asyncio.Event()
+
+    async def run_batch(items):
+        started.set()
+        await asyncio.Event().wait()
+
+    batcher = DynamicBatcher(run_batch)
+    caller = asyncio.ensure_future(batcher.submit(1))
+    await started.wait()
+    worker = batcher._worker
+
+    await batcher.aclose()
+
+    assert worker.cancelled()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(caller, 1)
+
+@pytest.mark.asyncio
+async def test_concurrent_lookup_word_calls_share_one_request():
+    """Words looked up concurrently are resolved with a single chat completion."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    reply = {"results": [
+        {"index": 0, "lemma": "chat", "pos": "noun", "definition": "cat"},
+        {"index": 1, "lemma": "manger", "pos": "verb", "definition": "to eat"},
+    ]}
+    adapter.client = replying(reply)
+
+    words = await asyncio.gather(
+        adapter.lookup_word("chat", "fr", "en"),
+        adapter.lookup_word("mange", "fr", "en"),
+    )
+
+    assert adapter.client.chat.completions.create.await_count == 1
+    assert [(w.text, w.lemma, w.definition) for w in words] == [("chat", "chat", "cat"), ("mange", "manger", "to eat")]
+
+@pytest.mark.asyncio
+async def test_translate_caches_results_across_calls_and_runs(tmp_path):
+    """Repeated and concurrent translations of one text make a single request, and persist."""
+    cache_path = str(tmp_path / "cache.sqlite3")
+    adapter = OpenAITranslationAdapter(api_key="test-key", cache_path=cache_path)
+    adapter.client = replying("Hello")
+
+    first, second = await asyncio.gather(
+        adapter.translate("Bonjour", "fr", "en"),
+        adapter.translate("Bonjour ", "fr", "en"),
+    )
+    third = await adapter.translate("Bonjour", "fr", "en")
+
+    assert adapter.client.chat.completions.create.await_count == 1
+    assert first.text == second.text == third.text == "Hello"
+
+    reloaded = OpenAITranslationAdapter(api_key="test-key", cache_path=cache_path)
+    reloaded.client = MagicMock()
+    reloaded.client.chat.completions.create = AsyncMock()
+    assert (await reloaded.translate("Bonjour", "fr", "en")).text == "Hello"
+    reloaded.client.chat.completions.create.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_unreadable_persisted_entry_counts_as_cache_miss(tmp_path):
+    """A stored row that no longer decodes is refetched instead of failing the call."""
+    cache_path = str(tmp_path / "cache.sqlite3")
+    adapter = OpenAITranslationAdapter(api_key="test-key", cache_path=cache_path, client=replying("Hello"))
+    await adapter.translate("Bonjour", "fr", "en")
+    await adapter.aclose()
+    with sqlite3.connect(cache_path) as db:
+        db.execute("UPDATE translations SET value = '{\"unexpected\": 1}'")
+
+    reloaded = OpenAITranslationAdapter(api_key="test-key", cache_path=cache_path, client=replying("Hi"))
+
+    assert (await reloaded.translate("Bonjour", "fr", "en")).text == "Hi"
+    reloaded.client.chat.completions.create.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_persisted_cache_queries_run_off_the_event_loop(tmp_path, monkeypatch):
+    """SQLite reads and writes happen on the cache's own thread, and aclose closes the file."""
+    cache_path = str(tmp_path / "cache.sqlite3")
+    adapter = OpenAITranslationAdapter(api_key="test-key", cache_path=cache_path, client=replying("Hello"))
+    cache = type(adapter._cache)
+    threads = []
+    for name in ("_load", "_store"):
+        original = getattr(cache, name)
+        def recording(self, *args, original=original):
+            threads.append(threading.current_thread())
+            return original(self, *args)
+        monkeypatch.setattr(cache, name, recording)
+
+    await adapter.translate("Bonjour", "fr", "en")
+    await adapter.aclose()
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    assert adapter._cache._db is None
+    # Closed caches keep answering from memory
+    assert (await adapter.translate("Bonjour", "fr", "en")).text == "Hello"
+
+@pytest.mark.asyncio
+async def test_translate_sizes_max_tokens_from_estimated_source_tokens():
+    """The reply cap follows token estimates, so CJK sources get more room than Latin ones."""
+    adapter = OpenAITranslationAdapter(api_key="test-key")
+    adapter.client = replying("Hello")
+
+    await adapter.translate("a" * 40, "fr", "en")
+    await adapter.translate("猫" * 40, "ja", "en")
+
+    limits = [call.kwargs["max_tokens"] for call in adapter.client.chat.completions.create.await_args_list]
+    assert limits == [11 * 2 + 16, 41 * 2 + 16]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reply, expected", [
+    (' "Hello"\n', "Hello"),
+    ("“Hello”", "Hello"),
+    ("« Bonjour »", "Bonjour"),
+    ('He said "hi"', 'He said "hi"'),
+    ("the students’", "the students’"),
+])
+async def test_translate_strips_only_wrapping_quotes(reply, expected):
+    """Quotes wrapping the whole reply are removed; quotes inside the translation stay."""
+    adapter = OpenAITranslationAdapter(api_key="test-key")
+    adapter.client = replying(reply)
+
+    assert (await adapter.translate("Bonjour", "fr", "en")).text == expected
+
+@pytest.mark.asyncio
+async def test_translate_shares_results_through_cache_service():
+    """With a shared CacheService, one adapter's translations are reused by another."""
+    store = {}
+    shared = MagicMock()
+    shared.get = AsyncMock(side_effect=lambda key: store.get(key))
+    shared.set = AsyncMock(side_effect=lambda key, value, ttl=None: store.__setitem__(key, value))
+
+    writer = OpenAITranslationAdapter(api_key="test-key", shared_cache=shared)
+    writer.client = replying("Hello")
+    await writer.translate("Bonjour", "fr", "en")
+    assert [key.split(":")[0] for key in store] == ["translations"]
+
+    reader = OpenAITranslationAdapter(api_key="test-key", shared_cache=shared)
+    reader.client = MagicMock()
+    reader.client.chat.completions.create = AsyncMock()
+    assert (await reader.translate("Bonjour", "fr", "en")).text == "Hello"
+    reader.client.chat.completions.create.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_sentence_analyses_and_grammar_notes_persist_across_runs(tmp_path):
+    """A rebuilt deck reuses stored analyses and grammar notes instead of asking the model again."""
+    cache_path = str(tmp_path / "cache.sqlite3")
+    analysis = {"words": [{"text": "Merci", "lemma": "merci", "pos": "interjection", "definition": "thanks"}]}
+    grammar = {"notes": [{"title": "Politeness", "explanation": "A common courtesy.", "examples": ["Merci beaucoup"]}]}
+
+    dictionary = OpenAIDictionaryAdapter(api_key="test-key", cache_path=cache_path, client=replying(analysis))
+    grammar_adapter = OpenAIGrammarAdapter(api_key="test-key", cache_path=cache_path, client=replying(grammar))
+    await dictionary.analyze_sentence("Merci", "fr", "en")
+    await grammar_adapter.explain_grammar("Merci", "fr")
+
+    dictionary = OpenAIDictionaryAdapter(api_key="test-key", cache_path=cache_path, client=replying(None))
+    grammar_adapter = OpenAIGrammarAdapter(api_key="test-key", cache_path=cache_path, client=replying(None))
+    breakdown = await dictionary.analyze_sentence("Merci", "fr", "en")
+    notes = await grammar_adapter.explain_grammar("Merci", "fr")
+
+    dictionary.client.chat.completions.create.assert_not_awaited()
+    grammar_adapter.client.chat.completions.create.assert_not_awaited()
+    assert [(w.lemma, w.definition) for w in breakdown.words] == [("merci", "thanks")]
+    assert [(n.title, n.examples) for n in notes] == [("Politeness", ["Merci beaucoup"])]
+
+@pytest.mark.asyncio
+async def test_batch_dictionary_adapter_submits_one_batch_job():
+    """Sentences analyzed together are sent as one Batch API job and parsed from its output."""
+    adapter = OpenAIBatchDictionaryAdapter(api_key="test-key", collect_window=0, poll_interval=0)
+    submitted = {}
+
+    async def create_file(file, purpose):
+        submitted["lines"] = [json.loads(line) for line in file[1].decode("utf-8").splitlines()]
+        return MagicMock(id="file-in")
+
+    def words(sentence):
+        return [{"text": sentence, "lemma": sentence.lower(), "pos": "noun", "definition": "x"}]
+
+    def output_line(request):
+        last_line = request["body"]["messages"][0]["content"].splitlines()[-1]
+        if last_line.startswith("["):
+            # Concurrent analyses are packed into one prompt listing the sentences as a JSON array
+            reply = {"results": [{"index": i, "words": words(s)} for i, s in enumerate(json.loads(last_line))]}
+        else:
+            reply = {"words": words(last_line.strip('"'))}
+        body = {"choices": [{"message": {"content": json.dumps(reply)}}]}
+        return json.dumps({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}})
+
+    async def file_content(file_id):
+        return MagicMock(text="\n".join(output_line(request) for request in submitted["lines"]))
+
+    adapter.client = MagicMock()
+    adapter.client.files.create = AsyncMock(side_effect=create_file)
+    adapter.client.files.content = AsyncMock(side_effect=file_content)
+    adapter.client.batches.create = AsyncMock(return_value=MagicMock(id="batch-1", status="validating"))
+    adapter.client.batches.retrieve = AsyncMock(
+        return_value=MagicMock(id="batch-1", status="completed", output_file_id="file-out")
+    )
+
+    breakdowns = await asyncio.gather(
+        adapter.analyze_sentence("Chat", "fr", "en"),
+        adapter.analyze_sentence("Chien", "fr", "en"),
+    )
+
+    adapter.client.batches.create.assert_awaited_once()
+    assert len(submitted["lines"]) == 1
+    assert [b.words[0].lemma for b in breakdowns] == ["chat", "chien"]
+
+@pytest.mark.asyncio
+async def test_batch_translation_adapter_polls_job_with_backoff(monkeypatch):
+    """Concurrent translations go out as one batched prompt in one job, polled with growing waits."""
+    adapter = OpenAIBatchTranslationAdapter(api_key="test-key", collect_window=0, poll_interval=1)
+    submitted, waits = {}, []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        waits.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(openai_client.asyncio, "sleep", sleep)
+
+    async def create_file(file, purpose):
+        submitted["lines"] = [json.loads(line) for line in file[1].decode("utf-8").splitlines()]
+        return MagicMock(id="file-in")
+
+    def output_line(request):
+        texts = json.loads(request["body"]["messages"][0]["content"].splitlines()[-1])
+        reply = {"translations": [{"index": i, "text": text.upper()} for i, text in enumerate(texts)]}
+        body = {"choices": [{"message": {"content": json.dumps(reply)}}]}
+        return json.dumps({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}})
+
+    async def file_content(file_id):
+        return MagicMock(text="\n".join(output_line(request) for request in submitted["lines"]))
+
+    adapter.client = MagicMock()
+    adapter.client.files.create = AsyncMock(side_effect=create_file)
+    adapter.client.files.content = AsyncMock(side_effect=file_content)
+    adapter.client.batches.create = AsyncMock(return_value=MagicMock(id="batch-1", status="validating"))
+    adapter.client.batches.retrieve = AsyncMock(side_effect=[
+        MagicMock(id="batch-1", status="in_progress"),
+        MagicMock(id="batch-1", status="in_progress"),
+        MagicMock(id="batch-1", status="completed", output_file_id="file-out"),
+    ])
+
+    translations = await asyncio.gather(
+        adapter.translate("chat", "fr", "en"),
+        adapter.translate("chien", "fr", "en"),
+    )
+
+    adapter.client.batches.create.assert_awaited_once()
+    assert len(submitted["lines"]) == 1
+    assert [t.text for t in translations] == ["CHAT", "CHIEN"]
+    assert [w for w in waits if w >= 1] == [1, 2, 4]
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_loads_json_with_and_without_orjson(monkeypatch, use_orjson):
+    """Replies parse the same either way, and bad JSON raises json.JSONDecodeError."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(openai_client, "orjson", None)
+
+    assert loads_json('{"words": [{"text": "été"}]}') == {"words": [{"text": "été"}]}
+    with pytest.raises(json.JSONDecodeError):
+        loads_json("not json")
+
+@pytest.mark.asyncio
+async def test_analyze_sentence_accepts_bare_word_array():
+    """A reply that is just the word array, without the "words" wrapper, is still parsed."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    reply = [{"text": "Bonjour", "lemma": "bonjour", "pos": "interjection", "definition": "hello"}]
+    adapter.client = replying(reply)
+
+    breakdown = await adapter.analyze_sentence("Bonjour", "fr", "en")
+
+    assert [w.definition for w in breakdown.words] == ["hello"]
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_sentence_analyses_share_one_request():
+    """The same sentence analyzed concurrently is sent once; callers get separate lists."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    reply = {"words": [{"text": "Merci", "lemma": "merci", "pos": "interjection", "definition": "thanks"}]}
+
+    async def create(**kwargs):
+        await asyncio.sleep(0)  # Let the second call arrive while this one is in flight
+        return completion(reply)
+
+    adapter.client = MagicMock()
+    adapter.client.chat.completions.create = AsyncMock(side_effect=create)
+
+    first, second = await asyncio.gather(
+        adapter.analyze_sentence("Merci", "fr", "en"),
+        adapter.analyze_sentence("Merci", "fr", "en"),
+    )
+
+    assert adapter.client.chat.completions.create.await_count == 1
+    assert first.words == second.words and first.words is not second.words
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_first_caller():
+    """Cancelling the caller that started a shared fetch leaves the other callers waiting for it."""
+    flights = openai_client.SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return "Hello"
+
+    first = asyncio.ensure_future(flights.run(("k",), fetch))
+    second = asyncio.ensure_future(flights.run(("k",), fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "Hello"
+    assert first.cancelled()
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_fetch_once_every_caller_is_gone():
+    """With no callers left, the shared fetch is cancelled rather than left running."""
+    flights = openai_client.SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.ensure_future(flights.run(("k",), fetch))
+    await asyncio.sleep(0)
+    caller.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+@pytest.mark.asyncio
+async def test_single_flight_starts_fresh_fetch_for_caller_arriving_after_cancel():
+    """A caller arriving while the abandoned fetch is being cancelled gets its own fetch."""
+    flights = openai_client.SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.Event().wait()
+        return "Hello"
+
+    caller = asyncio.ensure_future(flights.run(("k",), fetch))
+    await asyncio.sleep(0)
+    caller.cancel()
+    while not caller.done():
+        await asyncio.sleep(0)
+
+    assert await asyncio.wait_for(flights.run(("k",), fetch), 1) == "Hello"
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_bounded_transport_spaces_requests_to_rate_limit():
+    """With requests_per_minute set, request starts are spaced evenly."""
+    starts = []
+
+    async def handler(request):
+        starts.append(asyncio.get_running_loop().time())
+        return httpx.Response(200, json={})
+
+    transport = openai_client._BoundedTransport(httpx.MockTransport(handler), limit=8, requests_per_minute=1200)
+    async with httpx.AsyncClient(transport=transport) as client:
+        await asyncio.gather(*(client.get("https://api.example.com/") for _ in range(3)))
+
+    assert starts[2] - starts[0] >= 0.09  # Two 50ms intervals, with timer slack
+
+@pytest.mark.asyncio
+async def test_bounded_transport_waits_for_exhausted_quota_to_reset():
+    """A reply reporting no requests left holds back later requests until the reported reset."""
+    starts = []
+
+    async def handler(request):
+        starts.append(asyncio.get_running_loop().time())
+        headers = {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "100ms"} if len(starts) == 1 else {}
+        return httpx.Response(200, json={}, headers=headers)
+
+    transport = openai_client._BoundedTransport(httpx.MockTransport(handler), limit=8)
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.get("https://api.example.com/")
+        await client.get("https://api.example.com/")
+        await client.get("https://api.example.com/")
+
+    assert starts[1] - starts[0] >= 0.09  # Paused for the reset, with timer slack
+    assert starts[2] - starts[1] < 0.09   # Not paused again once the quota is back
+
+@pytest.mark.asyncio
+async def test_aclose_openai_clients_closes_and_forgets_shared_clients():
+    """Shutdown closes each shared client; the next lookup builds a fresh one."""
+    client = openai_client.get_async_openai_client("close-test-key")
+    assert openai_client.get_async_openai_client("close-test-key") is client
+
+    await openai_client.aclose_openai_clients()
+
+    assert client.is_closed()
+    assert openai_client.get_async_openai_client("close-test-key") is not client
+    await openai_client.aclose_openai_clients()
+
+@pytest.mark.asyncio
+async def test_analyze_sentence_stream_yields_words_as_they_complete():
+    """Words are parsed out of streamed deltas, however the reply is split."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    reply = json.dumps({"words": [
+        {"text": "Le", "lemma": "le", "pos": "det", "definition": "the"},
+        {"text": "chat", "lemma": "chat", "pos": "noun", "definition": "cat"},
+    ]})
+    received = []
+
+    async def stream():
+        for i in range(0, len(reply), 5):
+            received.append(i)
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content=reply[i:i + 5]))])
+
+    adapter.client = MagicMock()
+    adapter.client.chat.completions.create = AsyncMock(return_value=stream())
+
+    words = []
+    async for word in adapter.analyze_sentence_stream("Le chat", "fr", "en"):
+        words.append((word.text, len(received)))
+
+    assert [text for text, _ in words] == ["Le", "chat"]
+    # The first word is yielded before the rest of the reply has arrived
+    assert words[0][1] < len(received)
+    assert adapter.client.chat.completions.create.await_args.kwargs["stream"] is True
+
+@pytest.mark.asyncio
+async def test_lookup_word_answers_numbers_and_punctuation_locally():
+    """Tokens without letters never reach the API."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    adapter.client = MagicMock()
+    adapter.client.chat.completions.create = AsyncMock()
+
+    number = await adapter.lookup_word("1,50", "fr", "en")
+    dash = await adapter.lookup_word("—", "fr", "en")
+
+    assert (number.pos, number.definition) == ("num", "1,50")
+    assert (dash.pos, dash.definition) == ("punct", "—")
+    adapter.client.chat.completions.create.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_lookup_word_caches_words_differing_in_case_separately():
+    """German "Essen" (meal) and "essen" (to eat) are looked up and cached apart."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    adapter.client = replying({"lemma": "Essen", "pos": "noun", "definition": "meal"})
+
+    noun = await adapter.lookup_word("Essen", "de", "en")
+    adapter.client.chat.completions.create.return_value = completion({"lemma": "essen", "pos": "verb", "definition": "to eat"})
+    verb = await adapter.lookup_word("essen", "de", "en")
+    again = await adapter.lookup_word("essen ", "de", "en")
+
+    assert adapter.client.chat.completions.create.await_count == 2
+    assert (noun.pos, noun.definition) == ("noun", "meal")
+    assert (verb.pos, verb.definition) == ("verb", "to eat")
+    assert again.definition == "to eat"
+
+@pytest.mark.asyncio
+async def test_single_word_lookup_uses_structured_output():
+    """A lone lookup asks for the word schema with a tight token cap."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    reply = {"lemma": "manger", "pos": "verb", "definition": "to eat"}
+    adapter.client = replying(reply)
+
+    word = await adapter.lookup_word("mangent", "fr", "en")
+
+    kwargs = adapter.client.chat.completions.create.await_args.kwargs
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert kwargs["max_tokens"] == 80
+    assert (word.text, word.lemma, word.definition) == ("mangent", "manger", "to eat")
+
+def test_parsed_words_share_interned_pos_tags():
+    """Words parsed from one reply share a single string per part-of-speech tag."""
+    adapter = OpenAIDictionaryAdapter(api_key="test-key")
+    reply = json.loads('[{"text": "chat", "lemma": "chat", "pos": "noun", "definition": "cat", "definition_native": null},'
+                       ' {"text": "pomme", "lemma": "pomme", "pos": "noun", "definition": "apple"}]')
+
+    first, second = adapter._parse_words(reply)
+
+    assert first.pos is second.pos is sys.intern("noun")
@@ -0,0 +1,60 @@
+# tests/unit/test_search_sentences_use_case.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from core.use_cases.search_sentences import SENTENCE_SEARCH_MAX_LIMIT, SearchSentencesUseCase
+from core.domain.models import CardDifficulty, Sentence
+from tests.mocks import MockCacheService
+
+# --- Test Fixtures ---
+
+@pytest.fixture
+def search_service():
+    """A search service returning a fixed pair of French sentences."""
+    service = MagicMock()
+    sentences = [
+        Sentence(text="Je mange une pomme.", language="fr", difficulty=CardDifficulty.A1),
+        Sentence(text="Le pain est frais.", language="fr", source="https://example.com"),
+    ]
+    service.search_by_topic = AsyncMock(return_value=sentences)
+    service.search_by_difficulty = AsyncMock(return_value=sentences)
+    return service
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_by_topic_serves_repeat_searches_from_cache(search_service):
+    """A repeated topic search is answered from the cache with equal sentences."""
+    cache = MockCacheService()
+    use_case = SearchSentencesUseCase(search_service, cache=cache)
+
+    first = await use_case.by_topic("food", "fr", limit=20)
+    second = await use_case.by_topic("food", "fr", limit=20)
+
+    assert search_service.search_by_topic.await_count == 1
+    assert second == first
+    assert second[0].difficulty is CardDifficulty.A1
+    # Different parameters are cached separately
+    await use_case.by_topic("food", "fr", limit=5)
+    assert search_service.search_by_topic.await_count == 2
+
+@pytest.mark.asyncio
+async def test_by_difficulty_searches_again_when_cache_fails(search_service):
+    """Cache errors are treated as misses rather than failing the search."""
+    cache = MagicMock()
+    cache.get = AsyncMock(side_effect=ConnectionError("redis down"))
+    cache.set = AsyncMock(side_effect=ConnectionError("redis down"))
+    use_case = SearchSentencesUseCase(search_service, cache=cache)
+
+    sentences = await use_case.by_difficulty(CardDifficulty.A1, "fr")
+
+    assert len(sentences) == 2
+    search_service.search_by_difficulty.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_by_topic_clamps_oversized_limit(search_service):
+    """Limits above SENTENCE_SEARCH_MAX_LIMIT reach the search service clamped."""
+    use_case = SearchSentencesUseCase(search_service)
+
+    await use_case.by_topic("food", "fr", limit=10_000_000)
+
+    assert search_service.search_by_topic.await_args.kwargs["limit"] == SENTENCE_SEARCH_MAX_LIMIT